@@ -0,0 +1,80 @@
+import os
+import time
+from datetime import date
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.synthetic import Scale, load
+from radar_models.consent import recompute
+from radar_models.criteria import (
+    AtHospital,
+    Consented,
+    Deceased,
+    HasDiagnosis,
+    InCohort,
+    IsTest,
+    OnDrugGroup,
+    ResultValue,
+    cohort_query,
+    find_patients,
+)
+
+PATIENTS = 20000
+RESULTS_PER_PATIENT = 10
+REPEATS = 20
+TABLES = (
+    "patient_diagnosis",
+    "patient_consent",
+    "cohort_patient",
+    "hospital_patient",
+    "death",
+    "medication",
+    "result",
+)
+EGFR = 1
+AS_OF = date(2024, 1, 1)
+
+QUERIES = {
+    "diagnosis, consented, not test": HasDiagnosis((1, 2)) & Consented() & ~IsTest(),
+    "eGFR < 30 in the last year": ResultValue(EGFR, "<", 30, within_days=365),
+    "cohort at hospital, alive": InCohort((1,)) & AtHospital((1,)) & ~Deceased(),
+    "research request": (
+        HasDiagnosis((1,))
+        & ResultValue(EGFR, "<", 30, within_days=365)
+        & OnDrugGroup((1,))
+        & Consented()
+        & ~IsTest()
+    ),
+}
+
+
+def populate(engine: Engine) -> None:
+    scale = Scale(patients=PATIENTS, per_patient={"result": RESULTS_PER_PATIENT})
+    load(engine, scale, names=TABLES)
+    with Session(engine) as session:
+        recompute(session)
+        session.commit()
+
+
+def main() -> None:
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite://"))
+    SQLModel.metadata.create_all(engine)
+    populate(engine)
+    with Session(engine) as session:
+        print(f"{PATIENTS} patients, best of {REPEATS} runs")
+        for name, criteria in QUERIES.items():
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                patients = find_patients(session, criteria, AS_OF)
+                timings.append(time.perf_counter() - start)
+            print(
+                f"  {name}: {len(patients)} patients, "
+                f"first {timings[0] * 1000:.1f}ms, best {min(timings) * 1000:.1f}ms"
+            )
+        print(f"  cached statements: {cohort_query.cache_info().currsize}")
+
+
+if __name__ == "__main__":
+    main()
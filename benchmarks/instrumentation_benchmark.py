@@ -0,0 +1,81 @@
+import os
+import time
+from statistics import median
+
+from sqlalchemy import event, select
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.synthetic import Scale, load
+from radar_models.instrumentation import QueryInstrumentation
+from radar_models.radar3 import Medication, Patient
+
+PATIENTS = 2000
+BLOCK = 200
+PAIRS = 150
+HOOK_CALLS = 100000
+
+
+def block(session: Session, statement) -> float:
+    start = time.perf_counter()
+    for index in range(BLOCK):
+        session.execute(statement.where(Patient.id == index % PATIENTS + 1)).all()
+    return time.perf_counter() - start
+
+
+def hook_cost(engine, statement) -> float:
+    """Seconds the two cursor listeners take per statement, replayed against
+    the arguments of a real execution."""
+    captured = []
+
+    def capture(*args) -> None:
+        captured.append(args)
+
+    event.listen(engine, "after_cursor_execute", capture)
+    with Session(engine) as session:
+        session.execute(statement.where(Patient.id == 1)).all()
+    event.remove(engine, "after_cursor_execute", capture)
+    arguments = captured[0]
+    instrumentation = QueryInstrumentation()
+    before = instrumentation._before_cursor_execute
+    after = instrumentation._after_cursor_execute
+    start = time.perf_counter()
+    for _ in range(HOOK_CALLS):
+        before(*arguments)
+        after(*arguments)
+    return (time.perf_counter() - start) / HOOK_CALLS
+
+
+def main() -> None:
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite://"))
+    SQLModel.metadata.create_all(engine)
+    load(engine, Scale(patients=PATIENTS), names=["medication"])
+    instrumentation = QueryInstrumentation()
+    statement = select(Medication).join(Patient)
+
+    # Short blocks alternated within one session, so drift from a database
+    # server sharing the machine lands on both sides of each pair.
+    plain, instrumented = [], []
+    with Session(engine) as session:
+        block(session, statement)
+        for pair in range(PAIRS):
+            for instrumented_run in (pair % 2, not pair % 2):
+                if instrumented_run:
+                    instrumentation.attach(engine)
+                    instrumented.append(block(session, statement))
+                    instrumentation.detach(engine)
+                else:
+                    plain.append(block(session, statement))
+    overhead = median(after / before for before, after in zip(plain, instrumented)) - 1
+    per_query = median(plain) / BLOCK
+    listeners = hook_cost(engine, statement)
+    print(
+        f"{PAIRS} pairs of {BLOCK} queries: {per_query * 1e6:.0f}us per query, "
+        f"median overhead {overhead:+.1%}, listeners {listeners * 1e6:.1f}us "
+        f"per statement ({listeners / per_query:.1%})"
+    )
+    for model, count, total, p95 in instrumentation.report():
+        print(f"  {model}: {count} statements, {total:.2f}s, p95 <= {p95 * 1000:g}ms")
+
+
+if __name__ == "__main__":
+    main()
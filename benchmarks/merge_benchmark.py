@@ -0,0 +1,31 @@
+import os
+import time
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.synthetic import Scale, load
+from radar_models.merge import merge_patients
+
+PAIRS = 10000
+
+
+def main() -> None:
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite://"))
+    SQLModel.metadata.create_all(engine)
+    load(engine, Scale(patients=2 * PAIRS))
+    with Session(engine) as session:
+        pairs = [(patient_id + PAIRS, patient_id) for patient_id in range(1, PAIRS + 1)]
+
+        start = time.perf_counter()
+        report = merge_patients(session, pairs)
+        session.commit()
+        elapsed = time.perf_counter() - start
+
+    moved = {column: count for column, count in report.items() if count}
+    print(f"merged {PAIRS} pairs in {elapsed:.2f}s across {len(report)} columns")
+    for column, count in moved.items():
+        print(f"  {column}: {count}")
+
+
+if __name__ == "__main__":
+    main()
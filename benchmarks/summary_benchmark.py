@@ -0,0 +1,96 @@
+import os
+import time
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.synthetic import Scale, load
+from radar_models.loading import list_summaries, summary_columns
+from radar_models.radar3 import (
+    HADS,
+    IPOS,
+    CystinosisAdultVisit,
+    CystinosisPaedVisit,
+    RenalCancerGenetics,
+    SocioEconomic,
+)
+
+PATIENTS = 5000
+PAGE = 50
+PAGES = 20
+MODELS = (
+    CystinosisAdultVisit,
+    CystinosisPaedVisit,
+    RenalCancerGenetics,
+    IPOS,
+    HADS,
+    SocioEconomic,
+)
+LOADS = ("full", "deferred", "summary")
+
+
+def statement(model: Any, how: str, page: int) -> Any:
+    """A list page of ``model``: whole entities (``full``), entities with the
+    detail group deferred, or the summary projection."""
+    if how == "summary":
+        query = select(*summary_columns(model))
+    else:
+        query = select(model)
+        if how == "full":
+            query = query.options(undefer_group("detail"))
+    return query.order_by(model.id).limit(PAGE).offset(page * PAGE)
+
+
+def page_bytes(rows: Any) -> int:
+    """Bytes of ``rows`` as PostgreSQL sends them in DataRow messages: each
+    value as text behind a four byte length, NULL as the length alone."""
+    return sum(
+        4 + (0 if value is None else len(str(value))) for row in rows for value in row
+    )
+
+
+def fetch(session: Session, model: Any, how: str, page: int) -> None:
+    if how == "summary":
+        list_summaries(session, model, limit=PAGE, offset=page * PAGE)
+    else:
+        session.scalars(statement(model, how, page)).all()
+        session.expunge_all()
+
+
+def measure(engine: Any, model: Any, how: str) -> tuple[float, float]:
+    """(bytes per page, milliseconds per page) over PAGES pages."""
+    with engine.connect() as connection:
+        size = sum(
+            page_bytes(connection.execute(statement(model, how, page)))
+            for page in range(PAGES)
+        )
+    with Session(engine) as session:
+        start = time.perf_counter()
+        for page in range(PAGES):
+            fetch(session, model, how, page)
+        elapsed = time.perf_counter() - start
+    return size / PAGES, elapsed * 1000 / PAGES
+
+
+def main() -> None:
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite://"))
+    SQLModel.metadata.create_all(engine)
+    load(
+        engine,
+        Scale(patients=PATIENTS),
+        names=[model.__tablename__ for model in MODELS],
+    )
+    print(f"{PATIENTS} patients, {PAGES} pages of {PAGE}: bytes and ms per page")
+    print(f"{'model':<24}" + "".join(f"{how:>16}" for how in LOADS))
+    for model in MODELS:
+        cells = []
+        for how in LOADS:
+            size, elapsed = measure(engine, model, how)
+            cells.append(f"{size:>8.0f} {elapsed:>6.2f}")
+        print(f"{model.__name__:<24}" + "".join(f"{cell:>16}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+import io
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    Table,
+    UniqueConstraint,
+    insert,
+)
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, create_engine
+
+import radar_models.radar3  # noqa: F401  pylint: disable=unused-import
+from radar_models.validity import PERIODS
+
+# Synthetic radar3 data at benchmark scale. Tables are generated in foreign
+# key order: reference tables get a fixed number of rows, patient tables a
+# number of rows per patient, and every foreign key points at an existing
+# row. Rows are generated in chunks by worker processes, each chunk seeded
+# from (seed, table, first row), so the data is the same for a given seed
+# and chunk size however many workers there are. PostgreSQL is loaded with
+# COPY, other databases with executemany inserts.
+#
+# Derived tables are left empty, rebuild them with consent.recompute and
+# episodes.rebuild_episodes once loaded.
+
+DERIVED = {"change_event", "change_event_offset", "episode", "patient_consent_state"}
+
+PER_PATIENT = {
+    "result": 50.0,
+    "medication": 4.0,
+    "dialysis": 2.0,
+    "hospitalisation": 2.0,
+    "tube_sample": 2.0,
+    "patient_address": 1.5,
+    "death": 0.05,
+    "transplant": 0.3,
+}
+
+BOOLEAN_RATES = {"is_test": 0.02, "is_control": 0.01, "is_retired": 0.2}
+
+FIRST_NAMES = (
+    "Oliver George Harry Noah Jack Leo Arthur Muhammad Oscar Charlie Olivia "
+    "Amelia Isla Ava Ivy Freya Lily Florence Mia Willow Rosie Sophia Isabella"
+).split()
+LAST_NAMES = (
+    "Smith Jones Williams Taylor Brown Davies Evans Wilson Thomas Johnson "
+    "Roberts Robinson Thompson Wright Walker White Edwards Hughes Green Hall"
+).split()
+WORDS = (
+    "renal kidney biopsy review clinic stable referral follow up normal mild "
+    "moderate severe left right family history noted treatment response"
+).split()
+
+START = date(1990, 1, 1).toordinal()
+END = date(2024, 12, 31).toordinal()
+NULL_RATE = 0.1
+# Most periods, admissions and consents are still current.
+NULL_RATES = {"discharged_date": 0.8, "withdrawn_on_date": 0.9}
+OPEN_RATE = 0.7
+
+
+@dataclass
+class Scale:
+    """Row counts: ``per_patient`` and ``rows`` override PER_PATIENT and
+    ``reference_rows`` for the tables they name."""
+
+    patients: int = 1000
+    per_patient: dict[str, float] = field(default_factory=dict)
+    reference_rows: int = 20
+    rows: dict[str, int] = field(default_factory=dict)
+
+    def count(self, table: Table) -> int:
+        if table.name == "patient":
+            return self.patients
+        if table.name in self.rows:
+            return self.rows[table.name]
+        if "patient_id" in table.c:
+            rate = self.per_patient.get(table.name, PER_PATIENT.get(table.name, 1.0))
+            return round(self.patients * rate)
+        return self.reference_rows
+
+
+def tables_for(names: Optional[Iterable[str]] = None) -> list[Table]:
+    """Tables to generate in foreign key order: ``names`` (default all) and
+    every table they reference."""
+    metadata = SQLModel.metadata
+    if names is None:
+        wanted = set(metadata.tables)
+    else:
+        wanted, pending = set(), list(names)
+        while pending:
+            name = pending.pop()
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(
+                    key.column.table.name for key in metadata.tables[name].foreign_keys
+                )
+    return [
+        table
+        for table in metadata.sorted_tables
+        if table.name in wanted and table.name not in DERIVED
+    ]
+
+
+def plan(scale: Scale, names: Optional[Iterable[str]] = None) -> dict[str, int]:
+    return {table.name: scale.count(table) for table in tables_for(names)}
+
+
+def columns(table: Table) -> list[Any]:
+    """The columns given values, leaving server defaults to the database."""
+    return [column for column in table.columns if column.server_default is None]
+
+
+def _unique_columns(table: Table) -> set[str]:
+    unique = {column.name for column in table.columns if column.unique}
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            unique.update(constraint.columns.keys())
+    for index in table.indexes:
+        if index.unique:
+            unique.update(column.name for column in index.columns)
+    return unique
+
+
+def _periods() -> dict[str, tuple[str, str]]:
+    return {
+        model.__tablename__: (period.start.key, period.end.key)
+        for model, period in PERIODS.items()
+    }
+
+
+def _text(name: str, row_id: int, generator: random.Random) -> str:
+    if name == "first_name":
+        return generator.choice(FIRST_NAMES)
+    if name in ("last_name", "surname"):
+        return generator.choice(LAST_NAMES)
+    if name == "email":
+        return f"user{row_id}@example.org"
+    if name == "telephone_number":
+        return f"07{generator.randrange(10**9):09d}"
+    if name == "postcode":
+        return f"{generator.choice('BLMS')}{generator.randint(1, 30)} {generator.randint(1, 9)}AB"
+    if name.endswith("_value"):
+        # Mostly numeric, as results are, with the odd free-text entry.
+        if generator.random() < 0.05:
+            return generator.choice(("<5", ">90", "see comment"))
+        return str(round(generator.uniform(1, 150), 1))
+    if name.endswith("_code"):
+        return f"{generator.randrange(26**3):05X}"
+    return " ".join(generator.choices(WORDS, k=generator.randint(1, 4)))
+
+
+def _value(
+    column: Any,
+    row_id: int,
+    generator: random.Random,
+    counts: dict[str, int],
+    unique: set[str],
+    null_rate: float = NULL_RATE,
+) -> Any:
+    if column.foreign_keys:
+        (key,) = column.foreign_keys
+        target = key.column.table.name
+        if target == column.table.name:
+            if row_id > 1 and generator.random() < 0.5:
+                return generator.randint(1, row_id - 1)
+            return None
+        if not counts.get(target):
+            return None
+        if column.nullable and generator.random() < null_rate:
+            return None
+        return generator.randint(1, counts[target])
+    if column.nullable and generator.random() < null_rate:
+        return None
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return generator.random() < BOOLEAN_RATES.get(column.name, 0.5)
+    if isinstance(column_type, DateTime):
+        return datetime.fromordinal(generator.randint(START, END)) + timedelta(
+            seconds=generator.randrange(86400)
+        )
+    if isinstance(column_type, Date):
+        return date.fromordinal(generator.randint(START, END))
+    if isinstance(column_type, Float):
+        return round(generator.uniform(0, 200), 2)
+    if isinstance(column_type, (Integer, BigInteger)):
+        return generator.randint(0, 100)
+    if isinstance(column_type, Enum):
+        return generator.choice(column_type.enums)
+    if column.name in unique:
+        return f"{column.name}-{row_id}"
+    text = _text(column.name, row_id, generator)
+    length = getattr(column_type, "length", None)
+    return text[:length] if length else text
+
+
+@dataclass(frozen=True)
+class Chunk:
+    table: str
+    start: int
+    stop: int
+    seed: int
+    counts: dict[str, int]
+    copy: bool = False
+
+
+def generate(chunk: Chunk) -> Any:
+    """Rows ``start`` to ``stop`` of a table, as tuples in ``columns(table)``
+    order, or as COPY text if ``chunk.copy``."""
+    table = SQLModel.metadata.tables[chunk.table]
+    generator = random.Random(f"{chunk.seed}:{chunk.table}:{chunk.start}")
+    targets = columns(table)
+    unique = _unique_columns(table)
+    period = _periods().get(chunk.table)
+    patients = chunk.counts.get("patient", 0)
+    total = chunk.counts[chunk.table]
+    rows = []
+    for index in range(chunk.start, chunk.stop):
+        row_id = index + 1
+        row = {}
+        for column in targets:
+            if column.primary_key:
+                row[column.name] = row_id
+            elif column.name == "patient_id" and patients and chunk.table != "patient":
+                # Spread rows evenly over patients, keeping each patient's
+                # rows together as they would be after loading in order.
+                row[column.name] = index * patients // total + 1
+            else:
+                null_rate = NULL_RATES.get(column.name, NULL_RATE)
+                if period and column.name == period[1]:
+                    null_rate = OPEN_RATE
+                row[column.name] = _value(
+                    column, row_id, generator, chunk.counts, unique, null_rate
+                )
+        if period:
+            start, end = row[period[0]], row[period[1]]
+            if start is not None and end is not None and end < start:
+                row[period[0]], row[period[1]] = end, start
+        rows.append(tuple(row[column.name] for column in targets))
+    if chunk.copy:
+        return "".join(_copy_line(row) for row in rows)
+    return rows
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_line(row: tuple) -> str:
+    return "\t".join(_copy_value(value) for value in row) + "\n"
+
+
+def chunks(
+    counts: dict[str, int], seed: int, chunk_rows: int, copy: bool = False
+) -> Iterator[Chunk]:
+    for name, total in counts.items():
+        for start in range(0, total, chunk_rows):
+            yield Chunk(name, start, min(start + chunk_rows, total), seed, counts, copy)
+
+
+def _copy(connection: Any, engine: Engine, table: Table, text: str) -> None:
+    preparer = engine.dialect.identifier_preparer
+    names = ", ".join(preparer.quote(column.name) for column in columns(table))
+    statement = f"COPY {preparer.format_table(table)} ({names}) FROM STDIN"
+    with connection.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(statement, io.StringIO(text))
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(text)
+
+
+def bounded_map(
+    executor: Executor,
+    function: Callable[[Any], Any],
+    tasks: Iterable[Any],
+    window: int,
+) -> Iterator[Any]:
+    """``executor.map`` that submits at most ``window`` tasks ahead of the
+    consumer, so generated chunks wait in the pool rather than pile up in
+    memory while the database is slower."""
+    pending: deque = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _reset_sequences(cursor: Any, engine: Engine, tables: Iterable[Table]) -> None:
+    # COPY writes explicit ids without advancing the id sequences, so move
+    # them past the loaded rows before anything inserts. setval is a no-op
+    # for tables without a sequence or without rows.
+    preparer = engine.dialect.identifier_preparer
+    for table in tables:
+        if len(table.primary_key.columns) != 1:
+            continue
+        (key,) = table.primary_key.columns
+        name = preparer.format_table(table)
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{name}', '{key.name}'), "
+            f"max({preparer.quote(key.name)})) FROM {name}"
+        )
+
+
+def load(
+    engine: Engine,
+    scale: Scale,
+    seed: int = 0,
+    names: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    chunk_rows: int = 50000,
+    in_flight: Optional[int] = None,
+) -> dict[str, int]:
+    """Generate and load ``names`` (default every table) into an empty
+    schema, returning the row count per table. ``workers=1`` generates in
+    process. At most ``in_flight`` chunks (default twice the workers) are
+    generated ahead of the load."""
+    counts = plan(scale, names)
+    tables = SQLModel.metadata.tables
+    copy = engine.dialect.name == "postgresql"
+    tasks = chunks(counts, seed, chunk_rows, copy)
+    executor = ProcessPoolExecutor(workers) if workers != 1 else None
+    try:
+        if executor:
+            window = in_flight or 2 * (workers or os.cpu_count() or 1)
+            results = bounded_map(executor, generate, tasks, window)
+        else:
+            results = map(generate, tasks)
+        if copy:
+            connection = engine.raw_connection()
+            try:
+                for chunk, text in zip(chunks(counts, seed, chunk_rows), results):
+                    _copy(connection, engine, tables[chunk.table], text)
+                with connection.cursor() as cursor:
+                    _reset_sequences(cursor, engine, (tables[name] for name in counts))
+                connection.commit()
+            finally:
+                connection.close()
+        else:
+            with engine.begin() as connection:
+                for chunk, rows in zip(chunks(counts, seed, chunk_rows), results):
+                    table = tables[chunk.table]
+                    keys = [column.name for column in columns(table)]
+                    connection.execute(
+                        insert(table), [dict(zip(keys, row)) for row in rows]
+                    )
+    finally:
+        if executor:
+            executor.shutdown()
+    return counts
+
+
+def main() -> None:
+    if len(sys.argv) not in (2, 3):
+        raise SystemExit("usage: python -m benchmarks.synthetic PATIENTS [SEED]")
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite:///synthetic.db"))
+    SQLModel.metadata.create_all(engine)
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else 0
+    counts = load(engine, Scale(patients=int(sys.argv[1])), seed)
+    print(f"loaded {sum(counts.values())} rows into {len(counts)} tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    cast,
+    func,
+    literal,
+    select,
+    type_coerce,
+    union_all,
+)
+from sqlmodel import Session
+
+from radar_models import radar2
+from radar_models.radar3 import BiomarkerBarcode, TubeSample
+
+# Resolves scanned barcodes to (sample type, patient, sample date) across every
+# table that stores a sample barcode, with one UNION ALL query per batch. A
+# Bloom filter of all known barcodes is kept in process and a filter miss is
+# answered as unknown without a round trip, so a sample labelled by another
+# process shows up once the filter is refreshed (every max_age seconds).
+# Callers that cannot wait pass fallback=True to look misses up as well;
+# barcodes found that way are added to the filter.
+#
+# tube_sample.barcode and biomarker_barcode.barcode are unique. Before adding
+# the constraints to an existing database, resolve the barcodes reported by
+# duplicate_barcodes(); on PostgreSQL build each constraint online with
+# CREATE UNIQUE INDEX CONCURRENTLY and ALTER TABLE ... ADD CONSTRAINT ...
+# UNIQUE USING INDEX.
+
+
+@dataclass(frozen=True)
+class BarcodeSource:
+    sample_type: str
+    barcode: Any
+    patient_id: Any
+    sample_date: Any
+
+
+@dataclass(frozen=True)
+class SampleMatch:
+    barcode: str
+    sample_type: str
+    patient_id: int
+    sample_date: Any
+
+
+RADAR3_SOURCES = (
+    BarcodeSource(
+        "tube_sample", TubeSample.barcode, TubeSample.patient_id, TubeSample.sample_date
+    ),
+    BarcodeSource(
+        "biomarker",
+        BiomarkerBarcode.barcode,
+        BiomarkerBarcode.patient_id,
+        BiomarkerBarcode.sample_date,
+    ),
+)
+
+# radar_id on the nurture blood and urine tables holds the numeric RaDaR id.
+RADAR2_SOURCES = (
+    BarcodeSource(
+        "nurture_sample",
+        radar2.NurtureSample.barcode,
+        radar2.NurtureSample.patient_id,
+        radar2.NurtureSample.taken_on,
+    ),
+    BarcodeSource(
+        "nurture_blood",
+        radar2.NurtureSamplesBlood.sample_id,
+        cast(radar2.NurtureSamplesBlood.radar_id, Integer),
+        radar2.NurtureSamplesBlood.sample_date,
+    ),
+    BarcodeSource(
+        "nurture_urine",
+        radar2.NurtureSamplesUrine.sample_id,
+        cast(radar2.NurtureSamplesUrine.radar_id, Integer),
+        radar2.NurtureSamplesUrine.sample_date,
+    ),
+    BarcodeSource(
+        "biomarker",
+        radar2.BiomarkerBarcode.barcode,
+        radar2.BiomarkerBarcode.pat_id,
+        radar2.BiomarkerBarcode.sample_date,
+    ),
+)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+def normalise_barcode(barcode: Any) -> str:
+    return str(barcode).strip()
+
+
+def is_integer_column(source: BarcodeSource) -> bool:
+    return isinstance(source.barcode.type, Integer)
+
+
+def integer_form(barcode: str) -> Optional[str]:
+    """How an integer barcode column spells ``barcode``: "007" is stored as
+    7. None if it cannot be stored in one."""
+    return str(int(barcode)) if barcode.isdigit() else None
+
+
+def barcodes_query(sources: Sequence[BarcodeSource]) -> Any:
+    return union_all(
+        *(select(cast(source.barcode, String).label("barcode")) for source in sources)
+    )
+
+
+def resolve_query(sources: Sequence[BarcodeSource], barcodes: Sequence[str]) -> Any:
+    branches = []
+    for index, source in enumerate(sources):
+        if is_integer_column(source):
+            values: list[Any] = sorted(
+                {int(code) for code in barcodes if code.isdigit()}
+            )
+        else:
+            values = list(barcodes)
+        if not values:
+            continue
+        branches.append(
+            select(
+                literal(index).label("source"),
+                literal(source.sample_type).label("sample_type"),
+                cast(source.barcode, String).label("barcode"),
+                source.patient_id.label("patient_id"),
+                # Sample dates are a mix of DATE and TIMESTAMP columns.
+                type_coerce(source.sample_date, DateTime).label("sample_date"),
+            ).where(source.barcode.in_(values))
+        )
+    return union_all(*branches) if branches else None
+
+
+def duplicate_barcodes(
+    session: Session, sources: Sequence[BarcodeSource] = RADAR3_SOURCES
+) -> dict[str, dict[str, int]]:
+    """Barcodes stored more than once, with their counts, per sample type."""
+    duplicates: dict[str, dict[str, int]] = {}
+    for source in sources:
+        rows = session.execute(
+            select(cast(source.barcode, String), func.count())
+            .where(source.barcode.is_not(None))
+            .group_by(source.barcode)
+            .having(func.count() > 1)
+        ).all()
+        if rows:
+            duplicates.setdefault(source.sample_type, {}).update(
+                (barcode, count) for barcode, count in rows
+            )
+    return duplicates
+
+
+class BarcodeRegistry:
+    def __init__(
+        self,
+        sources: Sequence[BarcodeSource] = RADAR3_SOURCES,
+        max_age: Optional[float] = 300,
+        error_rate: float = 0.001,
+        fallback: bool = False,
+    ):
+        self.sources = sources
+        self.max_age = max_age
+        self.error_rate = error_rate
+        self.fallback = fallback
+        self.known: Optional[BloomFilter] = None
+        self.loaded_at = 0.0
+
+    def refresh(self, session: Session) -> BloomFilter:
+        barcodes = [
+            normalise_barcode(barcode)
+            for (barcode,) in session.execute(barcodes_query(self.sources))
+            if barcode is not None
+        ]
+        known = BloomFilter(len(barcodes) * 2, self.error_rate)
+        for barcode in barcodes:
+            known.add(barcode)
+        self.known, self.loaded_at = known, time.monotonic()
+        return known
+
+    def register(self, barcode: Any) -> None:
+        """Record a barcode written by this process so it resolves before the
+        next refresh."""
+        if self.known is not None:
+            self.known.add(normalise_barcode(barcode))
+
+    def is_stale(self) -> bool:
+        return self.known is None or (
+            self.max_age is not None
+            and time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    def might_exist(self, barcode: str) -> bool:
+        """False only if ``barcode`` was unknown at the last refresh."""
+        known = self.known
+        if known is None:
+            return True
+        stored = integer_form(barcode)
+        return barcode in known or (stored is not None and stored in known)
+
+    def resolve(
+        self, session: Session, barcodes: Iterable[Any]
+    ) -> dict[str, list[SampleMatch]]:
+        """Map each scanned barcode, as scanned, to its samples; unknown
+        barcodes map to an empty list. Unless ``fallback`` is set, barcodes
+        labelled by other processes since the last refresh are reported
+        unknown."""
+        if self.is_stale():
+            self.refresh(session)
+        scanned = {normalise_barcode(barcode) for barcode in barcodes}
+        matches: dict[str, list[SampleMatch]] = {barcode: [] for barcode in scanned}
+        candidates = sorted(
+            barcode for barcode in scanned if self.fallback or self.might_exist(barcode)
+        )
+        if (query := resolve_query(self.sources, candidates)) is None:
+            return matches
+
+        # Integer columns return "7" for a scanned "007".
+        spellings: dict[str, list[str]] = {}
+        for barcode in candidates:
+            if (stored := integer_form(barcode)) is not None:
+                spellings.setdefault(stored, []).append(barcode)
+        for source, sample_type, barcode, patient_id, sample_date in session.execute(
+            query
+        ):
+            barcode = normalise_barcode(barcode)
+            if is_integer_column(self.sources[source]):
+                scans = spellings.get(barcode, [])
+            else:
+                scans = [barcode] if barcode in matches else []
+            for scan in scans:
+                matches[scan].append(
+                    SampleMatch(scan, sample_type, patient_id, sample_date)
+                )
+            if not self.might_exist(barcode):
+                self.register(barcode)
+        return matches
@@ -0,0 +1,152 @@
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlmodel import Session, func, select
+
+from radar_models.radar3 import (
+    Biomarker,
+    BiomarkerBarcode,
+    BiomarkerResult,
+    BiomarkerSample,
+)
+
+# Builds the (patient, sample date) x biomarker matrix used for research
+# extracts. The barcode -> sample -> result chain is joined in the database
+# and streamed straight into coordinate (COO) form; the dense view is only
+# built on request. Matrices are cached on disk and reused until a result is
+# added or removed.
+
+Timepoint = tuple[int, datetime]
+
+
+@dataclass
+class BiomarkerMatrix:
+    timepoints: list[Timepoint] = field(default_factory=list)
+    biomarkers: list[str] = field(default_factory=list)
+    rows: list[int] = field(default_factory=list)
+    columns: list[int] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.timepoints), len(self.biomarkers)
+
+    def dense(self, missing: float = math.nan) -> list[list[float]]:
+        matrix = [[missing] * len(self.biomarkers) for _ in self.timepoints]
+        for row, column, value in zip(self.rows, self.columns, self.values):
+            matrix[row][column] = value
+        return matrix
+
+    def to_json(self) -> dict:
+        return {
+            "timepoints": [
+                [patient_id, sample_date.isoformat()]
+                for patient_id, sample_date in self.timepoints
+            ],
+            "biomarkers": self.biomarkers,
+            "rows": self.rows,
+            "columns": self.columns,
+            "values": self.values,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "BiomarkerMatrix":
+        return cls(
+            timepoints=[
+                (patient_id, datetime.fromisoformat(sample_date))
+                for patient_id, sample_date in data["timepoints"]
+            ],
+            biomarkers=data["biomarkers"],
+            rows=data["rows"],
+            columns=data["columns"],
+            values=data["values"],
+        )
+
+
+def load_matrix(session: Session, yield_per: int = 50000) -> BiomarkerMatrix:
+    biomarkers = list(
+        session.exec(
+            select(Biomarker.biomarker_name)
+            .distinct()
+            .order_by(Biomarker.biomarker_name)
+        ).all()
+    )
+    column_of = {name: index for index, name in enumerate(biomarkers)}
+
+    chain = (
+        select(
+            BiomarkerBarcode.patient_id,
+            BiomarkerBarcode.sample_date,
+            Biomarker.biomarker_name,
+            BiomarkerResult.biomarker_result_value,
+        )
+        .select_from(BiomarkerResult)
+        .join(
+            BiomarkerSample,
+            BiomarkerSample.id == BiomarkerResult.biomarker_sample_id,  # type: ignore[arg-type]
+        )
+        .join(
+            BiomarkerBarcode,
+            BiomarkerBarcode.id == BiomarkerSample.barcode_id,  # type: ignore[arg-type]
+        )
+        .join(Biomarker, Biomarker.id == BiomarkerResult.biomarker_id)  # type: ignore[arg-type]
+        .order_by(
+            BiomarkerBarcode.patient_id,
+            BiomarkerBarcode.sample_date,
+            BiomarkerResult.id,
+        )
+        .execution_options(yield_per=yield_per)
+    )
+
+    matrix = BiomarkerMatrix(biomarkers=biomarkers)
+    # Results arrive ordered by id within a timepoint, so a repeat measurement
+    # overwrites the earlier one.
+    cells: dict[tuple[int, int], int] = {}
+    for patient_id, sample_date, name, value in session.exec(chain):
+        if value is None:
+            continue
+        timepoint = (patient_id, sample_date)
+        if not matrix.timepoints or matrix.timepoints[-1] != timepoint:
+            matrix.timepoints.append(timepoint)
+        cell = (len(matrix.timepoints) - 1, column_of[name])
+        if cell in cells:
+            matrix.values[cells[cell]] = value
+            continue
+        cells[cell] = len(matrix.values)
+        matrix.rows.append(cell[0])
+        matrix.columns.append(cell[1])
+        matrix.values.append(value)
+    return matrix
+
+
+def result_version(session: Session) -> str:
+    latest_id, count = session.exec(
+        select(func.max(BiomarkerResult.id), func.count(BiomarkerResult.id))
+    ).one()
+    return f"{latest_id or 0}-{count}"
+
+
+def cached_matrix(
+    session: Session, cache_dir: Path, version: Optional[str] = None
+) -> BiomarkerMatrix:
+    """Return the matrix from ``cache_dir`` if it was built from the current
+    results, otherwise rebuild and cache it. The cache key is the latest
+    result id plus the result count, so deletions also invalidate it."""
+    version = version or result_version(session)
+    path = Path(cache_dir) / f"biomarker_matrix_{version}.json"
+    if path.exists():
+        return BiomarkerMatrix.from_json(json.loads(path.read_text()))
+
+    matrix = load_matrix(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(matrix.to_json()))
+    temporary.replace(path)
+    for stale in path.parent.glob("biomarker_matrix_*.json"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return matrix
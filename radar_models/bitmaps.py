@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional, Sequence
+
+from sqlalchemy import BigInteger, bindparam, literal, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import Boolean
+from sqlmodel import Session
+
+from radar_models.consent import CONSENT_TABLES, active_consent
+from radar_models.radar3 import (
+    ChangeEvent,
+    CohortPatient,
+    Death,
+    HospitalPatient,
+    Patient,
+    PatientConsentState,
+    PatientDiagnosis,
+)
+
+# Patient membership bitmaps per cohort, hospital, consent, diagnosis and
+# flag, held in process as Python ints with bit n set for patient id n. Set
+# algebra is then plain &, | and & ~ on the ints, and a result can be fed
+# back into SQL as one "= ANY(array)" parameter. The index is kept current
+# from the change_event outbox: only the patients named in new events are
+# re-read.
+
+Bitmap = int
+
+
+@dataclass(frozen=True)
+class Dimension:
+    name: str
+    tables: frozenset[str]
+    query: Callable[[Optional[list[int]]], Any]
+
+
+def _members(
+    key: Any, patient_id: Any, *criteria: Any
+) -> Callable[[Optional[list[int]]], Any]:
+    def query(patient_ids: Optional[list[int]]) -> Any:
+        statement = select(key, patient_id).where(*criteria)
+        if patient_ids is not None:
+            statement = statement.where(patient_id.in_(patient_ids))
+        return statement
+
+    return query
+
+
+def _flags(patient_ids: Optional[list[int]]) -> Any:
+    branches = [
+        _members(literal("all"), Patient.id)(patient_ids),
+        _members(literal("test"), Patient.id, Patient.is_test)(patient_ids),
+        _members(literal("control"), Patient.id, Patient.is_control)(patient_ids),
+        _members(literal("deceased"), Death.patient_id)(patient_ids),
+    ]
+    return union_all(*branches)
+
+
+DIMENSIONS = (
+    Dimension(
+        "cohort",
+        frozenset({"cohort_patient"}),
+        _members(
+            CohortPatient.cohort_id,
+            CohortPatient.patient_id,
+            CohortPatient.removed_date.is_(None),  # type: ignore[union-attr]
+        ),
+    ),
+    Dimension(
+        "hospital",
+        frozenset({"hospital_patient"}),
+        _members(
+            HospitalPatient.hospital_id,
+            HospitalPatient.patient_id,
+            HospitalPatient.discharged_date.is_(None),  # type: ignore[union-attr]
+        ),
+    ),
+    # Consent as the export gate sees it, so read from patient_consent_state,
+    # which consent.apply_changes must update before this index is refreshed.
+    Dimension(
+        "consent",
+        frozenset(CONSENT_TABLES | {"patient_consent_state"}),
+        _members(
+            PatientConsentState.consent_id,
+            PatientConsentState.patient_id,
+            *active_consent(),
+        ),
+    ),
+    Dimension(
+        "diagnosis",
+        frozenset({"patient_diagnosis"}),
+        _members(PatientDiagnosis.diagnosis_id, PatientDiagnosis.patient_id),
+    ),
+    Dimension("flag", frozenset({"patient", "death"}), _flags),
+)
+
+
+def from_ids(patient_ids: Iterable[int]) -> Bitmap:
+    patient_ids = list(patient_ids)
+    if not patient_ids:
+        return 0
+    bits = bytearray(max(patient_ids) // 8 + 1)
+    for patient_id in patient_ids:
+        bits[patient_id >> 3] |= 1 << (patient_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def members(bitmap: Bitmap) -> list[int]:
+    patient_ids = []
+    for index, byte in enumerate(
+        bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    ):
+        while byte:
+            lowest = byte & -byte
+            patient_ids.append(index * 8 + lowest.bit_length() - 1)
+            byte ^= lowest
+    return patient_ids
+
+
+class MemberOf(ColumnElement):
+    """``column = ANY(:ids)`` on PostgreSQL, so the statement and its plan do
+    not change with the number of ids; an expanding IN elsewhere."""
+
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("array", InternalTraversal.dp_clauseelement),
+        ("expanding", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column: Any, patient_ids: Sequence[int]):
+        self.column = coercions.expect(roles.ExpressionElementRole, column)
+        self.array = bindparam(None, list(patient_ids), type_=ARRAY(BigInteger))
+        self.expanding = bindparam(None, list(patient_ids), expanding=True)
+
+    def self_group(self, against: Any = None) -> ColumnElement:
+        return self
+
+
+@compiles(MemberOf)
+def _compile_in(element: MemberOf, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"({compiler.process(element.column.in_(element.expanding), **kw)})"
+
+
+@compiles(MemberOf, "postgresql")
+def _compile_any(element: MemberOf, compiler: SQLCompiler, **kw: Any) -> str:
+    column = compiler.process(element.column, **kw)
+    return f"({column} = ANY ({compiler.process(element.array, **kw)}))"
+
+
+def member_of(column: Any, bitmap: Bitmap) -> ColumnElement:
+    return MemberOf(column, members(bitmap))
+
+
+class BitmapIndex:
+    def __init__(self, dimensions: Sequence[Dimension] = DIMENSIONS):
+        self.dimensions = dimensions
+        self.bitmaps: dict[tuple[str, Hashable], Bitmap] = {}
+
+    def get(self, dimension: str, key: Hashable) -> Bitmap:
+        return self.bitmaps.get((dimension, key), 0)
+
+    def keys(self, dimension: str) -> list[Hashable]:
+        return [key for name, key in self.bitmaps if name == dimension]
+
+    def _load(
+        self,
+        session: Session,
+        dimension: Dimension,
+        patient_ids: Optional[list[int]] = None,
+    ) -> dict[Hashable, Bitmap]:
+        grouped: dict[Hashable, list[int]] = {}
+        for key, patient_id in session.execute(
+            dimension.query(patient_ids).execution_options(yield_per=50000)
+        ):
+            grouped.setdefault(key, []).append(patient_id)
+        return {key: from_ids(ids) for key, ids in grouped.items()}
+
+    def build(self, session: Session) -> None:
+        bitmaps = {}
+        for dimension in self.dimensions:
+            for key, bitmap in self._load(session, dimension).items():
+                bitmaps[(dimension.name, key)] = bitmap
+        self.bitmaps = bitmaps
+
+    def refresh_patients(
+        self,
+        session: Session,
+        patient_ids: Iterable[int],
+        dimensions: Optional[Sequence[Dimension]] = None,
+    ) -> None:
+        """Re-read the memberships of ``patient_ids`` only. Just the bitmaps
+        that held or gain one of them are rewritten."""
+        patient_ids = sorted(set(patient_ids))
+        if not patient_ids:
+            return
+        mask = from_ids(patient_ids)
+        for dimension in dimensions or self.dimensions:
+            loaded = self._load(session, dimension, patient_ids)
+            # ANDing with the small positive mask only reads its low words.
+            held = {
+                key
+                for name, key in self.bitmaps
+                if name == dimension.name and self.bitmaps[(name, key)] & mask
+            }
+            for key in held | loaded.keys():
+                self.bitmaps[(dimension.name, key)] = self.get(
+                    dimension.name, key
+                ) & ~mask | loaded.get(key, 0)
+
+    def apply_changes(self, session: Session, events: Iterable[ChangeEvent]) -> None:
+        """Bring the index up to date with a batch of change events, e.g. from
+        ``ChangeConsumer.batches()``. Changes that cannot be tied to a patient
+        trigger a full rebuild."""
+        touched: dict[str, set[int]] = {}
+        for change in events:
+            patient_id = (
+                change.row_id if change.table_name == "patient" else change.patient_id
+            )
+            if not any(
+                change.table_name in dimension.tables for dimension in self.dimensions
+            ):
+                continue
+            if patient_id is None:
+                self.build(session)
+                return
+            touched.setdefault(change.table_name, set()).add(patient_id)
+
+        for dimension in self.dimensions:
+            patient_ids = set().union(
+                *(touched.get(table, set()) for table in dimension.tables)
+            )
+            if patient_ids:
+                self.refresh_patients(session, patient_ids, [dimension])
@@ -0,0 +1,286 @@
+from datetime import datetime
+from typing import Any, Iterator, Optional, Type
+
+from sqlalchemy import (
+    BigInteger,
+    Table,
+    and_,
+    event,
+    insert,
+    inspect,
+    null,
+    or_,
+    select,
+    type_coerce,
+)
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import Session, SQLModel
+from sqlmodel import select as select_model
+
+from radar_models.portable import PostgresDefault
+from radar_models.radar3 import ChangeEvent, ChangeEventOffset
+
+# Change data capture for radar3 table models. Every ORM flush and every bulk
+# insert/update/delete issued through a session writes compact change records
+# to the change_event outbox in the same transaction, so an event exists if
+# and only if the change committed. A change that moves a row to another
+# patient is recorded against both patients.
+#
+# Ids are handed out at insert but transactions commit in any order, so a
+# consumer reading in id order could pass over an event whose transaction
+# was still running. On PostgreSQL each event stores the id of the
+# transaction that wrote it, and consumers read in (transaction id, id)
+# order only the events of transactions older than the oldest one still in
+# progress (the xmin of the current snapshot): no further events can appear
+# below that watermark. Elsewhere writers are serialised and id order is
+# commit order. Consumers keep their position in change_event_offset.
+
+# txid_* rather than pg_snapshot_xmin() and friends, which return xid8 and do
+# not compare with BIGINT. Elsewhere nothing is ever in progress.
+WATERMARK = type_coerce(
+    PostgresDefault("txid_snapshot_xmin(txid_current_snapshot())", str(2**63 - 1)),
+    BigInteger,
+)
+
+IGNORED_TABLES = {ChangeEvent.__tablename__, ChangeEventOffset.__tablename__}
+
+
+def is_captured(table: Optional[Table]) -> bool:
+    return (
+        table is not None
+        and table.name not in IGNORED_TABLES
+        and table.name in SQLModel.metadata.tables
+        and "id" in table.c
+    )
+
+
+def change_record(
+    table: Table,
+    row_id: Optional[int],
+    patient_id: Optional[int],
+    operation: str,
+    changed_columns: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    return {
+        "table_name": table.name,
+        "row_id": row_id,
+        "patient_id": patient_id,
+        "operation": operation,
+        "changed_columns": ",".join(changed_columns) if changed_columns else None,
+        "created_date": datetime.now(),
+    }
+
+
+def _flush_records(session: Session) -> list[dict[str, Any]]:
+    records = []
+    for operation, instances in (
+        ("insert", session.new),
+        ("update", session.dirty),
+        ("delete", session.deleted),
+    ):
+        for instance in instances:
+            table = getattr(type(instance), "__table__", None)
+            if not is_captured(table):
+                continue
+            changed_columns = None
+            patient_ids = [getattr(instance, "patient_id", None)]
+            if operation == "update":
+                state = inspect(instance)
+                changed_columns = [
+                    column.name
+                    for column in table.columns
+                    if column.name in state.attrs
+                    and state.attrs[column.name].history.has_changes()
+                ]
+                if not changed_columns:
+                    continue
+                if "patient_id" in changed_columns:
+                    patient_ids += state.attrs["patient_id"].history.deleted
+            records += [
+                change_record(
+                    table,
+                    getattr(instance, "id", None),
+                    patient_id,
+                    operation,
+                    changed_columns,
+                )
+                for patient_id in dict.fromkeys(patient_ids)
+            ]
+    return records
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    if records := _flush_records(session):
+        session.connection().execute(insert(ChangeEvent.__table__), records)
+
+
+def set_columns(table: Table, statement: Any) -> list[str]:
+    """The columns an INSERT or UPDATE statement assigns with ``values()``,
+    whether to a literal or to an expression such as ``version_id + 1``."""
+    values = statement._ordered_values or (statement._values or {}).items()
+    return sorted(
+        {getattr(key, "name", key) for key, _ in values} & set(table.c.keys())
+    )
+
+
+def _patients(state: ORMExecuteState, table: Table, row_ids: list[Any]) -> list:
+    return (
+        state.session.connection()
+        .execute(select(table.c.id, table.c.patient_id).where(table.c.id.in_(row_ids)))
+        .all()
+    )
+
+
+def _do_orm_execute(state: ORMExecuteState) -> Any:
+    # Bulk statements bypass the unit of work, so after_flush never sees them.
+    # The legacy after_bulk_update/after_bulk_delete hooks only fire for
+    # Query.update()/delete(); do_orm_execute covers 2.0 style statements too.
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    statement = state.statement
+    table = getattr(statement, "table", None)
+    if not is_captured(table):
+        return None
+    operation = (
+        "insert" if state.is_insert else "update" if state.is_update else "delete"
+    )
+
+    moves = "patient_id" in table.c and not state.is_insert
+    if isinstance(state.parameters, list):
+        # executemany: bulk INSERT, or bulk UPDATE by primary key.
+        rows = state.parameters
+        columns = sorted({key for row in rows for key in row} - {"id"})
+        moved = []
+        if moves and "patient_id" in columns:
+            moved = _patients(state, table, [row.get("id") for row in rows])
+        if state.is_insert and not statement._returning:
+            # Autoincrement ids are only known to the database, so read them
+            # back. The caller asked for no rows and the ones returned are
+            # consumed here.
+            returned = statement.returning(
+                table.c.id, table.c.get("patient_id", null())
+            )
+            result = state.invoke_statement(statement=returned)
+            affected = [tuple(row) for row in result.all()]
+        else:
+            result = state.invoke_statement()
+            affected = [(row.get("id"), row.get("patient_id")) for row in rows]
+        affected += moved
+    elif state.is_insert:
+        row = {**statement.compile().params, **(state.parameters or {})}
+        result = state.invoke_statement()
+        columns = sorted(
+            (
+                {key for key in row if key in table.c}
+                | set(set_columns(table, statement))
+            )
+            - {"id"}
+        )
+        inserted = getattr(result, "inserted_primary_key", None)
+        affected = [(inserted[0] if inserted else row.get("id"), row.get("patient_id"))]
+    else:
+        # Capture the affected keys before the rows change or disappear.
+        patient_column = table.c.get("patient_id")
+        keys = select(
+            table.c.id, patient_column if patient_column is not None else null()
+        )
+        if statement.whereclause is not None:
+            keys = keys.where(statement.whereclause)
+        affected = state.session.connection().execute(keys).all()
+        result = state.invoke_statement()
+        columns = None
+        if state.is_update:
+            columns = sorted(
+                {key for key in statement.compile().params if key in table.c}
+                | set(set_columns(table, statement))
+            )
+            if moves and "patient_id" in columns and affected:
+                affected += _patients(state, table, [row_id for row_id, _ in affected])
+    records = [
+        change_record(table, row_id, patient_id, operation, columns)
+        for row_id, patient_id in dict.fromkeys(map(tuple, affected))
+    ]
+
+    if records:
+        state.session.connection().execute(insert(ChangeEvent.__table__), records)
+    return result
+
+
+def enable_change_capture(target: Type[Session] | Session = Session) -> None:
+    event.listen(target, "after_flush", _after_flush)
+    event.listen(target, "do_orm_execute", _do_orm_execute)
+
+
+def disable_change_capture(target: Type[Session] | Session = Session) -> None:
+    event.remove(target, "after_flush", _after_flush)
+    event.remove(target, "do_orm_execute", _do_orm_execute)
+
+
+class ChangeConsumer:
+    """At-least-once reader over the change_event outbox.
+
+    The position only moves forward when a batch is acknowledged, and is
+    written in the caller's transaction, so a consumer that fails before it
+    commits sees the same events again."""
+
+    def __init__(self, session: Session, consumer_name: str, batch_size: int = 1000):
+        self.session = session
+        self.consumer_name = consumer_name
+        self.batch_size = batch_size
+
+    def offset(self) -> tuple[int, int]:
+        """(transaction id, event id) of the last acknowledged event."""
+        position = self.session.exec(
+            select_model(
+                ChangeEventOffset.last_transaction_id, ChangeEventOffset.last_event_id
+            ).where(ChangeEventOffset.consumer_name == self.consumer_name)
+        ).first()
+        return (position[0], position[1]) if position else (0, 0)
+
+    def poll(self, after: Optional[tuple[int, int]] = None) -> list[ChangeEvent]:
+        transaction_id, event_id = self.offset() if after is None else after
+        return list(
+            self.session.exec(
+                select_model(ChangeEvent)
+                .where(
+                    ChangeEvent.transaction_id < WATERMARK,  # type: ignore[operator]
+                    or_(
+                        ChangeEvent.transaction_id > transaction_id,  # type: ignore[operator]
+                        and_(
+                            ChangeEvent.transaction_id == transaction_id,
+                            ChangeEvent.id > event_id,  # type: ignore[operator]
+                        ),
+                    ),
+                )
+                .order_by(ChangeEvent.transaction_id, ChangeEvent.id)
+                .limit(self.batch_size)
+            ).all()
+        )
+
+    def acknowledge(self, events: list[ChangeEvent]) -> None:
+        """Move the position past ``events``. The change is flushed, not
+        committed: it commits with the caller's own work."""
+        if not events:
+            return
+        last = max(events, key=lambda change: (change.transaction_id, change.id))
+        position = (last.transaction_id, last.id)
+        offset = self.session.exec(
+            select_model(ChangeEventOffset)
+            .where(ChangeEventOffset.consumer_name == self.consumer_name)
+            .with_for_update()
+        ).one_or_none()
+        if offset is None:
+            offset = ChangeEventOffset(consumer_name=self.consumer_name)
+            self.session.add(offset)
+        elif position <= (offset.last_transaction_id, offset.last_event_id):
+            return
+        offset.last_transaction_id, offset.last_event_id = position
+        self.session.flush()
+
+    def batches(self) -> Iterator[list[ChangeEvent]]:
+        """Yield unacknowledged batches until the outbox is drained. Each batch
+        is acknowledged when the caller asks for the next one; the caller
+        commits."""
+        while events := self.poll():
+            yield events
+            self.acknowledge(events)
@@ -0,0 +1,224 @@
+import mmap
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from sqlmodel import Session, select
+
+from radar_models import radar2
+from radar_models.radar3 import Code, CodeRead
+
+# Prefix index over codes and their tokenised labels for the diagnosis and
+# observation pickers. The index is written once to a flat file of sorted
+# keys and is opened with mmap, so every worker on a host shares the same
+# pages and a lookup is a binary search with no database round trip.
+#
+# Layout (native byte order, the file is built on the host that reads it):
+#   header      MAGIC, record count, key count
+#   uint32[]    record offsets (records + 1) into the record blob
+#   uint32[]    key offsets (keys + 1) into the key blob
+#   uint32[]    record number per key
+#   bytes       records: id, coding system, describes, code, label joined by \t
+#   bytes       keys: lower-case code and label tokens, sorted
+
+# A one letter prefix matches a large share of the keys, so shorter queries
+# return nothing and a search examines at most MAX_SCAN keys.
+MIN_PREFIX = 2
+MAX_SCAN = 5000
+
+MAGIC = b"RDRCODE1"
+HEADER = struct.Struct("8sII")
+SEPARATOR = "\t"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+CodeRow = tuple[int, str, str, str, str]
+
+
+def tokens(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def code_rows(session: Session) -> list[CodeRow]:
+    return list(
+        session.exec(
+            select(
+                Code.id,
+                Code.coding_system,
+                Code.code_describes,
+                Code.code,
+                Code.code_label,
+            ).order_by(Code.id)
+        ).all()
+    )
+
+
+def radar2_code_rows(session: Session) -> list[CodeRow]:
+    return [
+        (code_id, system, "", code, display)
+        for code_id, system, code, display in session.execute(
+            select(
+                radar2.Code.id,
+                radar2.Code.system,
+                radar2.Code.code,
+                radar2.Code.display,
+            ).order_by(radar2.Code.id)
+        )
+    ]
+
+
+def write_index(rows: Iterable[CodeRow], path: Path) -> int:
+    """Write the index for ``rows`` to ``path`` and return the number of
+    codes indexed."""
+    records = []
+    keys = set()
+    for number, row in enumerate(rows):
+        code_id, coding_system, code_describes, code, code_label = row
+        fields = (str(code_id), coding_system, code_describes, code, code_label)
+        if any(SEPARATOR in field for field in fields):
+            raise ValueError(f"Code {code_id} contains a tab character")
+        records.append(SEPARATOR.join(fields).encode())
+        keys.add((code.lower().encode(), number))
+        keys.update((token.encode(), number) for token in tokens(code_label))
+    sorted_keys = sorted(keys)
+
+    record_offsets = array("I", [0])
+    for record in records:
+        record_offsets.append(record_offsets[-1] + len(record))
+    key_offsets = array("I", [0])
+    for key, _ in sorted_keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+    targets = array("I", (number for _, number in sorted_keys))
+
+    path = Path(path)
+    temporary = path.with_suffix(".tmp")
+    with temporary.open("wb") as index_file:
+        index_file.write(HEADER.pack(MAGIC, len(records), len(sorted_keys)))
+        index_file.write(record_offsets.tobytes())
+        index_file.write(key_offsets.tobytes())
+        index_file.write(targets.tobytes())
+        index_file.write(b"".join(records))
+        index_file.write(b"".join(key for key, _ in sorted_keys))
+    temporary.replace(path)
+    return len(records)
+
+
+class _Keys:
+    """Sequence view of the sorted keys, for bisect."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return bytes(self.blob[self.offsets[index] : self.offsets[index + 1]])
+
+
+class CodeIndex:
+    def __init__(self, path: Path):
+        with open(path, "rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, record_count, key_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a code index")
+
+        start = HEADER.size
+        sections = []
+        for count in (record_count + 1, key_count + 1, key_count):
+            end = start + count * 4
+            sections.append(view[start:end].cast("I"))
+            start = end
+        self._record_offsets, key_offsets, self._targets = sections
+        records_end = start + self._record_offsets[-1]
+        self._records = view[start:records_end]
+        self._keys = _Keys(key_offsets, view[records_end:])
+
+    def __len__(self) -> int:
+        return len(self._record_offsets) - 1
+
+    def __enter__(self) -> "CodeIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in (
+            self._record_offsets,
+            self._targets,
+            self._keys.offsets,
+            self._keys.blob,
+            self._records,
+        ):
+            view.release()
+        self._map.close()
+
+    def fields(self, number: int) -> list[str]:
+        start, end = self._record_offsets[number], self._record_offsets[number + 1]
+        return bytes(self._records[start:end]).decode().split(SEPARATOR)
+
+    def record(self, number: int) -> CodeRead:
+        code_id, coding_system, code_describes, code, code_label = self.fields(number)
+        return CodeRead(
+            id=int(code_id),
+            coding_system=coding_system,
+            code_describes=code_describes,
+            code=code,
+            code_label=code_label,
+        )
+
+    def prefixed(self, prefix: str) -> Iterator[int]:
+        """Record numbers with a code or label token starting with
+        ``prefix``, in key order."""
+        key = prefix.lower().encode()
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position].startswith(key):
+            yield self._targets[position]
+            position += 1
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        coding_system: Optional[str] = None,
+        min_prefix: int = MIN_PREFIX,
+        max_scan: int = MAX_SCAN,
+    ) -> list[CodeRead]:
+        """Codes matching every word of ``query`` as a prefix of the code or
+        of a label token. Code matches rank before label matches. Queries
+        whose longest word is shorter than ``min_prefix`` match nothing, and
+        only the first ``max_scan`` keys for that word are examined."""
+        words = tokens(query)
+        # Drive the scan from the longest word, it has the fewest matches.
+        words.sort(key=len, reverse=True)
+        if not words or len(words[0]) < min_prefix:
+            return []
+        # Filter on the raw fields and only build CodeRead for the page
+        # returned.
+        matches: list[tuple[bool, str, int]] = []
+        seen = set()
+        query_code = query.strip().lower()
+        for number in islice(self.prefixed(words[0]), max_scan):
+            if number in seen:
+                continue
+            seen.add(number)
+            _, system, _, code, code_label = self.fields(number)
+            if coding_system is not None and system != coding_system:
+                continue
+            searchable = [code.lower(), *tokens(code), *tokens(code_label)]
+            if all(
+                any(token.startswith(word) for token in searchable)
+                for word in words[1:]
+            ):
+                matches.append(
+                    (not code.lower().startswith(query_code), code_label, number)
+                )
+        matches.sort()
+        return [self.record(number) for _, _, number in matches[:limit]]
@@ -0,0 +1,167 @@
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+from radar_models.radar3 import (
+    ChangeEvent,
+    Consent,
+    PatientConsent,
+    PatientConsentState,
+    PatientReconsent,
+)
+
+# Maintains patient_consent_state: one row per patient and consent type with
+# the outcome of the consent rules, so exports and cohort counts filter with
+# one indexed semi-join instead of re-deriving consent.
+#
+#   - the latest signing of a consent type decides its state;
+#   - a signing counts only if the form was released by then;
+#   - a withdrawal takes effect on its date;
+#   - a signing of a retired form needs reconsent unless the patient has
+#     responded to a reconsent request since.
+#
+# States are recomputed for the patients named in change events on the
+# consent tables, and in full nightly so dated withdrawals take effect.
+
+CONSENT_TABLES = {"consent", "patient_consent", "patient_reconsent"}
+
+
+def consent_states(
+    signings: Iterable[tuple[int, int, date, Optional[date], date, bool]],
+    reconsented: dict[int, date],
+    as_of: date,
+    computed_date: datetime,
+) -> list[dict[str, Any]]:
+    """Evaluate (patient id, consent id, signed on, withdrawn on, release
+    date, is retired) rows, ``reconsented`` holding each patient's latest
+    reconsent response."""
+    latest: dict[tuple[int, int], tuple] = {}
+    for signing in signings:
+        key = (signing[0], signing[1])
+        if key not in latest or signing[2] >= latest[key][2]:
+            latest[key] = signing
+
+    states = []
+    for (patient_id, consent_id), signing in latest.items():
+        _, _, signed_on, withdrawn_on, release_date, is_retired = signing
+        response = reconsented.get(patient_id)
+        states.append(
+            {
+                "patient_id": patient_id,
+                "consent_id": consent_id,
+                "signed_on_date": signed_on,
+                "withdrawn_on_date": withdrawn_on,
+                "is_active": signed_on >= release_date
+                and signed_on <= as_of
+                and (withdrawn_on is None or withdrawn_on > as_of),
+                "needs_reconsent": is_retired
+                and (response is None or response < signed_on),
+                "computed_date": computed_date,
+            }
+        )
+    return states
+
+
+def recompute(
+    session: Session,
+    patient_ids: Optional[Iterable[int]] = None,
+    as_of: Optional[date] = None,
+) -> int:
+    """Recompute the states of ``patient_ids`` (default everyone) in the
+    session's transaction and return the number of rows written."""
+    as_of = as_of or date.today()
+    patient_ids = None if patient_ids is None else sorted(set(patient_ids))
+    signings = select(
+        PatientConsent.patient_id,
+        PatientConsent.consent_id,
+        PatientConsent.signed_on_date,
+        PatientConsent.withdrawn_on_date,
+        Consent.release_date,
+        Consent.is_retired,
+    ).join(
+        Consent, Consent.id == PatientConsent.consent_id
+    )  # type: ignore[arg-type]
+    reconsents = select(
+        PatientReconsent.patient_id, func.max(PatientReconsent.response_date)
+    ).group_by(PatientReconsent.patient_id)
+    clear = delete(PatientConsentState)
+    if patient_ids is not None:
+        signings = signings.where(
+            PatientConsent.patient_id.in_(patient_ids)  # type: ignore[attr-defined]
+        )
+        reconsents = reconsents.where(
+            PatientReconsent.patient_id.in_(patient_ids)  # type: ignore[attr-defined]
+        )
+        clear = clear.where(
+            PatientConsentState.patient_id.in_(patient_ids)  # type: ignore[attr-defined]
+        )
+
+    states = consent_states(
+        session.execute(signings.execution_options(yield_per=50000)),
+        dict(session.execute(reconsents).all()),
+        as_of,
+        datetime.now(),
+    )
+    session.execute(clear)
+    if states:
+        session.execute(insert(PatientConsentState), states)
+    return len(states)
+
+
+def apply_changes(
+    session: Session, events: Iterable[ChangeEvent], as_of: Optional[date] = None
+) -> int:
+    """Recompute the patients affected by a batch of change events, e.g. from
+    ``ChangeConsumer.batches()``. A change to a consent form recomputes every
+    patient who signed it; changes without a patient recompute everyone."""
+    patient_ids: set[int] = set()
+    consent_ids: set[int] = set()
+    for change in events:
+        if change.table_name not in CONSENT_TABLES:
+            continue
+        if change.table_name == "consent" and change.row_id is not None:
+            consent_ids.add(change.row_id)
+        elif change.patient_id is not None:
+            patient_ids.add(change.patient_id)
+        else:
+            return recompute(session, as_of=as_of)
+    if consent_ids:
+        patient_ids.update(
+            session.execute(
+                select(PatientConsent.patient_id).where(
+                    PatientConsent.consent_id.in_(consent_ids)  # type: ignore[attr-defined]
+                )
+            ).scalars()
+        )
+    if not patient_ids:
+        return 0
+    return recompute(session, patient_ids, as_of)
+
+
+def active_consent(allow_reconsent_pending: bool = False) -> list[ColumnElement]:
+    """The patient_consent_state rows that count as consent."""
+    criteria = [PatientConsentState.is_active]
+    if not allow_reconsent_pending:
+        criteria.append(PatientConsentState.needs_reconsent.is_(False))  # type: ignore[attr-defined]
+    return criteria
+
+
+def consented(
+    patient_id: Any,
+    consent_ids: Iterable[int] = (),
+    allow_reconsent_pending: bool = False,
+) -> ColumnElement:
+    """Export gate: ``patient_id`` has an active consent, optionally of one of
+    ``consent_ids``, e.g. ``select(Result).where(consented(Result.patient_id))``."""
+    criteria = [
+        PatientConsentState.patient_id == patient_id,
+        *active_consent(allow_reconsent_pending),
+    ]
+    if consent_ids := tuple(consent_ids):
+        criteria.append(
+            PatientConsentState.consent_id.in_(consent_ids)  # type: ignore[attr-defined]
+        )
+    return exists().where(*criteria)
@@ -0,0 +1,345 @@
+import abc
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    and_,
+    bindparam,
+    case,
+    cast,
+    exists,
+    not_,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+from radar_models.consent import consented
+from radar_models.radar3 import (
+    CohortPatient,
+    Death,
+    Drug,
+    DrugGroup,
+    HospitalPatient,
+    Medication,
+    Patient,
+    PatientDiagnosis,
+    Result,
+)
+
+# Cohort criteria for research data requests, e.g.
+#
+#   HasDiagnosis((12,)) & ResultValue(EGFR, "<", 30, within_days=365)
+#       & OnDrugGroup((4,)) & Consented() & ~IsTest()
+#
+# Each criterion compiles to an EXISTS semi-join correlated on patient.id (or
+# a predicate on patient itself), so the statement is one SELECT over
+# patient that PostgreSQL can plan as semi/anti joins on the patient_id
+# indexes. Values are bound parameters and "today" is supplied at execution,
+# so a compiled statement is cached per criteria and reused.
+
+AS_OF = bindparam("as_of", type_=Date)
+
+NUMERIC_PATTERN = r"^\s*-?[0-9]+(\.[0-9]+)?\s*$"
+
+OPERATORS = {
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+    "=": lambda left, right: left == right,
+}
+
+
+class Criterion(abc.ABC):
+    @abc.abstractmethod
+    def clause(self) -> ColumnElement:
+        pass
+
+    def parameters(self, as_of: date) -> dict[str, Any]:
+        return {}
+
+    def __and__(self, other: "Criterion") -> "Criterion":
+        return All((self, other))
+
+    def __or__(self, other: "Criterion") -> "Criterion":
+        return AnyOf((self, other))
+
+    def __invert__(self) -> "Criterion":
+        return Not(self)
+
+
+@dataclass(frozen=True)
+class All(Criterion):
+    criteria: tuple[Criterion, ...]
+
+    def clause(self) -> ColumnElement:
+        return and_(true(), *(criterion.clause() for criterion in self.criteria))
+
+    def parameters(self, as_of: date) -> dict[str, Any]:
+        return {
+            name: value
+            for criterion in self.criteria
+            for name, value in criterion.parameters(as_of).items()
+        }
+
+    def __and__(self, other: Criterion) -> Criterion:
+        return All((*self.criteria, other))
+
+
+@dataclass(frozen=True)
+class AnyOf(Criterion):
+    criteria: tuple[Criterion, ...]
+
+    def clause(self) -> ColumnElement:
+        return or_(*(criterion.clause() for criterion in self.criteria))
+
+    def parameters(self, as_of: date) -> dict[str, Any]:
+        return All(self.criteria).parameters(as_of)
+
+    def __or__(self, other: Criterion) -> Criterion:
+        return AnyOf((*self.criteria, other))
+
+
+@dataclass(frozen=True)
+class Not(Criterion):
+    criterion: Criterion
+
+    def clause(self) -> ColumnElement:
+        return not_(self.criterion.clause())
+
+    def parameters(self, as_of: date) -> dict[str, Any]:
+        return self.criterion.parameters(as_of)
+
+
+def _exists(table: Any, *criteria: Any) -> ColumnElement:
+    return exists().where(table.patient_id == Patient.id, *criteria)
+
+
+def _current(table: Any, start: Any, end: Any, *criteria: Any) -> ColumnElement:
+    """A ``table`` row whose start/end period includes the as-of date; a NULL
+    end is open."""
+    return _exists(
+        table,
+        or_(start.is_(None), start <= AS_OF),
+        or_(end.is_(None), end >= AS_OF),
+        *criteria,
+    )
+
+
+@dataclass(frozen=True)
+class HasDiagnosis(Criterion):
+    diagnosis_ids: tuple[int, ...]
+
+    def clause(self) -> ColumnElement:
+        return _exists(
+            PatientDiagnosis,
+            PatientDiagnosis.diagnosis_id.in_(self.diagnosis_ids),  # type: ignore[attr-defined]
+        )
+
+
+@dataclass(frozen=True)
+class InCohort(Criterion):
+    """Recruited to one of ``cohort_ids`` and not removed on the as-of date."""
+
+    cohort_ids: tuple[int, ...]
+
+    def clause(self) -> ColumnElement:
+        return _current(
+            CohortPatient,
+            CohortPatient.recruited_date,
+            CohortPatient.removed_date,
+            CohortPatient.cohort_id.in_(self.cohort_ids),  # type: ignore[attr-defined]
+        )
+
+
+@dataclass(frozen=True)
+class AtHospital(Criterion):
+    """Seen at one of ``hospital_ids`` and not discharged on the as-of date."""
+
+    hospital_ids: tuple[int, ...]
+
+    def clause(self) -> ColumnElement:
+        return _current(
+            HospitalPatient,
+            HospitalPatient.first_seen_date,
+            HospitalPatient.discharged_date,
+            HospitalPatient.hospital_id.in_(self.hospital_ids),  # type: ignore[attr-defined]
+        )
+
+
+@dataclass(frozen=True)
+class Consented(Criterion):
+    """An active consent per patient_consent_state, optionally one of
+    ``consent_ids``."""
+
+    consent_ids: tuple[int, ...] = ()
+
+    def clause(self) -> ColumnElement:
+        return consented(Patient.id, self.consent_ids)
+
+
+@dataclass(frozen=True)
+class ResultValue(Criterion):
+    """A numeric result for ``observation_id`` satisfying ``operator value``,
+    optionally in the ``within_days`` before the as-of date."""
+
+    observation_id: int
+    operator: str
+    value: float
+    within_days: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.operator not in OPERATORS:
+            raise ValueError(
+                f"Unknown operator {self.operator!r}, expected one of {list(OPERATORS)}"
+            )
+
+    @property
+    def since(self) -> str:
+        return f"results_since_{self.within_days}_days"
+
+    def clause(self) -> ColumnElement:
+        # result_value is free text, only numeric values are compared.
+        numeric = case(
+            (
+                Result.result_value.regexp_match(NUMERIC_PATTERN),  # type: ignore[attr-defined]
+                cast(Result.result_value, Float),
+            )
+        )
+        criteria = [
+            Result.observation_id == self.observation_id,
+            OPERATORS[self.operator](numeric, self.value),
+        ]
+        if self.within_days is not None:
+            criteria += [
+                Result.result_date >= bindparam(self.since, type_=DateTime),  # type: ignore[operator]
+                Result.result_date < bindparam("results_until", type_=DateTime),  # type: ignore[operator]
+            ]
+        return _exists(Result, *criteria)
+
+    def parameters(self, as_of: date) -> dict[str, Any]:
+        if self.within_days is None:
+            return {}
+        return {
+            self.since: datetime.combine(
+                as_of - timedelta(days=self.within_days), time.min
+            ),
+            "results_until": datetime.combine(as_of + timedelta(days=1), time.min),
+        }
+
+
+def _current_medication(*criteria: Any) -> ColumnElement:
+    return _current(
+        Medication, Medication.start_date, Medication.finish_date, *criteria
+    )
+
+
+@dataclass(frozen=True)
+class OnDrug(Criterion):
+    """Taking one of ``drug_ids`` on the as-of date."""
+
+    drug_ids: tuple[int, ...]
+
+    def clause(self) -> ColumnElement:
+        return _current_medication(
+            Medication.drug_id.in_(self.drug_ids)  # type: ignore[attr-defined]
+        )
+
+
+@dataclass(frozen=True)
+class OnDrugGroup(Criterion):
+    """Taking a drug in one of ``drug_group_ids`` or their subgroups on the
+    as-of date."""
+
+    drug_group_ids: tuple[int, ...]
+
+    def clause(self) -> ColumnElement:
+        groups = (
+            select(DrugGroup.id)
+            .where(DrugGroup.id.in_(self.drug_group_ids))  # type: ignore[union-attr]
+            .cte(recursive=True)
+        )
+        groups = groups.union_all(
+            select(DrugGroup.id).where(DrugGroup.parent_drug_group_id == groups.c.id)
+        )
+        drugs = select(Drug.id).where(
+            Drug.drug_group_id.in_(select(groups.c.id))  # type: ignore[union-attr]
+        )
+        return _current_medication(
+            Medication.drug_id.in_(drugs)  # type: ignore[attr-defined]
+        )
+
+
+@dataclass(frozen=True)
+class IsTest(Criterion):
+    def clause(self) -> ColumnElement:
+        return Patient.is_test.is_(True)  # type: ignore[attr-defined]
+
+
+@dataclass(frozen=True)
+class IsControl(Criterion):
+    def clause(self) -> ColumnElement:
+        return Patient.is_control.is_(True)  # type: ignore[attr-defined]
+
+
+@dataclass(frozen=True)
+class Deceased(Criterion):
+    """Died on or before the as-of date."""
+
+    def clause(self) -> ColumnElement:
+        return _exists(Death, Death.date_of_death <= AS_OF)
+
+
+SPEC_KEYS = {
+    "diagnosis": HasDiagnosis,
+    "cohort": InCohort,
+    "hospital": AtHospital,
+    "consent": Consented,
+    "drug": OnDrug,
+    "drug_group": OnDrugGroup,
+}
+
+
+def from_spec(spec: dict[str, Any]) -> Criterion:
+    """Build criteria from a JSON-style request, e.g. ``{"all": [{"diagnosis":
+    [12]}, {"result": [EGFR, "<", 30, 365]}, {"not": {"test": true}}]}``."""
+    if len(spec) != 1:
+        raise ValueError(f"Expected a single criterion, got {sorted(spec)}")
+    ((key, value),) = spec.items()
+    if key == "all":
+        return All(tuple(from_spec(item) for item in value))
+    if key == "any":
+        return AnyOf(tuple(from_spec(item) for item in value))
+    if key == "not":
+        return Not(from_spec(value))
+    if key == "result":
+        return ResultValue(*value)
+    if key in SPEC_KEYS:
+        return SPEC_KEYS[key](tuple(value))
+    flags = {"test": IsTest(), "control": IsControl(), "deceased": Deceased()}
+    if key in flags:
+        return flags[key] if value else Not(flags[key])
+    raise ValueError(f"Unknown criterion {key!r}")
+
+
+@lru_cache(maxsize=256)
+def cohort_query(criterion: Criterion) -> Any:
+    """The patient id query for ``criterion``. Equal criteria share one
+    statement object, and so one entry in the engine's compiled cache."""
+    return select(Patient.id).where(criterion.clause()).order_by(Patient.id)
+
+
+def find_patients(
+    session: Session, criterion: Criterion, as_of: Optional[date] = None
+) -> list[int]:
+    as_of = as_of or date.today()
+    parameters = {"as_of": as_of, **criterion.parameters(as_of)}
+    return list(session.execute(cohort_query(criterion), parameters).scalars())
@@ -0,0 +1,202 @@
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Hashable, Iterable, Optional, Sequence
+
+from sqlalchemy import delete, insert, null, select
+from sqlmodel import Session
+
+from radar_models import radar2
+from radar_models.radar3 import Dialysis, Episode, Hospitalisation, Medication
+
+# Coalesces fragmented, overlapping treatment periods from several data
+# sources into continuous episodes per (patient, drug/modality). Periods are
+# loaded as parallel columns with dates as ordinals, sorted once and merged
+# in a single sweep for the whole cohort. A period with no end is ongoing.
+
+OPEN = 2**62
+
+EpisodeRow = tuple[int, Optional[Hashable], date, Optional[date], int]
+
+
+@dataclass(frozen=True)
+class EpisodeSource:
+    patient_id: Any
+    key: Any
+    start: Any
+    end: Any
+    condition: Any = None
+
+
+SOURCES = {
+    "medication": EpisodeSource(
+        Medication.patient_id,
+        Medication.drug_id,
+        Medication.start_date,
+        Medication.finish_date,
+    ),
+    "dialysis": EpisodeSource(
+        Dialysis.patient_id,
+        Dialysis.modality,
+        Dialysis.timeline_start,
+        Dialysis.timeline_end,
+    ),
+    "hospitalisation": EpisodeSource(
+        Hospitalisation.patient_id,
+        None,
+        Hospitalisation.date_of_admission,
+        Hospitalisation.date_of_discharge,
+    ),
+}
+
+# Medication periods in radar2, keyed by drug id like radar3 so they can be
+# saved as episodes. Free-text drugs have no id and are left out.
+RADAR2_MEDICATION = EpisodeSource(
+    radar2.Medication.patient_id,
+    radar2.Medication.drug_id,
+    radar2.Medication.from_date,
+    radar2.Medication.to_date,
+    radar2.Medication.drug_id.is_not(None),
+)
+
+
+def coalesce(
+    patient_ids: Sequence[int],
+    keys: Sequence[Optional[Hashable]],
+    starts: Sequence[int],
+    ends: Sequence[int],
+    gap_days: int = 1,
+) -> list[EpisodeRow]:
+    """Merge periods given as ordinal day columns (``OPEN`` for no end).
+    Periods of the same patient and key merge when the next one starts no
+    more than ``gap_days`` after the current episode ends, so with the
+    default adjacent days join up."""
+    key_codes: dict[Optional[Hashable], int] = {}
+    codes = array("l", (key_codes.setdefault(key, len(key_codes)) for key in keys))
+    order = sorted(
+        range(len(starts)),
+        key=lambda index: (patient_ids[index], codes[index], starts[index]),
+    )
+
+    episodes: list[EpisodeRow] = []
+
+    def close(index: int, start: int, end: int, fragments: int) -> None:
+        episodes.append(
+            (
+                patient_ids[index],
+                keys[index],
+                date.fromordinal(start),
+                None if end == OPEN else date.fromordinal(end),
+                fragments,
+            )
+        )
+
+    current = -1
+    start = end = fragments = 0
+    for index in order:
+        if (
+            current >= 0
+            and patient_ids[index] == patient_ids[current]
+            and codes[index] == codes[current]
+            and starts[index] <= end + gap_days
+        ):
+            end = max(end, ends[index])
+            fragments += 1
+            continue
+        if current >= 0:
+            close(current, start, end, fragments)
+        current, start, end, fragments = index, starts[index], ends[index], 1
+    if current >= 0:
+        close(current, start, end, fragments)
+    return episodes
+
+
+def load_periods(
+    session: Session,
+    source: EpisodeSource,
+    patient_ids: Optional[Iterable[int]] = None,
+) -> tuple[list[int], list[Optional[Hashable]], array, array]:
+    """Stream a source into (patient ids, keys, start ordinals, end ordinals).
+    Periods without a start date cannot be placed and are skipped."""
+    query = select(
+        source.patient_id,
+        null() if source.key is None else source.key,
+        source.start,
+        source.end,
+    ).where(source.start.is_not(None), source.patient_id.is_not(None))
+    if source.condition is not None:
+        query = query.where(source.condition)
+    if patient_ids is not None:
+        query = query.where(source.patient_id.in_(list(patient_ids)))
+
+    patients: list[int] = []
+    keys: list[Optional[Hashable]] = []
+    starts, ends = array("q"), array("q")
+    for patient_id, key, start, end in session.execute(
+        query.execution_options(yield_per=50000)
+    ):
+        start = start.toordinal()
+        end = OPEN if end is None else end.toordinal()
+        patients.append(patient_id)
+        keys.append(key)
+        starts.append(start)
+        # An end before the start is a data error, read it as a single day.
+        ends.append(max(start, end))
+    return patients, keys, starts, ends
+
+
+def build_episodes(
+    session: Session,
+    source: EpisodeSource,
+    patient_ids: Optional[Iterable[int]] = None,
+    gap_days: int = 1,
+) -> list[EpisodeRow]:
+    return coalesce(*load_periods(session, source, patient_ids), gap_days=gap_days)
+
+
+def save_episodes(
+    session: Session,
+    episode_type: str,
+    episodes: Sequence[EpisodeRow],
+    patient_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """Replace the stored episodes of ``episode_type``, for everyone or just
+    ``patient_ids``, in the session's transaction."""
+    clear = delete(Episode).where(Episode.episode_type == episode_type)
+    if patient_ids is not None:
+        clear = clear.where(Episode.patient_id.in_(list(patient_ids)))  # type: ignore[attr-defined]
+    session.execute(clear)
+    if episodes:
+        session.execute(
+            insert(Episode),
+            [
+                {
+                    "patient_id": patient_id,
+                    "episode_type": episode_type,
+                    "key_id": key,
+                    "start_date": start,
+                    "end_date": end,
+                    "fragments": fragments,
+                }
+                for patient_id, key, start, end, fragments in episodes
+            ],
+        )
+    return len(episodes)
+
+
+def rebuild_episodes(
+    session: Session,
+    patient_ids: Optional[Iterable[int]] = None,
+    gap_days: int = 1,
+) -> dict[str, int]:
+    """Rebuild every radar3 episode type and return the episode counts."""
+    patient_ids = None if patient_ids is None else list(patient_ids)
+    return {
+        episode_type: save_episodes(
+            session,
+            episode_type,
+            build_episodes(session, source, patient_ids, gap_days),
+            patient_ids,
+        )
+        for episode_type, source in SOURCES.items()
+    }
@@ -0,0 +1,258 @@
+import re
+from collections import defaultdict
+from typing import Any, Iterable, Optional, Type
+
+from sqlalchemy import event, inspect, insert
+from sqlmodel import Session, delete, select
+
+from radar_models.radar3 import Transplant, TransplantHLA
+
+# HLA typings are parsed once into transplant_hla rows (one per transplant,
+# donor/recipient and locus). For matching, each locus is held as a bitmask
+# with one bit per antigen, so a locus mismatch count is a single AND-NOT and
+# popcount rather than a round of string parsing per transplant.
+#
+# The rows are derived from transplant.donor_hla and recipient_hla and go
+# with their transplant when it is deleted. With enable_typing_refresh()
+# every flush that writes either column re-parses that transplant; otherwise
+# call store_typings() after writing them, or backfill_typings() for
+# transplants never typed.
+
+MATCHING_LOCI = ("A", "B", "DR")
+
+LOCUS_ALIASES = {
+    "A": "A",
+    "B": "B",
+    "C": "C",
+    "CW": "C",
+    "DR": "DR",
+    "DRB1": "DR",
+    "DQ": "DQ",
+    "DQB1": "DQ",
+    "DRB3": "DRB345",
+    "DRB4": "DRB345",
+    "DRB5": "DRB345",
+}
+
+# DR51, DR52 and DR53 are the serological broads of the DRB5, DRB3 and DRB4
+# genes, not DRB1 antigens, so they are kept apart from DR and do not count
+# towards its two antigens or its mismatches.
+DRB345_BROADS = {"DRB3": 52, "DRB4": 53, "DRB5": 51}
+
+ANTIGEN_PATTERN = re.compile(r"^(DRB[1345]|DQB1|CW|DR|DQ|A|B|C)\*?(\d+)", re.IGNORECASE)
+
+Typing = dict[str, tuple[int, ...]]
+Masks = tuple[int, ...]
+
+
+def parse_hla(value: Optional[str]) -> Typing:
+    """Parse serological ("A2 A24 B8 DR3") or molecular ("A*02:01,
+    DRB1*03:01") typings into locus -> antigens. Public epitopes such as
+    Bw4 and unrecognised tokens are ignored. DR51/52/53 and DRB3/4/5
+    alleles are returned under the DRB345 locus."""
+    typing: defaultdict[str, list[int]] = defaultdict(list)
+    for token in re.split(r"[\s,;/]+", value or ""):
+        if not (match := ANTIGEN_PATTERN.match(token)):
+            continue
+        gene = match.group(1).upper()
+        locus = LOCUS_ALIASES[gene]
+        antigen = DRB345_BROADS.get(gene, int(match.group(2)))
+        if locus == "DR" and antigen in DRB345_BROADS.values():
+            locus = "DRB345"
+        if antigen not in typing[locus] and len(typing[locus]) < 2:
+            typing[locus].append(antigen)
+    return {locus: tuple(antigens) for locus, antigens in typing.items()}
+
+
+def typing_values(
+    transplant_id: int, is_donor: bool, typing: Typing
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "transplant_id": transplant_id,
+            "is_donor": is_donor,
+            "locus": locus,
+            "antigen_one": antigens[0],
+            "antigen_two": antigens[1] if len(antigens) > 1 else None,
+        }
+        for locus, antigens in typing.items()
+    ]
+
+
+def typing_rows(
+    transplant_id: int, is_donor: bool, typing: Typing
+) -> list[TransplantHLA]:
+    return [
+        TransplantHLA(**values)
+        for values in typing_values(transplant_id, is_donor, typing)
+    ]
+
+
+def store_typings(session: Session, transplants: Iterable[Transplant]) -> int:
+    """Replace the structured typings of ``transplants`` with freshly parsed
+    rows. Call this whenever donor_hla or recipient_hla is written, unless
+    enable_typing_refresh() is on."""
+    rows = []
+    transplant_ids = []
+    for transplant in transplants:
+        if transplant.id is None:
+            continue
+        transplant_ids.append(transplant.id)
+        rows += typing_rows(transplant.id, True, parse_hla(transplant.donor_hla))
+        rows += typing_rows(transplant.id, False, parse_hla(transplant.recipient_hla))
+    if transplant_ids:
+        session.exec(
+            delete(TransplantHLA).where(
+                TransplantHLA.transplant_id.in_(transplant_ids)  # type: ignore[attr-defined]
+            )
+        )
+    session.add_all(rows)
+    return len(rows)
+
+
+def _hla_changed(instance: Transplant) -> bool:
+    state = inspect(instance)
+    return state.pending or any(
+        state.attrs[name].history.has_changes()
+        for name in ("donor_hla", "recipient_hla")
+    )
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    transplants = [
+        instance
+        for instance in (*session.new, *session.dirty)
+        if isinstance(instance, Transplant)
+        and instance.id is not None
+        and _hla_changed(instance)
+    ]
+    # The foreign key cascades deletes where it is enforced; SQLite does not
+    # enforce it by default.
+    deleted = [
+        instance.id
+        for instance in session.deleted
+        if isinstance(instance, Transplant) and instance.id is not None
+    ]
+    if not transplants and not deleted:
+        return
+    # Objects cannot be added mid-flush, so the rows are written with Core.
+    connection = session.connection()
+    connection.execute(
+        delete(TransplantHLA).where(
+            TransplantHLA.transplant_id.in_(  # type: ignore[attr-defined]
+                [transplant.id for transplant in transplants] + deleted
+            )
+        )
+    )
+    values = []
+    for transplant in transplants:
+        values += typing_values(transplant.id, True, parse_hla(transplant.donor_hla))
+        values += typing_values(
+            transplant.id, False, parse_hla(transplant.recipient_hla)
+        )
+    if values:
+        connection.execute(insert(TransplantHLA), values)
+
+
+def enable_typing_refresh(target: Type[Session] | Session = Session) -> None:
+    event.listen(target, "after_flush", _after_flush)
+
+
+def disable_typing_refresh(target: Type[Session] | Session = Session) -> None:
+    event.remove(target, "after_flush", _after_flush)
+
+
+def backfill_typings(session: Session, batch_size: int = 5000) -> int:
+    typed = select(TransplantHLA.transplant_id).distinct()
+    untyped = (
+        select(Transplant)
+        .where(Transplant.id.not_in(typed))  # type: ignore[union-attr]
+        .order_by(Transplant.id)
+        .limit(batch_size)
+    )
+    stored, last_id = 0, 0
+    # Keyset pagination: transplants without a parseable typing stay untyped.
+    while transplants := session.exec(
+        untyped.where(Transplant.id > last_id)  # type: ignore[operator]
+    ).all():
+        stored += store_typings(session, transplants)
+        session.flush()
+        last_id = transplants[-1].id or last_id
+    return stored
+
+
+def encode(typing: Typing, loci: tuple[str, ...] = MATCHING_LOCI) -> Masks:
+    return tuple(
+        sum(1 << antigen for antigen in set(typing.get(locus, ()))) for locus in loci
+    )
+
+
+def mismatches(donor: Masks, recipient: Masks) -> tuple[int, ...]:
+    """Donor antigens absent from the recipient, per locus."""
+    return tuple(
+        (donor_mask & ~recipient_mask).bit_count()
+        for donor_mask, recipient_mask in zip(donor, recipient)
+    )
+
+
+def load_masks(
+    session: Session,
+    transplant_ids: Optional[Iterable[int]] = None,
+    loci: tuple[str, ...] = MATCHING_LOCI,
+) -> dict[int, tuple[Masks, Masks]]:
+    """Load (donor, recipient) masks for every typed transplant in one query."""
+    query = select(
+        TransplantHLA.transplant_id,
+        TransplantHLA.is_donor,
+        TransplantHLA.locus,
+        TransplantHLA.antigen_one,
+        TransplantHLA.antigen_two,
+    ).where(
+        TransplantHLA.locus.in_(loci)  # type: ignore[attr-defined]
+    )
+    if transplant_ids is not None:
+        query = query.where(
+            TransplantHLA.transplant_id.in_(list(transplant_ids))  # type: ignore[attr-defined]
+        )
+
+    position = {locus: index for index, locus in enumerate(loci)}
+    masks: defaultdict[int, list[list[int]]] = defaultdict(
+        lambda: [[0] * len(loci), [0] * len(loci)]
+    )
+    for transplant_id, is_donor, locus, antigen_one, antigen_two in session.exec(
+        query.execution_options(yield_per=10000)
+    ):
+        mask = 1 << antigen_one
+        if antigen_two is not None:
+            mask |= 1 << antigen_two
+        masks[transplant_id][0 if is_donor else 1][position[locus]] |= mask
+    return {
+        transplant_id: (tuple(donor), tuple(recipient))
+        for transplant_id, (donor, recipient) in masks.items()
+    }
+
+
+def cohort_mismatches(
+    session: Session, transplant_ids: Optional[Iterable[int]] = None
+) -> dict[int, tuple[int, ...]]:
+    """A/B/DR mismatch counts for every typed transplant."""
+    return {
+        transplant_id: mismatches(donor, recipient)
+        for transplant_id, (donor, recipient) in load_masks(
+            session, transplant_ids
+        ).items()
+    }
+
+
+def rank_donors(
+    recipient: Typing, donors: dict[int, Typing]
+) -> list[tuple[int, tuple[int, ...]]]:
+    """Score one recipient against many candidate donors, best match first.
+    Ties on the total are broken on DR, then B mismatches."""
+    recipient_masks = encode(recipient)
+    scored = [
+        (donor_id, mismatches(encode(typing), recipient_masks))
+        for donor_id, typing in donors.items()
+    ]
+    scored.sort(key=lambda item: (sum(item[1]), item[1][2], item[1][1]))
+    return scored
@@ -0,0 +1,266 @@
+import threading
+import time
+import warnings
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Type
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Table, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+from sqlmodel.main import default_registry
+
+from radar_models import radar2
+
+# Opt-in query instrumentation. Engine cursor events time every statement and
+# attribute it to the radar2/radar3 models whose tables it reads or writes,
+# and count lazy relationship loads per session transaction, warning when one
+# relationship is loaded row by row (N+1). The histograms of a compiled
+# statement are worked out once per statement in SQLAlchemy's compiled cache,
+# and timings are buffered and folded into them in batches, so the
+# per-execution cost is two clock reads, a list append and a dict lookup.
+#
+#   instrumentation = QueryInstrumentation()
+#   instrumentation.attach(engine)
+#   ...
+#   print(instrumentation.exposition())
+
+# Upper bounds in seconds, as Prometheus histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+TEXTUAL = "<text>"
+
+FLUSH_EVERY = 10000
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = self.counts or [0] * (len(self.buckets) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.observe_all([seconds])
+
+    def observe_all(self, seconds: list[float]) -> None:
+        counts, buckets = self.counts, self.buckets
+        for value in seconds:
+            counts[bisect_left(buckets, value)] += 1
+        self.count += len(seconds)
+        self.total += sum(seconds)
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile."""
+        rank, seen = fraction * self.count, 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return 0.0
+
+
+def model_names() -> dict[Table, str]:
+    """Table to model name: the class name for radar3 and ``radar2.<class>``
+    for radar2, whose table and class names overlap with radar3's."""
+    names = {}
+    for registry, prefix in ((radar2.Base.registry, "radar2."), (default_registry, "")):
+        for mapper in registry.mappers:
+            for table in mapper.tables:
+                names[table] = prefix + mapper.class_.__name__
+    return names
+
+
+class QueryInstrumentation:
+    def __init__(self, n_plus_one_threshold: int = 10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.histograms: dict[str, Histogram] = {}
+        self.lazy_loads: Counter[str] = Counter()
+        self.n_plus_one: Counter[str] = Counter()
+        self.names = model_names()
+        self._observers: WeakKeyDictionary = WeakKeyDictionary()
+        self._timings: list[tuple[Any, float]] = []
+        self._sessions: list[Type[Session] | Session] = []
+        self._lock = threading.Lock()
+
+    def attach(
+        self, engine: Engine, session: Type[Session] | Session = Session
+    ) -> None:
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            self._before_cursor_execute,
+            retval=True,
+        )
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(session, "after_transaction_end", self._after_transaction_end)
+        self._sessions.append(session)
+
+    def detach(
+        self, engine: Engine, session: Type[Session] | Session = Session
+    ) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(session, "after_transaction_end", self._after_transaction_end)
+        self._sessions.remove(session)
+
+    def models(self, compiled: Any) -> tuple[str, ...]:
+        if compiled is None or getattr(compiled, "statement", None) is None:
+            return (TEXTUAL,)
+        tables = find_tables(compiled.statement, include_crud=True)
+        return tuple(
+            sorted({self.names.get(table, table.name) for table in tables})
+        ) or (TEXTUAL,)
+
+    def _histograms(self, compiled: Any) -> tuple[Histogram, ...]:
+        observers = None if compiled is None else self._observers.get(compiled)
+        if observers is None:
+            observers = tuple(
+                self.histograms.setdefault(model, Histogram())
+                for model in self.models(compiled)
+            )
+            if compiled is not None:
+                self._observers[compiled] = observers
+        return observers
+
+    def _before_cursor_execute(
+        self,
+        _conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        _many: bool,
+    ) -> tuple[str, Any]:
+        # retval=True spares SQLAlchemy wrapping the listener in another call.
+        context.radar_started = time.perf_counter()
+        return statement, parameters
+
+    def _after_cursor_execute(
+        self,
+        _conn: Any,
+        _cursor: Any,
+        _sql: str,
+        _params: Any,
+        context: Any,
+        _many: bool,
+    ) -> None:
+        self._timings.append(
+            (context.compiled, time.perf_counter() - context.radar_started)
+        )
+        if len(self._timings) >= FLUSH_EVERY:
+            self.flush()
+        # The ORM passes its load options down to the connection, so lazy
+        # loads are spotted here. A do_orm_execute hook would cost every ORM
+        # execution an ORMExecuteState, several times the cost of the timing.
+        options = context.execution_options.get("_sa_orm_load_options")
+        if options is not None and options._lazy_loaded_from is not None:
+            self._lazy_load(context.compiled, options._lazy_loaded_from.session)
+
+    def flush(self) -> None:
+        """Fold buffered timings into the histograms."""
+        with self._lock:
+            timings, self._timings = self._timings, []
+            grouped: defaultdict[Any, list[float]] = defaultdict(list)
+            for compiled, elapsed in timings:
+                grouped[compiled].append(elapsed)
+            for compiled, elapsed_times in grouped.items():
+                for histogram in self._histograms(compiled):
+                    histogram.observe_all(elapsed_times)
+
+    def _lazy_load(self, compiled: Any, session: Optional[Session]) -> None:
+        if session is None or not any(
+            target is session
+            or (isinstance(target, type) and isinstance(session, target))
+            for target in self._sessions
+        ):
+            return
+        path = compiled.statement._compile_options._current_path
+        mapper, relationship = path.path[-2:]
+        key = f"{mapper.class_.__name__}.{relationship.key}"
+        loads = session.info.setdefault("radar_lazy_loads", Counter())
+        loads[key] += 1
+        with self._lock:
+            self.lazy_loads[key] += 1
+            if loads[key] == self.n_plus_one_threshold:
+                self.n_plus_one[key] += 1
+                warnings.warn(
+                    f"{key} lazy loaded {loads[key]} times in one transaction, "
+                    "consider selectinload()",
+                    NPlusOneWarning,
+                    stacklevel=2,
+                )
+
+    def _after_transaction_end(self, session: Session, transaction: Any) -> None:
+        if transaction.parent is None:
+            session.info.pop("radar_lazy_loads", None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings = []
+            self._observers.clear()
+            self.histograms.clear()
+            self.lazy_loads.clear()
+            self.n_plus_one.clear()
+
+    def report(
+        self, limit: Optional[int] = None
+    ) -> list[tuple[str, int, float, float]]:
+        """(model, statements, total seconds, p95 bucket) for the models
+        with the most total time first."""
+        self.flush()
+        rows = [
+            (model, histogram.count, histogram.total, histogram.quantile(0.95))
+            for model, histogram in self.histograms.items()
+        ]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:limit]
+
+    def exposition(self) -> str:
+        """The metrics in the Prometheus text format."""
+        self.flush()
+        lines = [
+            "# HELP radar_query_duration_seconds Statement latency by model.",
+            "# TYPE radar_query_duration_seconds histogram",
+        ]
+        for model, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(
+                (*histogram.buckets, float("inf")), histogram.counts
+            ):
+                cumulative += count
+                upper = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'radar_query_duration_seconds_bucket{{model="{model}",le="{upper}"}} {cumulative}'
+                )
+            lines.append(
+                f'radar_query_duration_seconds_sum{{model="{model}"}} {histogram.total}'
+            )
+            lines.append(
+                f'radar_query_duration_seconds_count{{model="{model}"}} {histogram.count}'
+            )
+        lines += [
+            "# HELP radar_lazy_loads_total Lazy relationship loads.",
+            "# TYPE radar_lazy_loads_total counter",
+            *(
+                f'radar_lazy_loads_total{{relationship="{key}"}} {count}'
+                for key, count in sorted(self.lazy_loads.items())
+            ),
+            "# HELP radar_n_plus_one_total Transactions that lazy loaded one relationship repeatedly.",
+            "# TYPE radar_n_plus_one_total counter",
+            *(
+                f'radar_n_plus_one_total{{relationship="{key}"}} {count}'
+                for key, count in sorted(self.n_plus_one.items())
+            ),
+        ]
+        return "\n".join(lines) + "\n"
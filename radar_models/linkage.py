@@ -0,0 +1,296 @@
+import math
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import combinations
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlmodel import Session, select
+
+from radar_models.radar3 import (
+    PatientAddress,
+    PatientDemographic,
+    PatientIdentifier,
+    PatientLinkCandidate,
+)
+
+# Probabilistic (Fellegi-Sunter) record linkage for duplicate patient detection.
+# Records are grouped into blocks on cheap keys so only patients sharing a key
+# are compared, then each candidate pair is scored in a process pool.
+
+# Blocks larger than this are skipped: a block of n patients yields n(n-1)/2
+# pairs, about 5000 at the default.
+MAX_BLOCK_SIZE = 100
+
+
+@dataclass
+class LinkageRecord:
+    patient_id: int
+    first_names: set[str] = field(default_factory=set)
+    last_names: set[str] = field(default_factory=set)
+    dates_of_birth: set[date] = field(default_factory=set)
+    genders: set[int] = field(default_factory=set)
+    postcodes: set[str] = field(default_factory=set)
+    identifiers: set[tuple[int, str]] = field(default_factory=set)
+
+
+@dataclass(frozen=True)
+class FieldWeight:
+    m: float
+    u: float
+
+    @property
+    def agree(self) -> float:
+        return math.log2(self.m / self.u)
+
+    @property
+    def disagree(self) -> float:
+        return math.log2((1 - self.m) / (1 - self.u))
+
+
+DEFAULT_WEIGHTS: dict[str, FieldWeight] = {
+    "first_names": FieldWeight(m=0.95, u=0.01),
+    "last_names": FieldWeight(m=0.95, u=0.005),
+    "dates_of_birth": FieldWeight(m=0.97, u=0.0003),
+    "genders": FieldWeight(m=0.98, u=0.5),
+    "postcodes": FieldWeight(m=0.85, u=0.0001),
+    "identifiers": FieldWeight(m=0.99, u=0.00001),
+}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def normalise_name(value: Optional[str]) -> str:
+    return "".join(char for char in (value or "").upper() if char.isalpha())
+
+
+def normalise_postcode(value: Optional[str]) -> str:
+    return "".join((value or "").upper().split())
+
+
+def soundex(name: str) -> str:
+    if not (name := normalise_name(name)):
+        return ""
+    encoded = name[0]
+    previous = SOUNDEX_CODES.get(name[0], "")
+    for char in name[1:]:
+        code = SOUNDEX_CODES.get(char, "")
+        if code and code != previous:
+            encoded += code
+        if char not in "HW":
+            previous = code
+    return (encoded + "000")[:4]
+
+
+def load_records(session: Session, yield_per: int = 10000) -> dict[int, LinkageRecord]:
+    records: dict[int, LinkageRecord] = {}
+
+    def record(patient_id: int) -> LinkageRecord:
+        if patient_id not in records:
+            records[patient_id] = LinkageRecord(patient_id)
+        return records[patient_id]
+
+    demographics = select(
+        PatientDemographic.patient_id,
+        PatientDemographic.first_name,
+        PatientDemographic.last_name,
+        PatientDemographic.date_of_birth,
+        PatientDemographic.gender,
+    ).execution_options(yield_per=yield_per)
+    for patient_id, first_name, last_name, date_of_birth, gender in session.exec(
+        demographics
+    ):
+        current = record(patient_id)
+        if first_name := normalise_name(first_name):
+            current.first_names.add(first_name)
+        if last_name := normalise_name(last_name):
+            current.last_names.add(last_name)
+        if date_of_birth is not None:
+            current.dates_of_birth.add(date_of_birth)
+        if gender is not None:
+            current.genders.add(gender)
+
+    addresses = select(
+        PatientAddress.patient_id, PatientAddress.postcode
+    ).execution_options(yield_per=yield_per)
+    for patient_id, postcode in session.exec(addresses):
+        if postcode := normalise_postcode(postcode):
+            record(patient_id).postcodes.add(postcode)
+
+    identifiers = select(
+        PatientIdentifier.patient_id,
+        PatientIdentifier.identifier_id,
+        PatientIdentifier.identifier,
+    ).execution_options(yield_per=yield_per)
+    for patient_id, identifier_id, identifier in session.exec(identifiers):
+        if identifier := "".join((identifier or "").upper().split()):
+            record(patient_id).identifiers.add((identifier_id, identifier))
+
+    return records
+
+
+def date_of_birth_keys(record: LinkageRecord) -> Iterator[str]:
+    for date_of_birth in record.dates_of_birth:
+        yield f"dob:{date_of_birth.isoformat()}"
+
+
+def postcode_keys(record: LinkageRecord) -> Iterator[str]:
+    for postcode in record.postcodes:
+        yield f"pc:{postcode}"
+
+
+def identifier_keys(record: LinkageRecord) -> Iterator[str]:
+    for identifier_id, identifier in record.identifiers:
+        yield f"id:{identifier_id}:{identifier}"
+
+
+def surname_year_keys(record: LinkageRecord) -> Iterator[str]:
+    for last_name in record.last_names:
+        for date_of_birth in record.dates_of_birth:
+            yield f"sx:{soundex(last_name)}:{date_of_birth.year}"
+
+
+BLOCKING_KEYS: tuple[Callable[[LinkageRecord], Iterable[str]], ...] = (
+    date_of_birth_keys,
+    postcode_keys,
+    identifier_keys,
+    surname_year_keys,
+)
+
+
+def candidate_pairs(
+    records: dict[int, LinkageRecord],
+    blocking_keys: Iterable[Callable[[LinkageRecord], Iterable[str]]] = BLOCKING_KEYS,
+    max_block_size: int = MAX_BLOCK_SIZE,
+) -> set[tuple[int, int]]:
+    blocks: defaultdict[str, list[int]] = defaultdict(list)
+    for blocking_key in blocking_keys:
+        for patient_id, record in records.items():
+            for key in set(blocking_key(record)):
+                blocks[key].append(patient_id)
+
+    # Oversized blocks (a shared default postcode, a common birthday) carry
+    # little evidence and would bring back the quadratic blow-up.
+    pairs: set[tuple[int, int]] = set()
+    for patient_ids in blocks.values():
+        if 1 < len(patient_ids) <= max_block_size:
+            pairs.update(combinations(sorted(patient_ids), 2))
+    return pairs
+
+
+def score_pair(
+    first: LinkageRecord,
+    second: LinkageRecord,
+    weights: dict[str, FieldWeight] = DEFAULT_WEIGHTS,
+) -> float:
+    score = 0.0
+    for name, weight in weights.items():
+        first_values, second_values = getattr(first, name), getattr(second, name)
+        if not first_values or not second_values:
+            continue
+        if first_values & second_values:
+            score += weight.agree
+        else:
+            score += weight.disagree
+    return score
+
+
+def _score_chunk(
+    records: dict[int, LinkageRecord],
+    pairs: list[tuple[int, int]],
+    weights: dict[str, FieldWeight],
+    threshold: float,
+) -> list[tuple[int, int, float]]:
+    matches = []
+    for first, second in pairs:
+        score = score_pair(records[first], records[second], weights)
+        if score >= threshold:
+            matches.append((first, second, score))
+    return matches
+
+
+def find_candidates(
+    records: dict[int, LinkageRecord],
+    threshold: float = 15.0,
+    weights: Optional[dict[str, FieldWeight]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 20000,
+    max_block_size: int = MAX_BLOCK_SIZE,
+) -> list[tuple[int, int, float]]:
+    weights = weights or DEFAULT_WEIGHTS
+    pairs = sorted(candidate_pairs(records, max_block_size=max_block_size))
+    chunks = [pairs[i : i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+    def chunk_records(chunk: list[tuple[int, int]]) -> dict[int, LinkageRecord]:
+        return {
+            patient_id: records[patient_id] for pair in chunk for patient_id in pair
+        }
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [
+            _score_chunk(chunk_records(chunk), chunk, weights, threshold)
+            for chunk in chunks
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _score_chunk, chunk_records(chunk), chunk, weights, threshold
+                )
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+
+    matches = [match for result in results for match in result]
+    matches.sort(key=lambda match: match[2], reverse=True)
+    return matches
+
+
+def save_candidates(
+    session: Session, candidates: Iterable[tuple[int, int, float]]
+) -> int:
+    existing = set(
+        session.exec(
+            select(
+                PatientLinkCandidate.patient_id,
+                PatientLinkCandidate.candidate_patient_id,
+            )
+        ).all()
+    )
+    new_candidates = [
+        PatientLinkCandidate(
+            patient_id=patient_id,
+            candidate_patient_id=candidate_patient_id,
+            match_score=match_score,
+        )
+        for patient_id, candidate_patient_id, match_score in candidates
+        if (patient_id, candidate_patient_id) not in existing
+    ]
+    session.add_all(new_candidates)
+    return len(new_candidates)
+
+
+def link_patients(
+    session: Session,
+    threshold: float = 15.0,
+    workers: Optional[int] = None,
+    max_block_size: int = MAX_BLOCK_SIZE,
+) -> int:
+    records = load_records(session)
+    return save_candidates(
+        session,
+        find_candidates(
+            records,
+            threshold=threshold,
+            workers=workers,
+            max_block_size=max_block_size,
+        ),
+    )
@@ -0,0 +1,123 @@
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+    joinedload,
+    raiseload,
+    selectinload,
+)
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+from sqlmodel import SQLModel
+
+# Strict loading: ORM queries get raiseload("*"), so touching a relationship
+# that was not loaded up front raises instead of issuing one query per row.
+# Relationships the caller needs are requested with loader_options(), whose
+# more specific options win over the wildcard.
+#
+#   enable_strict_loading(session)      # one session
+#   engine = strict_engine(engine)      # every session bound to the engine
+#   session.scalars(
+#       select(Medication).options(*loader_options(Medication, "drug", "patient"))
+#   )
+#
+# A statement can opt out with execution_options(strict_loading=False).
+#
+# Wide radar3 tables defer their detail columns behind a __summary__ read
+# model; list pages select just the summary columns with list_summaries().
+
+STRICT_LOADING = "strict_loading"
+
+
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    if not state.is_select or state.is_relationship_load or state.is_column_load:
+        return
+    strict = state.execution_options.get(STRICT_LOADING)
+    if strict is None:
+        bind = state.session.bind
+        strict = state.session.info.get(STRICT_LOADING) or (
+            bind is not None and bind.get_execution_options().get(STRICT_LOADING)
+        )
+    if strict:
+        state.statement = state.statement.options(raiseload("*"))
+
+
+def _listen() -> None:
+    if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+def enable_strict_loading(session: Session) -> None:
+    _listen()
+    session.info[STRICT_LOADING] = True
+
+
+def disable_strict_loading(session: Session) -> None:
+    session.info.pop(STRICT_LOADING, None)
+
+
+def strict_engine(engine: Engine) -> Engine:
+    """A copy of ``engine``, sharing its pool, whose sessions load strictly."""
+    _listen()
+    return engine.execution_options(**{STRICT_LOADING: True})
+
+
+def loader_options(model: Any, *paths: str) -> list[_AbstractLoad]:
+    """Eager loading options for ``paths`` of ``model`` (default all of its
+    relationships): selectinload for collections, joinedload for many-to-one,
+    inner joined when the foreign key is NOT NULL. Dotted paths such as
+    ``"patient.demographics"`` load through several relationships."""
+    paths = paths or tuple(inspect(model).relationships.keys())
+    options = []
+    for path in paths:
+        mapper, option = inspect(model), None
+        for key in path.split("."):
+            relationship = mapper.relationships[key]
+            attribute = getattr(mapper.class_, key)
+            if relationship.uselist:
+                option = (
+                    selectinload(attribute)
+                    if option is None
+                    else option.selectinload(attribute)
+                )
+            else:
+                innerjoin = all(
+                    not column.nullable for column in relationship.local_columns
+                )
+                option = (
+                    joinedload(attribute, innerjoin=innerjoin)
+                    if option is None
+                    else option.joinedload(attribute, innerjoin=innerjoin)
+                )
+            mapper = relationship.mapper
+        options.append(option)
+    return options
+
+
+def summary_columns(model: Any) -> list[Any]:
+    return [getattr(model, name) for name in model.__summary__.model_fields]
+
+
+def list_summaries(
+    session: Session,
+    model: Any,
+    *criteria: Any,
+    order_by: Optional[Any] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[SQLModel]:
+    """A page of ``model`` rows as its ``__summary__`` read model, fetching
+    only the summary columns. Pages are ordered by id unless ``order_by``."""
+    statement = (
+        select(*summary_columns(model))
+        .where(*criteria)
+        .order_by(model.id if order_by is None else order_by)
+        .limit(limit)
+        .offset(offset)
+    )
+    return [
+        model.__summary__.model_validate(row._mapping)
+        for row in session.execute(statement)
+    ]
@@ -0,0 +1,153 @@
+from itertools import combinations
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    MetaData,
+    Table,
+    delete,
+    func,
+    insert,
+    or_,
+    update,
+)
+from sqlmodel import Session, SQLModel
+
+from radar_models.consent import recompute
+from radar_models.episodes import rebuild_episodes
+
+# Repoints every column that references patient.id from the patients being
+# merged away to the patients being kept. References are discovered from the
+# metadata so new tables are picked up without touching this module. The
+# updates run through the session, so change capture (radar_models.cdc) sees
+# a merge like any other bulk update.
+
+PATIENT_MERGE_MAP = Table(
+    "patient_merge_map",
+    MetaData(),
+    Column("merge_patient_id", BigInteger(), primary_key=True),
+    Column("keep_patient_id", BigInteger(), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+# Tables computed from other patient data. Their rows for merged patients are
+# deleted rather than moved, since they may collide with the survivor's on
+# their keys, and the survivors' rows are rebuilt from the merged data.
+DERIVED: dict[str, Callable[[Session, list[int]], Any]] = {
+    "episode": rebuild_episodes,
+    "patient_consent_state": recompute,
+}
+
+
+def patient_references(
+    metadata: MetaData = SQLModel.metadata, target: str = "patient.id"
+) -> list[Column]:
+    # sorted_tables gives a stable dependency order, so concurrent merges take
+    # their row locks in the same sequence and cannot deadlock each other.
+    return [
+        foreign_key.parent
+        for table in metadata.sorted_tables
+        for foreign_key in sorted(
+            table.foreign_keys, key=lambda foreign_key: foreign_key.parent.name
+        )
+        if foreign_key.target_fullname == target
+    ]
+
+
+def self_references(
+    metadata: MetaData = SQLModel.metadata, target: str = "patient.id"
+) -> dict[Table, list[Column]]:
+    """Tables with more than one column referencing ``target``."""
+    columns: dict[Table, list[Column]] = {}
+    for column in patient_references(metadata, target):
+        columns.setdefault(column.table, []).append(column)
+    return {table: columns for table, columns in columns.items() if len(columns) > 1}
+
+
+def resolve_pairs(pairs: Iterable[tuple[int, int]]) -> dict[int, int]:
+    mapping: dict[int, int] = {}
+    for merge_patient_id, keep_patient_id in pairs:
+        if merge_patient_id == keep_patient_id:
+            raise ValueError(f"Cannot merge patient {merge_patient_id} into itself")
+        if mapping.get(merge_patient_id, keep_patient_id) != keep_patient_id:
+            raise ValueError(
+                f"Patient {merge_patient_id} is merged into more than one patient"
+            )
+        mapping[merge_patient_id] = keep_patient_id
+
+    # Collapse chains (a -> b, b -> c) so every row moves in a single update.
+    resolved = {}
+    for merge_patient_id, keep_patient_id in mapping.items():
+        seen = {merge_patient_id}
+        while keep_patient_id in mapping:
+            if keep_patient_id in seen:
+                raise ValueError(f"Merge cycle involving patient {keep_patient_id}")
+            seen.add(keep_patient_id)
+            keep_patient_id = mapping[keep_patient_id]
+        resolved[merge_patient_id] = keep_patient_id
+    return resolved
+
+
+def merge_patients(
+    session: Session,
+    pairs: Iterable[tuple[int, int]],
+    metadata: MetaData = SQLModel.metadata,
+    derived: dict[str, Callable[[Session, list[int]], Any]] = DERIVED,
+) -> dict[str, int]:
+    """Merge (merge_patient_id, keep_patient_id) pairs in the session's
+    transaction and return the number of rows moved per referencing column,
+    and deleted per table for rows left referencing the same patient twice
+    and for the merged patients' ``derived`` rows. The caller commits or
+    rolls back."""
+    mapping = resolve_pairs(pairs)
+    report: dict[str, int] = {}
+    if not mapping:
+        return report
+
+    connection = session.connection()
+    PATIENT_MERGE_MAP.create(connection)
+    connection.execute(
+        insert(PATIENT_MERGE_MAP),
+        [
+            {"merge_patient_id": merge_id, "keep_patient_id": keep_id}
+            for merge_id, keep_id in mapping.items()
+        ],
+    )
+    for column in patient_references(metadata):
+        if column.table.name in derived:
+            result = session.execute(
+                delete(column.table).where(
+                    column.in_(list(mapping))  # type: ignore[attr-defined]
+                )
+            )
+            report[f"{column.table.name} deleted"] = result.rowcount
+            continue
+        values = {column.name: PATIENT_MERGE_MAP.c.keep_patient_id}
+        if "version_id" in column.table.c:
+            # Invalidate in-flight optimistic edits of the moved rows.
+            values["version_id"] = column.table.c.version_id + 1
+            values["modified_date"] = func.now()
+        result = session.execute(
+            update(column.table)
+            .where(column == PATIENT_MERGE_MAP.c.merge_patient_id)
+            .values(values)
+        )
+        report[f"{column.table.name}.{column.name}"] = result.rowcount
+    PATIENT_MERGE_MAP.drop(connection)
+
+    # A row that linked a merged patient to its survivor now links the
+    # survivor to itself, e.g. a patient_link_candidate pair.
+    for table, columns in self_references(metadata).items():
+        result = session.execute(
+            delete(table).where(
+                or_(*(first == second for first, second in combinations(columns, 2)))
+            )
+        )
+        report[f"{table.name} self references"] = result.rowcount
+
+    survivors = sorted(set(mapping.values()))
+    for table in metadata.sorted_tables:
+        if table.name in derived:
+            derived[table.name](session, survivors)
+    return report
@@ -0,0 +1,576 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    Date,
+    DateTime,
+    Engine,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import CreateEnumType
+from sqlalchemy.schema import CreateIndex, CreateTable
+from radar_models import radar2, radar3
+
+# Compares two schemas (radar2 metadata, radar3 metadata or a reflected live
+# database) and turns the differences into an ordered, online-safe PostgreSQL
+# migration plan. Steps that would hold an ACCESS EXCLUSIVE lock for the
+# duration of a table scan or rewrite are split into a cheap catalog change
+# plus work that runs without blocking writers.
+
+RADAR2_TABLE_NAMES = {
+    "alport_clinical_pictures": "alport_assessment",
+    "biomarker_barcodes": "biomarker_barcode",
+    "biomarker_results": "biomarker_result",
+    "biomarker_samples": "biomarker_sample",
+    "biomarkers": "biomarker",
+    "codes": "code",
+    "consents": "consent",
+    "consultants": "consultant",
+    "countries": "country",
+    "country_ethnicities": "country_ethnicity",
+    "country_nationalities": "country_nationality",
+    "diagnoses": "diagnosis",
+    "diagnosis_codes": "diagnosis_code",
+    "dialysis": "dialysis",
+    "drug_groups": "drug_group",
+    "drugs": "drug",
+    "ethnicities": "ethnicity",
+    "family_histories": "family_history",
+    "fetal_anomaly_scans": "fetal_anomaly_scan",
+    "fetal_ultrasounds": "fetal_ultrasound",
+    "fuan_clinical_pictures": "fuan_assessment",
+    "genetics": "genetics",
+    "hnf1b_clinical_pictures": "hnf1b_assessment",
+    "hospitalisations": "hospitalisation",
+    "ins_clinical_pictures": "ins_assessment",
+    "ins_relapses": "ins_relapse",
+    "liver_diseases": "liver_disease",
+    "liver_imaging": "liver_imaging",
+    "liver_transplants": "liver_transplant",
+    "medications": "medication",
+    "mpgn_clinical_pictures": "mpgn_assessment",
+    "nationalities": "nationality",
+    "nephrectomies": "nephrectomy",
+    "nutrition": "nutrition",
+    "observations": "observation",
+    "pathology": "pathology",
+    "patient_addresses": "patient_address",
+    "patient_aliases": "patient_alias",
+    "patient_consents": "patient_consent",
+    "patient_consultants": "patient_consultant",
+    "patient_demographics": "patient_demographic",
+    "patient_diagnoses": "patient_diagnosis",
+    "patients": "patient",
+    "plasmapheresis": "plasmapheresis",
+    "posts": "post",
+    "pregnancies": "pregnancy",
+    "renal_imaging": "renal_imaging",
+    "renal_progressions": "renal_progression",
+    "results": "result",
+    "rituximab_baseline_assessment": "rituximab_baseline_assessment",
+    "rituximab_criteria": "rituximab_criteria",
+    "salt_wasting_clinical_features": "salt_wasting_clinical_feature",
+    "specialties": "specialty",
+    "transplant_biopsies": "transplant_biopsy",
+    "transplant_rejections": "transplant_rejection",
+    "transplants": "transplant",
+}
+
+# Phases, in the order they must run. Application code that writes new NOT
+# NULL columns is deployed after BACKFILL; until then old code may still
+# insert rows without them, so their checks are only added in VALIDATE.
+EXPAND = 1
+INDEX = 2
+CONSTRAIN = 3
+BACKFILL = 4
+VALIDATE = 5
+CONTRACT = 6
+
+DIALECT = postgresql.dialect()
+
+
+@dataclass(frozen=True)
+class Change:
+    kind: str
+    table: str
+    name: Optional[str] = None
+    element: Any = None
+    source: Any = None
+
+
+@dataclass(frozen=True)
+class MigrationStep:
+    phase: int
+    sql: str
+    transactional: bool = True
+    batched: bool = False
+    manual: bool = False
+
+
+def reflect(engine: Engine, schema: Optional[str] = None) -> MetaData:
+    metadata = MetaData()
+    metadata.reflect(bind=engine, schema=schema)
+    return metadata
+
+
+def type_name(column: Column) -> str:
+    return str(column.type.compile(dialect=DIALECT))
+
+
+def rewrites(source: Column, target: Column) -> bool:
+    """Whether changing ``source``'s type to ``target``'s makes PostgreSQL
+    rewrite or scan the table. Only widening a VARCHAR is catalog-only."""
+    if isinstance(source.type, String) and isinstance(target.type, String):
+        if isinstance(source.type, Enum) or isinstance(target.type, Enum):
+            return True
+        return target.type.length is not None and (
+            source.type.length is None or target.type.length < source.type.length
+        )
+    return True
+
+
+# Type affinities PostgreSQL casts between. Any type casts to and from text.
+CAST_FAMILIES = (
+    frozenset({Integer, Numeric}),
+    frozenset({Date, DateTime}),
+)
+
+
+def castable(source: Column, target: Column) -> bool:
+    """Whether PostgreSQL can cast ``source``'s values to ``target``'s type,
+    e.g. not UUID to BIGINT."""
+    affinities = {source.type._type_affinity, target.type._type_affinity}
+    return (
+        len(affinities) == 1
+        or String in affinities
+        or any(affinities <= family for family in CAST_FAMILIES)
+    )
+
+
+def foreign_key_signature(foreign_key: ForeignKey) -> tuple[str, str]:
+    return foreign_key.parent.name, foreign_key.target_fullname
+
+
+def diff_metadata(
+    source: MetaData,
+    target: MetaData,
+    table_names: Optional[dict[str, str]] = None,
+) -> list[Change]:
+    """List the changes that turn ``source`` into ``target``. ``table_names``
+    maps source table names to target names; unmapped tables keep their name."""
+    table_names = table_names or {}
+    renamed = {table_names.get(name, name): name for name in source.tables}
+    renames, changes = [], []
+
+    for table in target.sorted_tables:
+        if table.name not in renamed:
+            changes.append(Change("add_table", table.name, element=table))
+            continue
+        if renamed[table.name] != table.name:
+            renames.append(
+                Change("rename_table", table.name, source=renamed[table.name])
+            )
+        changes.extend(diff_table(source.tables[renamed[table.name]], table))
+
+    for source_name in source.tables:
+        if table_names.get(source_name, source_name) not in target.tables:
+            changes.append(Change("drop_table", source_name))
+    source_types = enum_types(source)
+    types = [
+        Change("add_type", "", name, enum)
+        for name, enum in sorted(enum_types(target).items())
+        if name not in source_types
+    ]
+    # Renames go first so later statements can use the target names, then
+    # types so tables and columns can use them.
+    return renames + types + changes
+
+
+def enum_types(metadata: MetaData) -> dict[str, Enum]:
+    """The named PostgreSQL enum types used by the columns of ``metadata``."""
+    return {
+        column.type.name: column.type
+        for table in metadata.tables.values()
+        for column in table.columns
+        if isinstance(column.type, Enum)
+        and column.type.native_enum
+        and column.type.name
+    }
+
+
+def index_key(index: Index) -> tuple[str, ...]:
+    # Expression indexes have no plain columns and are matched by name.
+    return tuple(column.name for column in index.columns) or (index.name or "",)
+
+
+def diff_table(source: Table, target: Table) -> list[Change]:
+    changes = []
+    for column in target.columns:
+        if column.name not in source.c:
+            changes.append(Change("add_column", target.name, column.name, column))
+            continue
+        source_column = source.c[column.name]
+        if type_name(source_column) != type_name(column):
+            changes.append(
+                Change("alter_type", target.name, column.name, column, source_column)
+            )
+        if source_column.nullable and not column.nullable:
+            changes.append(Change("set_not_null", target.name, column.name, column))
+    for column in source.columns:
+        if column.name not in target.c:
+            changes.append(Change("drop_column", target.name, column.name))
+
+    source_checks = {
+        constraint.name
+        for constraint in source.constraints
+        if isinstance(constraint, CheckConstraint)
+    }
+    for constraint in target.constraints:
+        if (
+            isinstance(constraint, CheckConstraint)
+            and constraint.name
+            and constraint.name not in source_checks
+        ):
+            changes.append(
+                Change("add_check", target.name, constraint.name, constraint)
+            )
+
+    source_indexes = {index_key(index) for index in source.indexes}
+    for index in target.indexes:
+        if index_key(index) not in source_indexes:
+            changes.append(Change("add_index", target.name, index.name, index))
+
+    source_foreign_keys = {
+        foreign_key_signature(foreign_key) for foreign_key in source.foreign_keys
+    }
+    for foreign_key in target.foreign_keys:
+        if foreign_key_signature(foreign_key) not in source_foreign_keys:
+            changes.append(
+                Change(
+                    "add_foreign_key", target.name, foreign_key.parent.name, foreign_key
+                )
+            )
+    return changes
+
+
+def diff_radar2_radar3() -> list[Change]:
+    return diff_metadata(radar2.metadata, radar3.SQLModel.metadata, RADAR2_TABLE_NAMES)
+
+
+def diff_database(
+    engine: Engine, target: MetaData = radar3.SQLModel.metadata
+) -> list[Change]:
+    return diff_metadata(reflect(engine), target)
+
+
+def server_default_sql(column: Column) -> str:
+    default = column.server_default.arg  # type: ignore[union-attr]
+    if isinstance(default, str):
+        return "'" + default.replace("'", "''") + "'"
+    return str(default.compile(dialect=DIALECT))
+
+
+def row_key(table: Table) -> str:
+    return (
+        table.primary_key.columns[0].name
+        if len(table.primary_key.columns) == 1
+        else "ctid"
+    )
+
+
+def backfill_statement(table: str, column: Column, value: str, batch_size: int) -> str:
+    key = row_key(column.table)
+    return (
+        f"UPDATE {table} SET {column.name} = {value} WHERE {key} IN "
+        f"(SELECT {key} FROM {table} WHERE {column.name} IS NULL LIMIT {batch_size})"
+    )
+
+
+def check_steps(
+    table: str, constraint: CheckConstraint, batch_size: int
+) -> list[MigrationStep]:
+    # NOT VALID stops new violations at once; rows already breaking the check
+    # are repaired with the constraint's info["repair"] assignments, or by
+    # hand, before it is validated.
+    condition = str(constraint.sqltext)
+    steps = [
+        MigrationStep(
+            CONSTRAIN,
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint.name} "
+            f"CHECK ({condition}) NOT VALID",
+        )
+    ]
+    if repair := constraint.info.get("repair"):
+        key = row_key(constraint.table)
+        steps.append(
+            MigrationStep(
+                BACKFILL,
+                f"UPDATE {table} SET {repair} WHERE {key} IN "
+                f"(SELECT {key} FROM {table} WHERE NOT ({condition}) "
+                f"LIMIT {batch_size})",
+                batched=True,
+            )
+        )
+    else:
+        steps.append(
+            MigrationStep(
+                BACKFILL,
+                f"-- fix {table} rows failing {constraint.name} before it is validated",
+                manual=True,
+            )
+        )
+    steps.append(
+        MigrationStep(
+            VALIDATE, f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint.name}"
+        )
+    )
+    return steps
+
+
+def not_null_steps(table: str, column: Column) -> list[MigrationStep]:
+    # SET NOT NULL scans the table under an exclusive lock unless a validated
+    # CHECK constraint already proves it, so validate the check first. Even a
+    # NOT VALID check applies to new rows, so it waits for the backfill.
+    check = f"{table}_{column.name}_not_null"
+    return [
+        MigrationStep(
+            VALIDATE,
+            f"ALTER TABLE {table} ADD CONSTRAINT {check} "
+            f"CHECK ({column.name} IS NOT NULL) NOT VALID",
+        ),
+        MigrationStep(VALIDATE, f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}"),
+        MigrationStep(
+            CONTRACT, f"ALTER TABLE {table} ALTER COLUMN {column.name} SET NOT NULL"
+        ),
+        MigrationStep(CONTRACT, f"ALTER TABLE {table} DROP CONSTRAINT {check}"),
+    ]
+
+
+def shadow_column_steps(
+    table: str, source: Column, target: Column, batch_size: int
+) -> list[MigrationStep]:
+    # Changing a type in place rewrites or scans the table under an ACCESS
+    # EXCLUSIVE lock. Instead the new type goes in a shadow column, kept in
+    # step by a trigger and backfilled in batches, and the columns are
+    # swapped at the end. Every step is manual: the swap has to carry over
+    # the column's indexes, constraints and foreign keys, and values with no
+    # cast to the new type must be mapped by hand.
+    name, new_type = source.name, type_name(target)
+    shadow, sync = f"{name}_new", f"{table}_{name}_sync"
+    steps = [
+        MigrationStep(
+            EXPAND, f"ALTER TABLE {table} ADD COLUMN {shadow} {new_type}", manual=True
+        )
+    ]
+    if castable(source, target):
+        key = row_key(source.table)
+        steps += [
+            MigrationStep(
+                EXPAND,
+                f"CREATE FUNCTION {sync}() RETURNS trigger LANGUAGE plpgsql AS "
+                f"$$ BEGIN NEW.{shadow} := NEW.{name}::{new_type}; RETURN NEW; END $$",
+                manual=True,
+            ),
+            MigrationStep(
+                EXPAND,
+                f"CREATE TRIGGER {sync} BEFORE INSERT OR UPDATE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {sync}()",
+                manual=True,
+            ),
+            MigrationStep(
+                BACKFILL,
+                f"UPDATE {table} SET {shadow} = {name}::{new_type} WHERE {key} IN "
+                f"(SELECT {key} FROM {table} WHERE {shadow} IS NULL "
+                f"AND {name} IS NOT NULL LIMIT {batch_size})",
+                batched=True,
+                manual=True,
+            ),
+        ]
+    else:
+        steps.append(
+            MigrationStep(
+                BACKFILL,
+                f"-- fill {table}.{shadow} and keep it in step with {name}: there "
+                f"is no cast from {type_name(source)} to {new_type}",
+                manual=True,
+            )
+        )
+    steps += [
+        MigrationStep(
+            CONTRACT,
+            f"-- recreate the indexes, constraints and foreign keys on "
+            f"{table}.{name} for {shadow} before the swap",
+            manual=True,
+        ),
+        MigrationStep(
+            CONTRACT, f"DROP TRIGGER IF EXISTS {sync} ON {table}", manual=True
+        ),
+        MigrationStep(CONTRACT, f"DROP FUNCTION IF EXISTS {sync}()", manual=True),
+        MigrationStep(CONTRACT, f"ALTER TABLE {table} DROP COLUMN {name}", manual=True),
+        MigrationStep(
+            CONTRACT,
+            f"ALTER TABLE {table} RENAME COLUMN {shadow} TO {name}",
+            manual=True,
+        ),
+    ]
+    return steps
+
+
+def create_index_sql(index: Index, concurrently: bool) -> str:
+    sql = str(CreateIndex(index).compile(dialect=DIALECT)).strip()
+    if concurrently:
+        sql = sql.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+    return sql
+
+
+def plan_migration(
+    changes: list[Change], batch_size: int = 10000, include_drops: bool = False
+) -> list[MigrationStep]:
+    steps = []
+    new_tables = {change.table for change in changes if change.kind == "add_table"}
+    checked_tables = {change.table for change in changes if change.kind == "add_check"}
+
+    for change in changes:
+        table = change.table
+        if change.kind == "add_type":
+            steps.append(
+                MigrationStep(
+                    EXPAND, str(CreateEnumType(change.element).compile(dialect=DIALECT))
+                )
+            )
+        elif change.kind == "add_table":
+            steps.append(
+                MigrationStep(
+                    EXPAND, str(CreateTable(change.element).compile(dialect=DIALECT))
+                )
+            )
+            # An empty table can be indexed inside the transaction.
+            steps.extend(
+                MigrationStep(EXPAND, create_index_sql(index, concurrently=False))
+                for index in change.element.indexes
+            )
+        elif change.kind == "rename_table":
+            steps.append(
+                MigrationStep(EXPAND, f"ALTER TABLE {change.source} RENAME TO {table}")
+            )
+        elif change.kind == "add_column":
+            column = change.element
+            # Added as nullable so the ALTER is a catalog-only change.
+            steps.append(
+                MigrationStep(
+                    EXPAND,
+                    f"ALTER TABLE {table} ADD COLUMN {column.name} {type_name(column)}",
+                )
+            )
+            if column.server_default is not None:
+                default = server_default_sql(column)
+                steps.append(
+                    MigrationStep(
+                        EXPAND,
+                        f"ALTER TABLE {table} ALTER COLUMN {column.name} "
+                        f"SET DEFAULT {default}",
+                    )
+                )
+                steps.append(
+                    MigrationStep(
+                        BACKFILL,
+                        backfill_statement(table, column, default, batch_size),
+                        batched=True,
+                    )
+                )
+            elif not column.nullable and not column.primary_key:
+                steps.append(
+                    MigrationStep(
+                        BACKFILL,
+                        f"-- backfill {table}.{column.name} before it can be NOT NULL",
+                        manual=True,
+                    )
+                )
+            if not column.nullable:
+                steps.extend(not_null_steps(table, column))
+        elif change.kind == "set_not_null":
+            steps.extend(not_null_steps(table, change.element))
+        elif change.kind == "alter_type":
+            if rewrites(change.source, change.element):
+                steps.extend(
+                    shadow_column_steps(
+                        table, change.source, change.element, batch_size
+                    )
+                )
+            else:
+                steps.append(
+                    MigrationStep(
+                        EXPAND,
+                        f"ALTER TABLE {table} ALTER COLUMN {change.name} "
+                        f"TYPE {type_name(change.element)}",
+                    )
+                )
+        elif change.kind == "add_check" and table not in new_tables:
+            steps.extend(check_steps(table, change.element, batch_size))
+        elif change.kind == "add_index" and table not in new_tables:
+            # An expression index can fail to build on rows a new check
+            # rejects, e.g. daterange(start, end) with start > end, so it
+            # waits for the repair and validation.
+            deferred = table in checked_tables and not change.element.columns
+            steps.append(
+                MigrationStep(
+                    VALIDATE if deferred else INDEX,
+                    create_index_sql(change.element, concurrently=True),
+                    transactional=False,
+                )
+            )
+        elif change.kind == "add_foreign_key" and table not in new_tables:
+            foreign_key = change.element
+            constraint = foreign_key.constraint.name or f"{table}_{change.name}_fkey"
+            referred = foreign_key.column
+            steps.append(
+                MigrationStep(
+                    CONSTRAIN,
+                    f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+                    f"FOREIGN KEY ({change.name}) REFERENCES "
+                    f"{referred.table.name} ({referred.name}) NOT VALID",
+                )
+            )
+            steps.append(
+                MigrationStep(
+                    VALIDATE, f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}"
+                )
+            )
+        elif change.kind == "drop_column" and include_drops:
+            steps.append(
+                MigrationStep(
+                    CONTRACT, f"ALTER TABLE {table} DROP COLUMN {change.name}"
+                )
+            )
+        elif change.kind == "drop_table" and include_drops:
+            steps.append(MigrationStep(CONTRACT, f"DROP TABLE {table}"))
+
+    return sorted(steps, key=lambda step: step.phase)
+
+
+def render(steps: list[MigrationStep], lock_timeout: str = "5s") -> str:
+    """Render a plan as a psql script. Every statement gives up after
+    ``lock_timeout`` rather than queueing writers behind it."""
+    lines = [f"SET lock_timeout = '{lock_timeout}';"]
+    for step in steps:
+        if not step.transactional:
+            lines.append("-- run outside a transaction block")
+        if step.batched:
+            lines.append("-- repeat until 0 rows are updated")
+        if step.manual:
+            # Commented out so the script never runs them unreviewed.
+            sql = step.sql.strip()
+            lines.append(sql if sql.startswith("--") else f"-- {sql};")
+            continue
+        lines.append(f"{step.sql.strip()};")
+    return "\n".join(lines) + "\n"
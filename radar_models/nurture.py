@@ -0,0 +1,116 @@
+from array import array
+from typing import Any, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from radar_models.radar2 import (
+    NurtureSample,
+    NurtureSampleShortfall,
+    NurtureSamplesOption,
+)
+
+# Reconciles collected NURTuRE aliquots against the protocol each sample was
+# taken under. Counts are loaded as one flat integer matrix (one row per
+# sample, one column per aliquot), shortfalls are computed in a single pass
+# and the result is written to nurture_sample_shortfalls for the dashboard.
+
+ALIQUOTS = (
+    "epa",
+    "epb",
+    "lpa",
+    "lpb",
+    "uc",
+    "ub",
+    "ud",
+    "fub",
+    "sc",
+    "sa",
+    "sb",
+    "rna",
+    "wb",
+)
+
+
+def load_protocols(session: Session) -> dict[str, array]:
+    columns = [getattr(NurtureSamplesOption, aliquot) for aliquot in ALIQUOTS]
+    return {
+        protocol_id: array("i", (count or 0 for count in counts))
+        for protocol_id, *counts in session.execute(
+            select(NurtureSamplesOption.id, *columns)
+        )
+    }
+
+
+def load_samples(
+    session: Session, patient_ids: Optional[list[int]] = None
+) -> tuple[list[tuple[Any, int, Any, str]], array]:
+    """Return (sample id, patient id, taken on, protocol id) per sample and the
+    matching row-major aliquot count matrix."""
+    columns = [getattr(NurtureSample, aliquot) for aliquot in ALIQUOTS]
+    query = select(
+        NurtureSample.id,
+        NurtureSample.patient_id,
+        NurtureSample.taken_on,
+        NurtureSample.protocol_id,
+        *columns,
+    )
+    if patient_ids is not None:
+        query = query.where(NurtureSample.patient_id.in_(patient_ids))
+
+    keys = []
+    counts = array("i")
+    for sample_id, patient_id, taken_on, protocol_id, *row in session.execute(
+        query.execution_options(yield_per=10000)
+    ):
+        keys.append((sample_id, patient_id, taken_on, protocol_id))
+        counts.extend(count or 0 for count in row)
+    return keys, counts
+
+
+def shortfalls(
+    keys: list[tuple[Any, int, Any, str]],
+    counts: array,
+    protocols: dict[str, array],
+) -> array:
+    width = len(ALIQUOTS)
+    missing = array("i", bytes(counts.itemsize * len(counts)))
+    empty = array("i", [0] * width)
+    for row, (_, _, _, protocol_id) in enumerate(keys):
+        expected = protocols.get(protocol_id, empty)
+        offset = row * width
+        for column in range(width):
+            owed = expected[column] - counts[offset + column]
+            if owed > 0:
+                missing[offset + column] = owed
+    return missing
+
+
+def reconcile(session: Session, patient_ids: Optional[list[int]] = None) -> int:
+    """Recompute the shortfall summary, for everyone or just ``patient_ids``,
+    in the session's transaction. Returns the number of incomplete samples."""
+    keys, counts = load_samples(session, patient_ids)
+    missing = shortfalls(keys, counts, load_protocols(session))
+
+    width = len(ALIQUOTS)
+    rows = []
+    for row, (sample_id, patient_id, taken_on, protocol_id) in enumerate(keys):
+        owed = missing[row * width : (row + 1) * width]
+        rows.append(
+            {
+                "sample_id": sample_id,
+                "patient_id": patient_id,
+                "taken_on": taken_on,
+                "protocol_id": protocol_id,
+                **dict(zip(ALIQUOTS, owed)),
+                "total": sum(owed),
+            }
+        )
+
+    clear = delete(NurtureSampleShortfall)
+    if patient_ids is not None:
+        clear = clear.where(NurtureSampleShortfall.patient_id.in_(patient_ids))
+    session.execute(clear)
+    if rows:
+        session.execute(insert(NurtureSampleShortfall), rows)
+    return sum(1 for row in rows if row["total"])
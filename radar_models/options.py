@@ -0,0 +1,221 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from sqlmodel import Session, create_engine, func, select
+
+from radar_models.radar3 import Option, OptionRead
+
+# In-memory snapshot of the option table, grouped by option_group, so labels
+# and store values resolve without joining option. A snapshot can be built
+# from the database or compiled into a generated module that imports without
+# a database connection. Its version is a hash of the option rows, so
+# workers can detect a changed table and swap in a fresh snapshot. Workers
+# only re-read the rows when a cheap probe of the table (row count, latest
+# modified_date and the sum of the optimistic lock versions) has changed.
+
+OptionRow = tuple[int, str, str, str]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OptionGroup:
+    name: str
+    by_id: Mapping[int, OptionRead]
+    by_value: Mapping[str, OptionRead]
+
+    def label(self, option_id: int) -> str:
+        return self.by_id[option_id].display_label
+
+    def store_value(self, option_id: int) -> str:
+        return self.by_id[option_id].store_value
+
+    def id_of(self, store_value: str) -> int:
+        return self.by_value[store_value].id
+
+    def label_of(self, store_value: str) -> str:
+        return self.by_value[store_value].display_label
+
+
+@dataclass(frozen=True)
+class OptionSnapshot:
+    version: str
+    groups: Mapping[str, OptionGroup]
+    by_id: Mapping[int, OptionRead]
+
+    def __getitem__(self, option_group: str) -> OptionGroup:
+        return self.groups[option_group]
+
+    def label(self, option_id: int) -> str:
+        return self.by_id[option_id].display_label
+
+    def store_value(self, option_id: int) -> str:
+        return self.by_id[option_id].store_value
+
+
+def option_rows(session: Session) -> list[OptionRow]:
+    return [
+        (option_id, option_group, store_value, display_label)
+        for option_id, option_group, store_value, display_label in session.exec(
+            select(
+                Option.id, Option.option_group, Option.store_value, Option.display_label
+            ).order_by(Option.id)
+        )
+    ]
+
+
+def table_probe(session: Session) -> tuple:
+    return tuple(
+        session.exec(
+            select(
+                func.count(),
+                func.max(Option.modified_date),
+                func.sum(Option.version_id),
+            )
+        ).one()
+    )
+
+
+def rows_version(rows: Iterable[OptionRow]) -> str:
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(repr(row).encode())
+    return digest.hexdigest()[:16]
+
+
+def build_snapshot(
+    rows: Iterable[OptionRow], version: Optional[str] = None
+) -> OptionSnapshot:
+    rows = list(rows)
+    by_id: dict[int, OptionRead] = {}
+    groups: dict[str, tuple[dict[int, OptionRead], dict[str, OptionRead]]] = {}
+    for option_id, option_group, store_value, display_label in rows:
+        option = OptionRead(
+            id=option_id,
+            option_group=option_group,
+            store_value=store_value,
+            display_label=display_label,
+        )
+        group_by_id, group_by_value = groups.setdefault(option_group, ({}, {}))
+        if store_value in group_by_value:
+            # option_group_store_value_idx prevents this; a database without
+            # the index keeps the first option rather than failing every
+            # worker's refresh.
+            logger.warning(
+                "Skipping option %s: duplicate store value %r in option group %r",
+                option_id,
+                store_value,
+                option_group,
+            )
+            continue
+        by_id[option_id] = group_by_id[option_id] = group_by_value[store_value] = option
+    return OptionSnapshot(
+        version=version or rows_version(rows),
+        groups=MappingProxyType(
+            {
+                name: OptionGroup(
+                    name,
+                    MappingProxyType(group_by_id),
+                    MappingProxyType(group_by_value),
+                )
+                for name, (group_by_id, group_by_value) in groups.items()
+            }
+        ),
+        by_id=MappingProxyType(by_id),
+    )
+
+
+def load_snapshot(session: Session) -> OptionSnapshot:
+    return build_snapshot(option_rows(session))
+
+
+def write_module(rows: Iterable[OptionRow], path: Path) -> str:
+    """Write ``rows`` as a Python module holding VERSION and OPTIONS literals
+    and return the version."""
+    rows = list(rows)
+    version = rows_version(rows)
+    lines = [
+        "# Generated by radar_models.options; do not edit.",
+        f"VERSION = {version!r}",
+        "OPTIONS = (",
+        *(f"    {row!r}," for row in rows),
+        ")",
+        "",
+    ]
+    path = Path(path)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text("\n".join(lines))
+    temporary.replace(path)
+    return version
+
+
+def read_module(path: Path) -> OptionSnapshot:
+    spec = importlib.util.spec_from_file_location("radar_options_snapshot", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load option snapshot from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return build_snapshot(module.OPTIONS, module.VERSION)
+
+
+class OptionRegistry:
+    def __init__(
+        self,
+        snapshot: Optional[OptionSnapshot] = None,
+        max_age: Optional[float] = 60,
+    ):
+        self.snapshot = snapshot
+        self.max_age = max_age
+        self.checked_at = time.monotonic() if snapshot is not None else 0.0
+        self.probe: Optional[tuple] = None
+
+    def refresh(self, session: Session) -> OptionSnapshot:
+        """Reload the snapshot if the option table no longer matches its
+        version. The rows are only read when the table probe has changed.
+        The swap is a single assignment, so readers on other threads see
+        either the old or the new snapshot."""
+        probe = table_probe(session)
+        if self.snapshot is None or probe != self.probe:
+            rows = option_rows(session)
+            version = rows_version(rows)
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = build_snapshot(rows, version)
+            self.probe = probe
+        self.checked_at = time.monotonic()
+        return self.snapshot
+
+    def is_stale(self) -> bool:
+        return self.snapshot is None or (
+            self.max_age is not None
+            and time.monotonic() - self.checked_at > self.max_age
+        )
+
+    def current(self, session: Optional[Session] = None) -> OptionSnapshot:
+        """Return the snapshot, rechecking the database through ``session``
+        once ``max_age`` seconds have passed since the last check."""
+        if session is not None and self.is_stale():
+            return self.refresh(session)
+        if self.snapshot is None:
+            raise LookupError("No option snapshot loaded")
+        return self.snapshot
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        raise SystemExit("usage: python -m radar_models.options OUTPUT.py")
+    engine = create_engine(os.environ["DATABASE_URL"])
+    with Session(engine) as session:
+        version = write_module(option_rows(session), Path(sys.argv[1]))
+    print(f"wrote option snapshot {version} to {sys.argv[1]}")
+
+
+if __name__ == "__main__":
+    main()
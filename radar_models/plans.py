@@ -0,0 +1,121 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Connection
+
+from radar_models.consent import consented
+from radar_models.radar3 import CohortPatient, Medication, Patient, Result
+
+# Canonical queries whose PostgreSQL plans are checked for regressions. Each
+# is explained twice: as planned, against a cost budget, and with
+# enable_seqscan off, where a sequential scan that remains means no index can
+# serve the query at all, whatever the size of the data. Cost budgets are
+# about twice the costs PostgreSQL 16 planned against the synthetic data of
+# tests/plans_test.py (2000 patients, seed 0).
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    name: str
+    statement: Any
+    parameters: dict[str, Any]
+    max_cost: float
+    seq_scans_allowed: frozenset[str] = field(default_factory=frozenset)
+
+
+CATALOGUE = (
+    PlanCheck(
+        "patient page results",
+        select(Result)
+        .where(Result.patient_id == bindparam("patient_id"))
+        .order_by(Result.result_date.desc())  # type: ignore[union-attr]
+        .limit(100),
+        {"patient_id": 1},
+        200,
+    ),
+    PlanCheck(
+        "patient page medications",
+        select(Medication).where(Medication.patient_id == bindparam("patient_id")),
+        {"patient_id": 1},
+        30,
+    ),
+    PlanCheck(
+        "cohort list",
+        select(Patient)
+        .join(CohortPatient, CohortPatient.patient_id == Patient.id)  # type: ignore[arg-type]
+        .where(
+            CohortPatient.cohort_id == bindparam("cohort_id"),
+            CohortPatient.removed_date.is_(None),  # type: ignore[union-attr]
+        ),
+        {"cohort_id": 1},
+        170,
+    ),
+    PlanCheck(
+        "lab trend",
+        select(Result.result_date, Result.result_value)
+        .where(
+            Result.patient_id == bindparam("patient_id"),
+            Result.observation_id == bindparam("observation_id"),
+        )
+        .order_by(Result.result_date),
+        {"patient_id": 1, "observation_id": 1},
+        25,
+    ),
+    PlanCheck(
+        "export scan",
+        select(Result)
+        .join(CohortPatient, CohortPatient.patient_id == Result.patient_id)  # type: ignore[arg-type]
+        .where(
+            CohortPatient.cohort_id == bindparam("cohort_id"),
+            consented(Result.patient_id),
+        ),
+        {"cohort_id": 1},
+        900,
+    ),
+)
+
+
+def explain(connection: Connection, statement: Any, parameters: dict[str, Any]) -> dict:
+    """The root node of ``EXPLAIN (FORMAT JSON)`` for ``statement``."""
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    ((document,),) = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.construct_params(parameters)
+    ).all()
+    return document[0]["Plan"]
+
+
+def nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from nodes(child)
+
+
+def seq_scans(plan: dict, allowed: frozenset[str] = frozenset()) -> list[str]:
+    return [
+        node["Relation Name"]
+        for node in nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] not in allowed
+    ]
+
+
+def check_plan(connection: Connection, check: PlanCheck) -> list[str]:
+    """Problems with the plans for ``check``, empty if there are none."""
+    problems = []
+    plan = explain(connection, check.statement, check.parameters)
+    if plan["Total Cost"] > check.max_cost:
+        problems.append(
+            f"{check.name}: cost {plan['Total Cost']} exceeds {check.max_cost}"
+        )
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    try:
+        plan = explain(connection, check.statement, check.parameters)
+    finally:
+        connection.exec_driver_sql("RESET enable_seqscan")
+    problems += [
+        f"{check.name}: sequential scan on {table}"
+        for table in seq_scans(plan, check.seq_scans_allowed)
+    ]
+    return problems
@@ -0,0 +1,63 @@
+from typing import Any, Optional
+
+from sqlalchemy import JSON, BigInteger, Integer, String, Text, Uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import TypeEngine
+
+# PostgreSQL column types and server defaults with stand-ins for other
+# databases, so radar2 and radar3 can be created on SQLite for tests while
+# PostgreSQL still gets exactly the production DDL. radar2 imports JSONB,
+# INET, UUID and ARRAY from here in place of the PostgreSQL dialect.
+
+# BIGINT keys do not autoincrement on SQLite, only INTEGER PRIMARY KEY does.
+BIGINT_KEY = BigInteger().with_variant(Integer(), "sqlite")
+
+INET = postgresql.INET().with_variant(String(), "sqlite")
+
+UUID = postgresql.UUID().with_variant(Uuid(), "sqlite")
+
+
+def JSONB(astext_type: Optional[TypeEngine] = None) -> TypeEngine:
+    return postgresql.JSONB(astext_type=astext_type or Text()).with_variant(
+        JSON(), "sqlite"
+    )
+
+
+def ARRAY(item_type: Any) -> TypeEngine:
+    return postgresql.ARRAY(item_type).with_variant(JSON(), "sqlite")
+
+
+class PostgresDefault(ColumnElement):
+    """A server default in PostgreSQL syntax, rendered as ``other`` (default
+    NULL) elsewhere."""
+
+    inherit_cache = False
+
+    def __init__(self, sql: str, other: str = "NULL"):
+        self.sql = sql
+        self.other = other
+
+
+@compiles(PostgresDefault)
+def _compile_other(element: PostgresDefault, compiler: SQLCompiler, **kw: Any) -> str:
+    return element.other
+
+
+@compiles(PostgresDefault, "postgresql")
+def _compile_postgresql(
+    element: PostgresDefault, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return element.sql
+
+
+def nextval(sequence: str) -> PostgresDefault:
+    """``nextval('sequence'::regclass)``; NULL elsewhere, where an INTEGER
+    PRIMARY KEY is assigned a rowid."""
+    return PostgresDefault(f"nextval('{sequence}'::regclass)")
+
+
+def uuid_generate_v4() -> PostgresDefault:
+    return PostgresDefault("uuid_generate_v4()", "(lower(hex(randomblob(16))))")
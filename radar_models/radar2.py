@@ -1,6 +1,5 @@
 # coding: utf-8
 from sqlalchemy import (
-    ARRAY,
     Boolean,
     CheckConstraint,
     Column,
@@ -15,12 +14,22 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    func,
     text,
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import INET, JSONB, UUID
 from sqlalchemy.ext.declarative import declarative_base
 
+from radar_models.portable import (
+    ARRAY,
+    INET,
+    JSONB,
+    UUID,
+    PostgresDefault,
+    nextval,
+    uuid_generate_v4,
+)
+
 Base = declarative_base()
 metadata = Base.metadata
 
@@ -31,7 +40,7 @@ class Biomarker(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('biomarkers_id_seq'::regclass)"),
+        server_default=nextval("biomarkers_id_seq"),
     )
     name = Column(String(100), nullable=False)
     type = Column(String(100))
@@ -42,14 +51,14 @@ class Code(Base):
     __table_args__ = (
         CheckConstraint(
             "(((system)::text = 'ICD-10'::text) AND ((code)::text ~ similar_escape('[A-Z][0-9][0-9](\\.[0-9])?'::text, NULL::text))) OR (((system)::text = 'SNOMED CT'::text) AND ((code)::text ~ similar_escape('[1-9][0-9]*'::text, NULL::text))) OR (((system)::text = 'ERA-EDTA PRD'::text) AND ((code)::text ~ similar_escape('[1-9][0-9]*'::text, NULL::text)))"
-        ),
+        ).ddl_if(dialect="postgresql"),
         Index("codes_system_code_idx", "system", "code", unique=True),
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('codes_id_seq'::regclass)"),
+        server_default=nextval("codes_id_seq"),
     )
     system = Column(String, nullable=False)
     code = Column(String, nullable=False)
@@ -62,7 +71,7 @@ class Consent(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('consents_id_seq'::regclass)"),
+        server_default=nextval("consents_id_seq"),
     )
     code = Column(String(50), nullable=False)
     label = Column(String)
@@ -92,7 +101,7 @@ class Diagnose(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('diagnoses_id_seq'::regclass)"),
+        server_default=nextval("diagnoses_id_seq"),
     )
     name = Column(String, nullable=False)
     retired = Column(Boolean, nullable=False, server_default=text("false"))
@@ -104,7 +113,7 @@ class DrugGroup(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('drug_groups_id_seq'::regclass)"),
+        server_default=nextval("drug_groups_id_seq"),
     )
     name = Column(String, nullable=False, unique=True)
     parent_drug_group_id = Column(ForeignKey("drug_groups.id"))
@@ -118,7 +127,7 @@ class Ethnicity(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('ethnicities_id_seq'::regclass)"),
+        server_default=nextval("ethnicities_id_seq"),
     )
     code = Column(String(10))
     label = Column(String)
@@ -129,14 +138,14 @@ class Form(Base):
     __table_args__ = (
         CheckConstraint(
             "(slug)::text ~ similar_escape('([a-z0-9]+-)*[a-z0-9]+'::text, NULL::text)"
-        ),
+        ).ddl_if(dialect="postgresql"),
         {"comment": "data definitions for forms"},
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('forms_id_seq'::regclass)"),
+        server_default=nextval("forms_id_seq"),
     )
     name = Column(String, nullable=False)
     slug = Column(String, nullable=False, unique=True)
@@ -153,11 +162,9 @@ class Log(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('logs_id_seq'::regclass)"),
-    )
-    date = Column(
-        DateTime(True), nullable=False, index=True, server_default=text("now()")
+        server_default=nextval("logs_id_seq"),
     )
+    date = Column(DateTime(True), nullable=False, index=True, server_default=func.now())
     type = Column(String, nullable=False, index=True)
     user_id = Column(Integer, index=True)
     data = Column(JSONB(astext_type=Text()))
@@ -172,7 +179,7 @@ class Nationality(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('nationalities_id_seq'::regclass)"),
+        server_default=nextval("nationalities_id_seq"),
     )
     label = Column(String)
 
@@ -246,37 +253,43 @@ class Observation(Base):
     __table_args__ = (
         CheckConstraint(
             "((value_type = 'ENUM'::observation_value_type) AND (options IS NOT NULL)) OR ((value_type <> 'ENUM'::observation_value_type) AND (options IS NULL))"
+        ).ddl_if(dialect="postgresql"),
+        CheckConstraint("(max_length IS NULL) OR (max_length > 0)").ddl_if(
+            dialect="postgresql"
         ),
-        CheckConstraint("(max_length IS NULL) OR (max_length > 0)"),
         CheckConstraint(
             "(max_length IS NULL) OR (value_type = 'STRING'::observation_value_type)"
-        ),
+        ).ddl_if(dialect="postgresql"),
         CheckConstraint(
             "(max_value IS NULL) OR (value_type = ANY (ARRAY['REAL'::observation_value_type, 'INTEGER'::observation_value_type]))"
-        ),
+        ).ddl_if(dialect="postgresql"),
         CheckConstraint(
             "(min_length IS NULL) OR (max_length IS NULL) OR (max_length >= min_length)"
+        ).ddl_if(dialect="postgresql"),
+        CheckConstraint("(min_length IS NULL) OR (min_length > 0)").ddl_if(
+            dialect="postgresql"
         ),
-        CheckConstraint("(min_length IS NULL) OR (min_length > 0)"),
         CheckConstraint(
             "(min_length IS NULL) OR (value_type = 'STRING'::observation_value_type)"
-        ),
+        ).ddl_if(dialect="postgresql"),
         CheckConstraint(
             "(min_value IS NULL) OR (max_value IS NULL) OR (max_value >= min_value)"
-        ),
+        ).ddl_if(dialect="postgresql"),
         CheckConstraint(
             "(min_value IS NULL) OR (value_type = ANY (ARRAY['REAL'::observation_value_type, 'INTEGER'::observation_value_type]))"
-        ),
+        ).ddl_if(dialect="postgresql"),
         CheckConstraint(
             "(options IS NULL) OR ((COALESCE(array_length(options, 1), 0) > 0) AND ((array_length(options, 1) %% 2) = 0))"
+        ).ddl_if(dialect="postgresql"),
+        CheckConstraint("(units IS NULL) OR (units <> ''::text)").ddl_if(
+            dialect="postgresql"
         ),
-        CheckConstraint("(units IS NULL) OR (units <> ''::text)"),
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('observations_id_seq'::regclass)"),
+        server_default=nextval("observations_id_seq"),
     )
     name = Column(String, nullable=False)
     short_name = Column(String, nullable=False)
@@ -309,7 +322,7 @@ class Specialty(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('specialties_id_seq'::regclass)"),
+        server_default=nextval("specialties_id_seq"),
     )
     name = Column(String, nullable=False, unique=True)
 
@@ -340,7 +353,7 @@ class User(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('users_id_seq'::regclass)"),
+        server_default=nextval("users_id_seq"),
     )
     username = Column(String, nullable=False, index=True)
     password = Column(String)
@@ -358,8 +371,8 @@ class User(Base):
     )
     created_user_id = Column(ForeignKey("users.id"))
     modified_user_id = Column(ForeignKey("users.id"))
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", remote_side=[id], primaryjoin="User.created_user_id == User.id"
@@ -492,7 +505,7 @@ class Consultant(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('consultants_id_seq'::regclass)"),
+        server_default=nextval("consultants_id_seq"),
     )
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
@@ -510,7 +523,7 @@ class CountryEthnicity(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('country_ethnicities_id_seq'::regclass)"),
+        server_default=nextval("country_ethnicities_id_seq"),
     )
     ethnicity_id = Column(ForeignKey("ethnicities.id"))
     country_code = Column(ForeignKey("countries.code"))
@@ -525,7 +538,7 @@ class CountryNationality(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('country_nationalities_id_seq'::regclass)"),
+        server_default=nextval("country_nationalities_id_seq"),
     )
     nationality_id = Column(ForeignKey("nationalities.id"))
     country_code = Column(ForeignKey("countries.code"))
@@ -545,7 +558,7 @@ class DiagnosisCode(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('diagnosis_codes_id_seq'::regclass)"),
+        server_default=nextval("diagnosis_codes_id_seq"),
     )
     diagnosis_id = Column(
         ForeignKey("diagnoses.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -565,7 +578,7 @@ class Drug(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('drugs_id_seq'::regclass)"),
+        server_default=nextval("drugs_id_seq"),
     )
     name = Column(String, nullable=False, unique=True)
     drug_group_id = Column(ForeignKey("drug_groups.id"))
@@ -578,14 +591,14 @@ class Group(Base):
     __table_args__ = (
         CheckConstraint(
             "(type <> 'COHORT'::group_type) OR (parent_group_id IS NOT NULL)"
-        ),
+        ).ddl_if(dialect="postgresql"),
         Index("groups_code_type_idx", "code", "type", unique=True),
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('groups_id_seq'::regclass)"),
+        server_default=nextval("groups_id_seq"),
     )
     type = Column(
         Enum("COHORT", "HOSPITAL", "OTHER", "SYSTEM", name="group_type"), nullable=False
@@ -604,7 +617,10 @@ class Group(Base):
 
     country = relationship("Country")
     parent_group = relationship("Group", remote_side=[id])
-    group_antibodies = relationship('GroupAntibody',back_populates='group',cascade='all, delete-orphan')
+    group_antibodies = relationship(
+        "GroupAntibody", back_populates="group", cascade="all, delete-orphan"
+    )
+
 
 class Patient(Base):
     __tablename__ = "patients"
@@ -612,9 +628,9 @@ class Patient(Base):
     id = Column(Integer, primary_key=True)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     test = Column(Boolean, nullable=False, server_default=text("false"))
     control = Column(Boolean, nullable=False, server_default=text("false"))
 
@@ -632,15 +648,15 @@ class Post(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('posts_id_seq'::regclass)"),
+        server_default=nextval("posts_id_seq"),
     )
     title = Column(Text, nullable=False)
     published_date = Column(DateTime(True), nullable=False)
     body = Column(Text, nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship("User", primaryjoin="Post.created_user_id == User.id")
     modified_user = relationship("User", primaryjoin="Post.modified_user_id == User.id")
@@ -652,7 +668,7 @@ class UserSession(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('user_sessions_id_seq'::regclass)"),
+        server_default=nextval("user_sessions_id_seq"),
     )
     user_id = Column(
         ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -669,7 +685,7 @@ class UserSession(Base):
 class AlportClinicalPicture(Base):
     __tablename__ = "alport_clinical_pictures"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -680,9 +696,9 @@ class AlportClinicalPicture(Base):
     deafness_date = Column(Date)
     hearing_aid_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="AlportClinicalPicture.created_user_id == User.id"
@@ -699,10 +715,10 @@ class BiomarkerBarcode(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('biomarker_barcodes_id_seq'::regclass)"),
+        server_default=nextval("biomarker_barcodes_id_seq"),
     )
     pat_id = Column(ForeignKey("patients.id"))
-    barcode = Column(String(100))
+    barcode = Column(String(100), index=True)
     sample_date = Column(DateTime)
 
     pat = relationship("Patient")
@@ -711,7 +727,7 @@ class BiomarkerBarcode(Base):
 class CurrentMedication(Base):
     __tablename__ = "current_medications"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -727,9 +743,9 @@ class CurrentMedication(Base):
     drug_text = Column(String)
     dose_text = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="CurrentMedication.created_user_id == User.id"
@@ -745,7 +761,7 @@ class CurrentMedication(Base):
 class Dialysi(Base):
     __tablename__ = "dialysis"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -757,9 +773,9 @@ class Dialysi(Base):
     to_date = Column(Date)
     modality = Column(Integer, nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Dialysi.created_user_id == User.id"
@@ -775,7 +791,7 @@ class Entry(Base):
     __tablename__ = "entries"
     __table_args__ = {"comment": "data entered via specific form definitions"}
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -784,9 +800,9 @@ class Entry(Base):
     form_id = Column(ForeignKey("forms.id"), nullable=False)
     data = Column(JSONB(astext_type=Text()), nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship("User", primaryjoin="Entry.created_user_id == User.id")
     form = relationship("Form")
@@ -804,7 +820,7 @@ class FamilyHistory(Base):
         ),
     )
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -815,9 +831,9 @@ class FamilyHistory(Base):
     family_history = Column(Boolean)
     other_family_history = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="FamilyHistory.created_user_id == User.id"
@@ -832,7 +848,7 @@ class FamilyHistory(Base):
 class FetalAnomalyScan(Base):
     __tablename__ = "fetal_anomaly_scans"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -848,9 +864,9 @@ class FetalAnomalyScan(Base):
     left_anomaly_details = Column(String)
     left_ultrasound_details = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     hypoplasia = Column(Boolean)
     echogenicity = Column(Boolean)
     hepatic_abnormalities = Column(Boolean)
@@ -873,7 +889,7 @@ class FetalAnomalyScan(Base):
 class FetalUltrasound(Base):
     __tablename__ = "fetal_ultrasounds"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -890,9 +906,9 @@ class FetalUltrasound(Base):
     liquor_volume = Column(String)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="FetalUltrasound.created_user_id == User.id"
@@ -907,7 +923,7 @@ class FetalUltrasound(Base):
 class FuanClinicalPicture(Base):
     __tablename__ = "fuan_clinical_pictures"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -922,9 +938,9 @@ class FuanClinicalPicture(Base):
     uti = Column(Boolean)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="FuanClinicalPicture.created_user_id == User.id"
@@ -938,7 +954,7 @@ class FuanClinicalPicture(Base):
 class Genetic(Base):
     __tablename__ = "genetics"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -952,9 +968,9 @@ class Genetic(Base):
     results = Column(Text)
     summary = Column(Text)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Genetic.created_user_id == User.id"
@@ -980,7 +996,7 @@ class GroupConsultant(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_consultants_id_seq'::regclass)"),
+        server_default=nextval("group_consultants_id_seq"),
     )
     group_id = Column(ForeignKey("groups.id"), nullable=False)
     consultant_id = Column(
@@ -995,7 +1011,7 @@ class GroupConsultant(Base):
 class GroupDiagnose(Base):
     __tablename__ = "group_diagnoses"
     __table_args__ = (
-        CheckConstraint("weight >= 0"),
+        CheckConstraint("weight >= 0").ddl_if(dialect="postgresql"),
         Index(
             "group_diagnoses_diagnosis_group_idx",
             "diagnosis_id",
@@ -1007,7 +1023,7 @@ class GroupDiagnose(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_diagnoses_id_seq'::regclass)"),
+        server_default=nextval("group_diagnoses_id_seq"),
     )
     group_id = Column(ForeignKey("groups.id"), nullable=False, index=True)
     diagnosis_id = Column(
@@ -1027,14 +1043,14 @@ class GroupDiagnose(Base):
 class GroupForm(Base):
     __tablename__ = "group_forms"
     __table_args__ = (
-        CheckConstraint("weight >= 0"),
+        CheckConstraint("weight >= 0").ddl_if(dialect="postgresql"),
         Index("group_forms_form_group_idx", "form_id", "group_id", unique=True),
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_forms_id_seq'::regclass)"),
+        server_default=nextval("group_forms_id_seq"),
     )
     group_id = Column(
         ForeignKey("groups.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -1066,7 +1082,7 @@ class GroupObservation(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_observations_id_seq'::regclass)"),
+        server_default=nextval("group_observations_id_seq"),
     )
     group_id = Column(ForeignKey("groups.id"), nullable=False, index=True)
     observation_id = Column(ForeignKey("observations.id"), nullable=False, index=True)
@@ -1079,14 +1095,14 @@ class GroupObservation(Base):
 class GroupPage(Base):
     __tablename__ = "group_pages"
     __table_args__ = (
-        CheckConstraint("weight >= 0"),
+        CheckConstraint("weight >= 0").ddl_if(dialect="postgresql"),
         Index("group_pages_page_group_idx", "page", "group_id", unique=True),
     )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_pages_id_seq'::regclass)"),
+        server_default=nextval("group_pages_id_seq"),
     )
     group_id = Column(
         ForeignKey("groups.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -1101,11 +1117,23 @@ class GroupPage(Base):
 
 class GroupPatient(Base):
     __tablename__ = "group_patients"
+    __table_args__ = (
+        CheckConstraint(
+            "from_date <= to_date",
+            name="group_patients_period_check",
+            info={"repair": "from_date = to_date, to_date = from_date"},
+        ),
+        Index(
+            "group_patients_period_idx",
+            text("tstzrange(from_date, to_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_patients_id_seq'::regclass)"),
+        server_default=nextval("group_patients_id_seq"),
     )
     group_id = Column(ForeignKey("groups.id"), nullable=False, index=True)
     patient_id = Column(
@@ -1117,9 +1145,9 @@ class GroupPatient(Base):
     to_date = Column(DateTime(True))
     created_group_id = Column(ForeignKey("groups.id"), nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     discharged_date = Column(Date)
 
     created_group = relationship(
@@ -1138,7 +1166,7 @@ class GroupPatient(Base):
 class GroupQuestionnaire(Base):
     __tablename__ = "group_questionnaires"
     __table_args__ = (
-        CheckConstraint("weight >= 0"),
+        CheckConstraint("weight >= 0").ddl_if(dialect="postgresql"),
         Index(
             "group_questionnaires_form_group_idx", "form_id", "group_id", unique=True
         ),
@@ -1147,7 +1175,7 @@ class GroupQuestionnaire(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_questionnaires_id_seq'::regclass)"),
+        server_default=nextval("group_questionnaires_id_seq"),
     )
     group_id = Column(
         ForeignKey("groups.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -1180,7 +1208,7 @@ class GroupUser(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('group_users_id_seq'::regclass)"),
+        server_default=nextval("group_users_id_seq"),
     )
     group_id = Column(ForeignKey("groups.id"), nullable=False, index=True)
     user_id = Column(
@@ -1201,9 +1229,9 @@ class GroupUser(Base):
         nullable=False,
     )
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="GroupUser.created_user_id == User.id"
@@ -1218,7 +1246,7 @@ class GroupUser(Base):
 class Hnf1bClinicalPicture(Base):
     __tablename__ = "hnf1b_clinical_pictures"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1232,9 +1260,9 @@ class Hnf1bClinicalPicture(Base):
     familial_cystic_disease = Column(Boolean)
     hypertension = Column(Boolean)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Hnf1bClinicalPicture.created_user_id == User.id"
@@ -1248,7 +1276,7 @@ class Hnf1bClinicalPicture(Base):
 class Hospitalisation(Base):
     __tablename__ = "hospitalisations"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1261,9 +1289,9 @@ class Hospitalisation(Base):
     reason_for_admission = Column(Text)
     comments = Column(Text)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Hospitalisation.created_user_id == User.id"
@@ -1278,7 +1306,7 @@ class Hospitalisation(Base):
 class IndiaEthnicity(Base):
     __tablename__ = "india_ethnicities"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1291,9 +1319,9 @@ class IndiaEthnicity(Base):
     mother_ancestral_state = Column(String)
     mother_language = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="IndiaEthnicity.created_user_id == User.id"
@@ -1308,7 +1336,7 @@ class IndiaEthnicity(Base):
 class InsClinicalPicture(Base):
     __tablename__ = "ins_clinical_pictures"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1330,9 +1358,9 @@ class InsClinicalPicture(Base):
     ophthalmoscopy_details = Column(String)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="InsClinicalPicture.created_user_id == User.id"
@@ -1346,7 +1374,7 @@ class InsClinicalPicture(Base):
 class InsRelapse(Base):
     __tablename__ = "ins_relapses"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1362,9 +1390,9 @@ class InsRelapse(Base):
     date_of_remission = Column(Date)
     remission_type = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     peak_acr = Column(Float(53))
     peak_pcr = Column(Float(53))
     remission_acr = Column(Float(53))
@@ -1385,7 +1413,7 @@ class InsRelapse(Base):
 class LiverDisease(Base):
     __tablename__ = "liver_diseases"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1414,9 +1442,9 @@ class LiverDisease(Base):
     spleen_palpable = Column(Boolean)
     spleen_palpable_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="LiverDisease.created_user_id == User.id"
@@ -1430,7 +1458,7 @@ class LiverDisease(Base):
 class LiverImaging(Base):
     __tablename__ = "liver_imaging"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1447,9 +1475,9 @@ class LiverImaging(Base):
     dilated_bile_ducts = Column(Boolean)
     cholangitis = Column(Boolean)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="LiverImaging.created_user_id == User.id"
@@ -1464,7 +1492,7 @@ class LiverImaging(Base):
 class LiverTransplant(Base):
     __tablename__ = "liver_transplants"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1481,9 +1509,9 @@ class LiverTransplant(Base):
     loss_reason = Column(String)
     other_loss_reason = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="LiverTransplant.created_user_id == User.id"
@@ -1503,7 +1531,7 @@ class LiverTransplant(Base):
 class Medication(Base):
     __tablename__ = "medications"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1521,9 +1549,9 @@ class Medication(Base):
     drug_text = Column(String)
     dose_text = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Medication.created_user_id == User.id"
@@ -1539,7 +1567,7 @@ class Medication(Base):
 class MpgnClinicalPicture(Base):
     __tablename__ = "mpgn_clinical_pictures"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1556,9 +1584,9 @@ class MpgnClinicalPicture(Base):
     ophthalmoscopy_details = Column(String)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="MpgnClinicalPicture.created_user_id == User.id"
@@ -1572,7 +1600,7 @@ class MpgnClinicalPicture(Base):
 class Nephrectomy(Base):
     __tablename__ = "nephrectomies"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1585,9 +1613,9 @@ class Nephrectomy(Base):
     kidney_type = Column(String, nullable=False)
     entry_type = Column(String, nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Nephrectomy.created_user_id == User.id"
@@ -1605,7 +1633,7 @@ class NurtureDatum(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('nurture_data_id_seq'::regclass)"),
+        server_default=nextval("nurture_data_id_seq"),
     )
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE")
@@ -1617,9 +1645,9 @@ class NurtureDatum(Base):
     interviews = Column(Boolean)
     interviews_refused_date = Column(Date)
     created_user_id = Column(Integer, nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(Integer, nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     patient = relationship("Patient")
 
@@ -1628,14 +1656,14 @@ class NurtureSample(Base):
     __tablename__ = "nurture_samples"
     __table_args__ = {"comment": "see form 11 for current storage"}
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
         index=True,
     )
     taken_on = Column(Date, nullable=False)
-    barcode = Column(Integer, nullable=False)
+    barcode = Column(Integer, nullable=False, index=True)
     epa = Column(Integer)
     epb = Column(Integer)
     lpa = Column(Integer)
@@ -1650,9 +1678,9 @@ class NurtureSample(Base):
     rna = Column(Integer)
     wb = Column(Integer)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     protocol_id = Column(ForeignKey("nurture_samples_options.id"), nullable=False)
 
     created_user = relationship(
@@ -1665,10 +1693,46 @@ class NurtureSample(Base):
     protocol = relationship("NurtureSamplesOption")
 
 
+class NurtureSampleShortfall(Base):
+    __tablename__ = "nurture_sample_shortfalls"
+    __table_args__ = (
+        Index("nurture_sample_shortfalls_patient_idx", "patient_id", "taken_on"),
+        {"comment": "aliquots still owed against the sample protocol"},
+    )
+
+    sample_id = Column(
+        ForeignKey("nurture_samples.id", ondelete="CASCADE"), primary_key=True
+    )
+    patient_id = Column(
+        ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    taken_on = Column(Date, nullable=False)
+    protocol_id = Column(ForeignKey("nurture_samples_options.id"), nullable=False)
+    epa = Column(Integer, nullable=False, server_default=text("0"))
+    epb = Column(Integer, nullable=False, server_default=text("0"))
+    lpa = Column(Integer, nullable=False, server_default=text("0"))
+    lpb = Column(Integer, nullable=False, server_default=text("0"))
+    uc = Column(Integer, nullable=False, server_default=text("0"))
+    ub = Column(Integer, nullable=False, server_default=text("0"))
+    ud = Column(Integer, nullable=False, server_default=text("0"))
+    fub = Column(Integer, nullable=False, server_default=text("0"))
+    sc = Column(Integer, nullable=False, server_default=text("0"))
+    sa = Column(Integer, nullable=False, server_default=text("0"))
+    sb = Column(Integer, nullable=False, server_default=text("0"))
+    rna = Column(Integer, nullable=False, server_default=text("0"))
+    wb = Column(Integer, nullable=False, server_default=text("0"))
+    total = Column(Integer, nullable=False, index=True)
+    computed_date = Column(DateTime(True), nullable=False, server_default=func.now())
+
+    patient = relationship("Patient")
+    sample = relationship("NurtureSample")
+
+
 class Nutrition(Base):
     __tablename__ = "nutrition"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1680,9 +1744,9 @@ class Nutrition(Base):
     from_date = Column(Date, nullable=False)
     to_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Nutrition.created_user_id == User.id"
@@ -1697,7 +1761,7 @@ class Nutrition(Base):
 class Pathology(Base):
     __tablename__ = "pathology"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1713,9 +1777,9 @@ class Pathology(Base):
     histological_summary = Column(String)
     em_findings = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     report_cleaned = Column(Date)
 
     created_user = relationship(
@@ -1731,7 +1795,7 @@ class Pathology(Base):
 class PatientAddress(Base):
     __tablename__ = "patient_addresses"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1746,11 +1810,13 @@ class PatientAddress(Base):
     address3 = Column(String)
     postcode = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     address4 = Column(String)
-    country = Column(String, server_default=text("'GB'::character varying"))
+    country = Column(
+        String, server_default=PostgresDefault("'GB'::character varying", "'GB'")
+    )
 
     created_user = relationship(
         "User", primaryjoin="PatientAddress.created_user_id == User.id"
@@ -1765,7 +1831,7 @@ class PatientAddress(Base):
 class PatientAliase(Base):
     __tablename__ = "patient_aliases"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1776,9 +1842,9 @@ class PatientAliase(Base):
     first_name = Column(String)
     last_name = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="PatientAliase.created_user_id == User.id"
@@ -1796,7 +1862,7 @@ class PatientConsent(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('patient_consents_id_seq'::regclass)"),
+        server_default=nextval("patient_consents_id_seq"),
     )
     consent_id = Column(ForeignKey("consents.id"))
     patient_id = Column(
@@ -1806,9 +1872,9 @@ class PatientConsent(Base):
     signed_on_date = Column(Date, nullable=False)
     withdrawn_on_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     reconsent_letter_returned_date = Column(Date)
     reconsent_letter_sent_date = Column(Date)
 
@@ -1828,7 +1894,7 @@ class PatientConsultant(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('patient_consultants_id_seq'::regclass)"),
+        server_default=nextval("patient_consultants_id_seq"),
     )
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -1838,9 +1904,9 @@ class PatientConsultant(Base):
     from_date = Column(Date, nullable=False)
     to_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     consultant = relationship("Consultant")
     created_user = relationship(
@@ -1864,7 +1930,7 @@ class PatientDemographic(Base):
         ),
     )
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1882,9 +1948,9 @@ class PatientDemographic(Base):
     mobile_number = Column(String)
     email_address = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     ethnicity_id = Column(ForeignKey("ethnicities.id"))
     nationality_id = Column(ForeignKey("nationalities.id"))
     cause_of_death = Column(String)
@@ -1904,7 +1970,7 @@ class PatientDemographic(Base):
 class PatientDiagnose(Base):
     __tablename__ = "patient_diagnoses"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1924,14 +1990,13 @@ class PatientDiagnose(Base):
     biopsy_diagnosis = Column(Integer)
     comments = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     prenatal = Column(Boolean)
     antibody_id = Column(String, ForeignKey("antibodies.id"), nullable=True)
     antibody = relationship(
-        "Antibody",
-        primaryjoin="PatientDiagnose.antibody_id == Antibody.id"
+        "Antibody", primaryjoin="PatientDiagnose.antibody_id == Antibody.id"
     )
     created_user = relationship(
         "User", primaryjoin="PatientDiagnose.created_user_id == User.id"
@@ -1950,7 +2015,7 @@ class PatientLock(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('patient_locks_id_seq'::regclass)"),
+        server_default=nextval("patient_locks_id_seq"),
     )
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -1975,7 +2040,7 @@ class PatientNumber(Base):
         ),
     )
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -1986,9 +2051,9 @@ class PatientNumber(Base):
     number_group_id = Column(ForeignKey("groups.id"), nullable=False, index=True)
     number = Column(String, nullable=False)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="PatientNumber.created_user_id == User.id"
@@ -2008,7 +2073,7 @@ class PatientNumber(Base):
 class Plasmapheresi(Base):
     __tablename__ = "plasmapheresis"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2021,9 +2086,9 @@ class Plasmapheresi(Base):
     no_of_exchanges = Column(String)
     response = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Plasmapheresi.created_user_id == User.id"
@@ -2038,7 +2103,7 @@ class Plasmapheresi(Base):
 class Pregnancy(Base):
     __tablename__ = "pregnancies"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2057,9 +2122,9 @@ class Pregnancy(Base):
     neonatal_intensive_care = Column(Boolean)
     pre_eclampsia = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="Pregnancy.created_user_id == User.id"
@@ -2073,7 +2138,7 @@ class Pregnancy(Base):
 class RenalImaging(Base):
     __tablename__ = "renal_imaging"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2104,9 +2169,9 @@ class RenalImaging(Base):
     left_nephrolithiasis = Column(Boolean)
     left_other_malformation = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="RenalImaging.created_user_id == User.id"
@@ -2121,7 +2186,7 @@ class RenalImaging(Base):
 class RenalProgression(Base):
     __tablename__ = "renal_progressions"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2130,9 +2195,9 @@ class RenalProgression(Base):
     onset_date = Column(Date)
     esrf_date = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     ckd5_date = Column(Date)
     ckd4_date = Column(Date)
     ckd3a_date = Column(Date)
@@ -2150,7 +2215,7 @@ class RenalProgression(Base):
 class Result(Base):
     __tablename__ = "results"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2162,9 +2227,9 @@ class Result(Base):
     date = Column(DateTime(True), nullable=False)
     value = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     sent_value = Column(String, nullable=False)
 
     created_user = relationship("User", primaryjoin="Result.created_user_id == User.id")
@@ -2179,7 +2244,7 @@ class Result(Base):
 class RituximabBaselineAssessment(Base):
     __tablename__ = "rituximab_baseline_assessment"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2195,9 +2260,9 @@ class RituximabBaselineAssessment(Base):
     past_remission = Column(Boolean)
     performance_status = Column(Integer)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     comorbidities = Column(Boolean, server_default=text("true"))
 
     created_user = relationship(
@@ -2213,7 +2278,7 @@ class RituximabBaselineAssessment(Base):
 class RituximabCriterion(Base):
     __tablename__ = "rituximab_criteria"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2227,9 +2292,9 @@ class RituximabCriterion(Base):
     criteria6 = Column(Boolean)
     criteria7 = Column(Boolean)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     alkylating_complication = Column(Boolean)
     alkylating_failure_monitoring_requirements = Column(Boolean)
     cancer = Column(Boolean)
@@ -2258,7 +2323,7 @@ class RituximabCriterion(Base):
 class SaltWastingClinicalFeature(Base):
     __tablename__ = "salt_wasting_clinical_features"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2279,9 +2344,9 @@ class SaltWastingClinicalFeature(Base):
     other_x_ray_abnormality = Column(Boolean)
     other_x_ray_abnormality_text = Column(String)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
 
     created_user = relationship(
         "User", primaryjoin="SaltWastingClinicalFeature.created_user_id == User.id"
@@ -2295,7 +2360,7 @@ class SaltWastingClinicalFeature(Base):
 class Transplant(Base):
     __tablename__ = "transplants"
 
-    id = Column(UUID, primary_key=True, server_default=text("uuid_generate_v4()"))
+    id = Column(UUID, primary_key=True, server_default=uuid_generate_v4())
     patient_id = Column(
         ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
@@ -2309,9 +2374,9 @@ class Transplant(Base):
     date_of_recurrence = Column(Date)
     date_of_failure = Column(Date)
     created_user_id = Column(ForeignKey("users.id"), nullable=False)
-    created_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    created_date = Column(DateTime(True), nullable=False, server_default=func.now())
     modified_user_id = Column(ForeignKey("users.id"), nullable=False)
-    modified_date = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    modified_date = Column(DateTime(True), nullable=False, server_default=func.now())
     recurrence = Column(Boolean)
     date_of_cmv_infection = Column(Date)
     donor_hla = Column(String)
@@ -2340,7 +2405,7 @@ class BiomarkerSample(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('biomarker_samples_id_seq'::regclass)"),
+        server_default=nextval("biomarker_samples_id_seq"),
     )
     barcode_id = Column(ForeignKey("biomarker_barcodes.id", ondelete="CASCADE"))
 
@@ -2355,7 +2420,7 @@ class FamilyHistoryRelative(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('family_history_relatives_id_seq'::regclass)"),
+        server_default=nextval("family_history_relatives_id_seq"),
     )
     family_history_id = Column(
         ForeignKey("family_histories.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -2374,7 +2439,7 @@ class TransplantBiopsy(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('transplant_biopsies_id_seq'::regclass)"),
+        server_default=nextval("transplant_biopsies_id_seq"),
     )
     transplant_id = Column(
         ForeignKey("transplants.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -2393,7 +2458,7 @@ class TransplantRejection(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('transplant_rejections_id_seq'::regclass)"),
+        server_default=nextval("transplant_rejections_id_seq"),
     )
     transplant_id = Column(
         ForeignKey("transplants.id", ondelete="CASCADE", onupdate="CASCADE"),
@@ -2411,7 +2476,7 @@ class BiomarkerResult(Base):
     id = Column(
         Integer,
         primary_key=True,
-        server_default=text("nextval('biomarker_results_id_seq'::regclass)"),
+        server_default=nextval("biomarker_results_id_seq"),
     )
     bio_id = Column(ForeignKey("biomarkers.id", ondelete="CASCADE"))
     sample_id = Column(ForeignKey("biomarker_samples.id", ondelete="CASCADE"))
@@ -2423,42 +2488,41 @@ class BiomarkerResult(Base):
     bio = relationship("Biomarker")
     sample = relationship("BiomarkerSample")
 
+
 class GroupAntibody(Base):
-    __tablename__ = 'group_antibodies'
+    __tablename__ = "group_antibodies"
 
     group_id = Column(
         Integer,
-        ForeignKey('groups.id', ondelete='CASCADE'),
+        ForeignKey("groups.id", ondelete="CASCADE"),
         primary_key=True,
     )
 
     antibody_id = Column(
         String,
-        ForeignKey('antibodies.id', ondelete='CASCADE'),
+        ForeignKey("antibodies.id", ondelete="CASCADE"),
         primary_key=True,
     )
 
     group = relationship(
-        'Group',
-        back_populates='group_antibodies',
+        "Group",
+        back_populates="group_antibodies",
         passive_deletes=True,
     )
 
     antibody = relationship(
-        'Antibody',
-        back_populates='group_antibodies',
+        "Antibody",
+        back_populates="group_antibodies",
         passive_deletes=True,
     )
 
 
-class Antibody(db.Model):
-    __tablename__ = 'antibodies'
+class Antibody(Base):
+    __tablename__ = "antibodies"
 
     id = Column(String, primary_key=True, nullable=False)
     is_official = Column(Boolean, nullable=False, default=False)
 
     group_antibodies = relationship(
-        'GroupAntibody',
-        back_populates='antibody',
-        cascade='all, delete-orphan'
-    )
\ No newline at end of file
+        "GroupAntibody", back_populates="antibody", cascade="all, delete-orphan"
+    )
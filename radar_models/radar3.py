@@ -1,28 +1,103 @@
 from datetime import datetime, date
 from typing import Callable, ClassVar, Optional, Union
 
-from sqlalchemy import BigInteger, Column
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    Table,
+    text,
+)
+from sqlalchemy.orm import declared_attr, deferred
+from sqlalchemy.sql.functions import now
 from sqlmodel import Field, SQLModel
 
+from radar_models.portable import BIGINT_KEY, PostgresDefault
+
+# --- AuditBase --- #
+
+
+class AuditBase(SQLModel):
+    created_user_id: Optional[int] = Field(default=None)
+    created_date: Optional[datetime] = Field(
+        default=None, sa_column_kwargs={"server_default": now(), "nullable": False}
+    )
+    modified_user_id: Optional[int] = Field(default=None)
+    modified_date: Optional[datetime] = Field(
+        default=None,
+        sa_column_kwargs={
+            "server_default": now(),
+            "onupdate": now(),
+            "nullable": False,
+        },
+    )
+    version_id: Optional[int] = Field(
+        default=None, sa_column_kwargs={"server_default": text("1"), "nullable": False}
+    )
+
+    # Optimistic locking: every ORM UPDATE checks and bumps version_id, so a
+    # concurrent edit of the same row raises StaleDataError instead of waiting
+    # on a patient lock.
+    __table__: ClassVar[Table]
+
+    @declared_attr.directive
+    @classmethod
+    def __mapper_args__(cls) -> dict:
+        return {"version_id_col": cls.__table__.c.version_id}
+
+
+# --- SummaryDeferred --- #
+
+
+class SummaryDeferred(SQLModel):
+    # Wide tables name a slim read model in __summary__. Its fields are the
+    # summary column group, loaded with the row; every other column is in the
+    # "detail" group, deferred until one of them is first accessed, when the
+    # whole group is loaded in one query. Listed before AuditBase, it extends
+    # the mapper arguments of the mixins after it.
+    __summary__: ClassVar[type[SQLModel]]
+    __table__: ClassVar[Table]
+
+    @declared_attr.directive
+    @classmethod
+    def __mapper_args__(cls) -> dict:
+        args = dict(getattr(super(), "__mapper_args__", {}))
+        loaded = set(cls.__summary__.model_fields)
+        loaded.update(column.key for column in cls.__table__.primary_key)
+        if "version_id_col" in args:
+            loaded.add(args["version_id_col"].key)
+        args["properties"] = {
+            column.key: deferred(column, group="detail")
+            for column in cls.__table__.c
+            if column.key not in loaded
+        }
+        return args
+
+
 # --- AdultEQ5D5L --- #
 
 
 class AdultEQ5D5LBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     assessment_date: date
-    age: int
-    gender: int
-    mobility: int
-    self_care: int
-    usual_activities: int
-    pain_discomfort: int
-    anxiety_depression: int
-    health: int
+    age: int = Field(sa_type=SmallInteger)
+    gender: int = Field(sa_type=SmallInteger)
+    mobility: int = Field(sa_type=SmallInteger)
+    self_care: int = Field(sa_type=SmallInteger)
+    usual_activities: int = Field(sa_type=SmallInteger)
+    pain_discomfort: int = Field(sa_type=SmallInteger)
+    anxiety_depression: int = Field(sa_type=SmallInteger)
+    health: int = Field(sa_type=SmallInteger)
 
 
-class AdultEQ5D5L(AdultEQ5D5LBase, table=True):
+class AdultEQ5D5L(AuditBase, AdultEQ5D5LBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "adult_eq5d5l"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class AdultEQ5D5LCreate(AdultEQ5D5LBase):
@@ -58,9 +133,9 @@ class AdverseEventBase(SQLModel):
     cause_of_death: str
 
 
-class AdverseEvent(AdverseEventBase, table=True):
+class AdverseEvent(AuditBase, AdverseEventBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "adverse_event"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class AdverseEventCreate(AdverseEventBase):
@@ -82,9 +157,9 @@ class AlportAssessmentBase(SQLModel):
     hearing_aid_date: Optional[date]
 
 
-class AlportAssessment(AlportAssessmentBase, table=True):
+class AlportAssessment(AuditBase, AlportAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "alport_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class AlportAssessmentCreate(AlportAssessmentBase):
@@ -121,9 +196,9 @@ class AnthropometricBase(SQLModel):
     diastolic_mean: int
 
 
-class Anthropometric(AnthropometricBase, table=True):
+class Anthropometric(AuditBase, AnthropometricBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "anthropometric"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class AnthropometricCreate(AnthropometricBase):
@@ -142,9 +217,9 @@ class BiomarkerBase(SQLModel):
     biomarker_type: str
 
 
-class Biomarker(BiomarkerBase, table=True):
+class Biomarker(AuditBase, BiomarkerBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "biomarker"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class BiomarkerCreate(BiomarkerBase):
@@ -160,13 +235,13 @@ class BiomarkerRead(BiomarkerBase):
 
 class BiomarkerBarcodeBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
-    barcode: str
+    barcode: str = Field(unique=True)
     sample_date: datetime
 
 
-class BiomarkerBarcode(BiomarkerBarcodeBase, table=True):
+class BiomarkerBarcode(AuditBase, BiomarkerBarcodeBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "biomarker_barcode"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class BiomarkerBarcodeCreate(BiomarkerBarcodeBase):
@@ -187,9 +262,9 @@ class BiomarkerResultBase(SQLModel):
     measure_unit: str
 
 
-class BiomarkerResult(BiomarkerResultBase, table=True):
+class BiomarkerResult(AuditBase, BiomarkerResultBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "biomarker_result"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class BiomarkerResultCreate(BiomarkerResultBase):
@@ -208,9 +283,9 @@ class BiomarkerSampleBase(SQLModel):
     biomarker_sample_label: str
 
 
-class BiomarkerSample(BiomarkerSampleBase, table=True):
+class BiomarkerSample(AuditBase, BiomarkerSampleBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "biomarker_sample"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class BiomarkerSampleCreate(BiomarkerSampleBase):
@@ -233,9 +308,9 @@ class CalciphylaxisAssessmentBase(SQLModel):
     infection_location: str
 
 
-class CalciphylaxisAssessment(CalciphylaxisAssessmentBase, table=True):
+class CalciphylaxisAssessment(AuditBase, CalciphylaxisAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "calciphylaxis_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CalciphylaxisAssessmentCreate(CalciphylaxisAssessmentBase):
@@ -254,11 +329,13 @@ class CalciphylaxisAssessmentOptionBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class CalciphylaxisAssessmentOption(CalciphylaxisAssessmentOptionBase, table=True):
+class CalciphylaxisAssessmentOption(
+    AuditBase, CalciphylaxisAssessmentOptionBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "calciphylaxis_assessment_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CalciphylaxisAssessmentOptionCreate(CalciphylaxisAssessmentOptionBase):
@@ -288,9 +365,9 @@ class CancerTumourBase(SQLModel):
     tumor_location: str
 
 
-class CancerTumour(CancerTumourBase, table=True):
+class CancerTumour(AuditBase, CancerTumourBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cancer_tumour"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CancerTumourCreate(CancerTumourBase):
@@ -301,6 +378,61 @@ class CancerTumourRead(CancerTumourBase):
     id: int
 
 
+# --- ChangeEvent --- #
+
+
+class ChangeEventBase(SQLModel):
+    table_name: str = Field(sa_column=Column(String(63), nullable=False))
+    row_id: Optional[int]
+    patient_id: Optional[int] = Field(index=True)
+    operation: str = Field(
+        sa_column=Column(
+            Enum("insert", "update", "delete", name="change_operation"),
+            nullable=False,
+        )
+    )
+    changed_columns: Optional[str]
+    created_date: datetime
+    transaction_id: Optional[int] = Field(
+        default=None,
+        sa_type=BigInteger,
+        sa_column_kwargs={
+            "server_default": PostgresDefault("txid_current()", "0"),
+            "nullable": False,
+        },
+    )
+
+
+class ChangeEvent(ChangeEventBase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "change_event"
+    __table_args__ = (Index("change_event_transaction_idx", "transaction_id", "id"),)
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
+
+
+class ChangeEventRead(ChangeEventBase):
+    id: int
+
+
+# --- ChangeEventOffset --- #
+
+
+class ChangeEventOffsetBase(SQLModel):
+    consumer_name: str = Field(unique=True)
+    last_transaction_id: int = Field(
+        default=0, sa_type=BigInteger, sa_column_kwargs={"server_default": text("0")}
+    )
+    last_event_id: int = Field(default=0)
+
+
+class ChangeEventOffset(ChangeEventOffsetBase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "change_event_offset"
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
+
+
+class ChangeEventOffsetRead(ChangeEventOffsetBase):
+    id: int
+
+
 # --- CKDAfricaGenetic --- #
 
 
@@ -312,9 +444,9 @@ class CKDAfricaGeneticBase(SQLModel):
     apol_1: str
 
 
-class CKDAfricaGenetic(CKDAfricaGeneticBase, table=True):
+class CKDAfricaGenetic(AuditBase, CKDAfricaGeneticBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ckd_africa_genetic"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CKDAfricaGeneticCreate(CKDAfricaGeneticBase):
@@ -337,9 +469,9 @@ class CKDAfricaRiskFactorBase(SQLModel):
     hospital_malnutrition: str
 
 
-class CKDAfricaRiskFactor(CKDAfricaRiskFactorBase, table=True):
+class CKDAfricaRiskFactor(AuditBase, CKDAfricaRiskFactorBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ckd_africa_risk_factor"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CKDAfricaRiskFactorCreate(CKDAfricaRiskFactorBase):
@@ -359,9 +491,9 @@ class ClinicalLettersBase(SQLModel):
     comments: str
 
 
-class ClinicalLetters(ClinicalLettersBase, table=True):
+class ClinicalLetters(AuditBase, ClinicalLettersBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "clinical_letters"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ClinicalLettersCreate(ClinicalLettersBase):
@@ -382,9 +514,9 @@ class CodeBase(SQLModel):
     code_label: str
 
 
-class Code(CodeBase, table=True):
+class Code(AuditBase, CodeBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "code"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CodeCreate(CodeBase):
@@ -404,9 +536,9 @@ class CohortBase(SQLModel):
     cohort_short_name: str
 
 
-class Cohort(CohortBase, table=True):
+class Cohort(AuditBase, CohortBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cohort"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CohortCreate(CohortBase):
@@ -426,9 +558,9 @@ class CohortDiagnosisBase(SQLModel):
     diagnosis_type: int = Field(foreign_key="option.id")
 
 
-class CohortDiagnosis(CohortDiagnosisBase, table=True):
+class CohortDiagnosis(AuditBase, CohortDiagnosisBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cohort_diagnosis"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CohortDiagnosisCreate(CohortDiagnosisBase):
@@ -448,9 +580,9 @@ class CohortObservationBase(SQLModel):
     weight: int
 
 
-class CohortObservation(CohortObservationBase, table=True):
+class CohortObservation(AuditBase, CohortObservationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cohort_observation"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CohortObservationCreate(CohortObservationBase):
@@ -466,14 +598,29 @@ class CohortObservationRead(CohortObservationBase):
 
 class CohortPatientBase(SQLModel):
     cohort_id: int = Field(foreign_key="cohort.id")
-    patient_id: int = Field(foreign_key="patient.id")
+    patient_id: int = Field(foreign_key="patient.id", index=True)
     recruited_date: date
     removed_date: Optional[date]
 
 
-class CohortPatient(CohortPatientBase, table=True):
+class CohortPatient(AuditBase, CohortPatientBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cohort_patient"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        Index("cohort_patient_cohort_idx", "cohort_id", "patient_id"),
+        CheckConstraint(
+            "recruited_date <= removed_date",
+            name="cohort_patient_period_check",
+            info={
+                "repair": "recruited_date = removed_date, removed_date = recruited_date"
+            },
+        ),
+        Index(
+            "cohort_patient_period_idx",
+            text("daterange(recruited_date, removed_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CohortPatientCreate(CohortPatientBase):
@@ -496,9 +643,9 @@ class ConsentBase(SQLModel):
     is_retired: bool = Field(default=False)
 
 
-class Consent(ConsentBase, table=True):
+class Consent(AuditBase, ConsentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "consent"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ConsentCreate(ConsentBase):
@@ -521,9 +668,9 @@ class ConsultantBase(SQLModel):
     gmc_number: Optional[int]
 
 
-class Consultant(ConsultantBase, table=True):
+class Consultant(AuditBase, ConsultantBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "consultant"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ConsultantCreate(ConsultantBase):
@@ -542,9 +689,9 @@ class CountryBase(SQLModel):
     country_code: str
 
 
-class Country(CountryBase, table=True):
+class Country(AuditBase, CountryBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "country"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CountryCreate(CountryBase):
@@ -563,9 +710,9 @@ class CountryEthnicityBase(SQLModel):
     country_id: int = Field(foreign_key="country.id")
 
 
-class CountryEthnicity(CountryEthnicityBase, table=True):
+class CountryEthnicity(AuditBase, CountryEthnicityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "country_ethnicity"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CountryEthnicityCreate(CountryEthnicityBase):
@@ -584,9 +731,9 @@ class CountryNationalityBase(SQLModel):
     country_id: int = Field(foreign_key="country.id")
 
 
-class CountryNationality(CountryNationalityBase, table=True):
+class CountryNationality(AuditBase, CountryNationalityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "country_nationality"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CountryNationalityCreate(CountryNationalityBase):
@@ -658,9 +805,19 @@ class CystinosisAdultVisitBase(SQLModel):
     cysteamine_effects: str
 
 
-class CystinosisAdultVisit(CystinosisAdultVisitBase, table=True):
+class CystinosisAdultVisitSummary(SQLModel):
+    id: int
+    patient_id: int
+    visit: int
+    visit_date: date
+
+
+class CystinosisAdultVisit(
+    SummaryDeferred, AuditBase, CystinosisAdultVisitBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cystinosis_adult_visit"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = CystinosisAdultVisitSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CystinosisAdultVisitCreate(CystinosisAdultVisitBase):
@@ -739,9 +896,21 @@ class CystinosisPaedVisitBase(SQLModel):
     cysteamine_effects: str
 
 
-class CystinosisPaedVisit(CystinosisPaedVisitBase, table=True):
+class CystinosisPaedVisitSummary(SQLModel):
+    id: int
+    patient_id: int
+    visit: int
+    visit_date: date
+    height: float
+    weight: float
+
+
+class CystinosisPaedVisit(
+    SummaryDeferred, AuditBase, CystinosisPaedVisitBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "cystinosis_paed_visit"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = CystinosisPaedVisitSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CystinosisPaedVisitCreate(CystinosisPaedVisitBase):
@@ -760,11 +929,11 @@ class CystinosisPaedVisitOptionBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class CystinosisPaedVisitOption(CystinosisPaedVisitOptionBase, table=True):
+class CystinosisPaedVisitOption(AuditBase, CystinosisPaedVisitOptionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "cystinosis_paed_visit_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class CystinosisPaedVisitOptionCreate(CystinosisPaedVisitOptionBase):
@@ -782,9 +951,9 @@ class DataSourceBase(SQLModel):
     data_source_name: str
 
 
-class DataSource(DataSourceBase, table=True):
+class DataSource(AuditBase, DataSourceBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "data_source"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DataSourceCreate(DataSourceBase):
@@ -799,14 +968,14 @@ class DataSourceRead(DataSourceBase):
 
 
 class DeathBase(SQLModel):
-    patient_id: int = Field(foreign_key="patient.id")
+    patient_id: int = Field(foreign_key="patient.id", index=True)
     date_of_death: date
     cause_of_death: Optional[str]
 
 
-class Death(DeathBase, table=True):
+class Death(AuditBase, DeathBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "death"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DeathCreate(DeathBase):
@@ -830,9 +999,9 @@ class DentAndLoweAssessmentBase(SQLModel):
     other_extra_involvement: str
 
 
-class DentAndLoweAssessment(DentAndLoweAssessmentBase, table=True):
+class DentAndLoweAssessment(AuditBase, DentAndLoweAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "dent_and_lowe_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DentAndLoweAssessmentCreate(DentAndLoweAssessmentBase):
@@ -851,11 +1020,13 @@ class DentAndLoweAssessmentOptionBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class DentAndLoweAssessmentOption(DentAndLoweAssessmentOptionBase, table=True):
+class DentAndLoweAssessmentOption(
+    AuditBase, DentAndLoweAssessmentOptionBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "dent_and_lowe_assessment_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DentAndLoweAssessmentOptionCreate(DentAndLoweAssessmentOptionBase):
@@ -877,9 +1048,9 @@ class DiabeticComplicationBase(SQLModel):
     foot_ulcer: bool
 
 
-class DiabeticComplication(DiabeticComplicationBase, table=True):
+class DiabeticComplication(AuditBase, DiabeticComplicationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "diabetic_complication"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DiabeticComplicationCreate(DiabeticComplicationBase):
@@ -897,9 +1068,9 @@ class DiagnosisBase(SQLModel):
     diagnosis_name: str
 
 
-class Diagnosis(DiagnosisBase, table=True):
+class Diagnosis(AuditBase, DiagnosisBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "diagnosis"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DiagnosisCreate(DiagnosisBase):
@@ -918,9 +1089,9 @@ class DiagnosisCodeBase(SQLModel):
     code_id: int = Field(foreign_key="code.id")
 
 
-class DiagnosisCode(DiagnosisCodeBase, table=True):
+class DiagnosisCode(AuditBase, DiagnosisCodeBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "diagnosis_code"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DiagnosisCodeCreate(DiagnosisCodeBase):
@@ -940,12 +1111,12 @@ class DialysisBase(SQLModel):
     data_source_id: int = Field(foreign_key="data_source.id")
     timeline_start: date
     timeline_end: Optional[date]
-    modality: int
+    modality: int = Field(sa_type=SmallInteger)
 
 
-class Dialysis(DialysisBase, table=True):
+class Dialysis(AuditBase, DialysisBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "dialysis"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DialysisCreate(DialysisBase):
@@ -964,9 +1135,9 @@ class DrugBase(SQLModel):
     drug_group_id: Optional[int] = Field(foreign_key="drug_group.id")
 
 
-class Drug(DrugBase, table=True):
+class Drug(AuditBase, DrugBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "drug"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DrugCreate(DrugBase):
@@ -985,9 +1156,9 @@ class DrugGroupBase(SQLModel):
     parent_drug_group_id: Optional[int] = Field(foreign_key="drug_group.id")
 
 
-class DrugGroup(DrugGroupBase, table=True):
+class DrugGroup(AuditBase, DrugGroupBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "drug_group"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class DrugGroupCreate(DrugGroupBase):
@@ -998,24 +1169,54 @@ class DrugGroupRead(DrugGroupBase):
     id: int
 
 
+# --- Episode --- #
+
+
+class EpisodeBase(SQLModel):
+    patient_id: int = Field(foreign_key="patient.id", index=True)
+    episode_type: str = Field(
+        sa_column=Column(
+            Enum("medication", "dialysis", "hospitalisation", name="episode_type"),
+            nullable=False,
+        )
+    )
+    key_id: Optional[int]
+    start_date: Optional[date]
+    end_date: Optional[date]
+    fragments: int
+
+
+class Episode(AuditBase, EpisodeBase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "episode"
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
+
+
+class EpisodeCreate(EpisodeBase):
+    pass
+
+
+class EpisodeRead(EpisodeBase):
+    id: int
+
+
 # --- EQ5DY --- #
 
 
 class EQ5DYBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
-    age: int
-    gender: int
-    mobility: int
-    self_care: int
-    usual_activities: int
-    pain_discomfort: int
-    anxiety_depression: int
-    health: int
+    age: int = Field(sa_type=SmallInteger)
+    gender: int = Field(sa_type=SmallInteger)
+    mobility: int = Field(sa_type=SmallInteger)
+    self_care: int = Field(sa_type=SmallInteger)
+    usual_activities: int = Field(sa_type=SmallInteger)
+    pain_discomfort: int = Field(sa_type=SmallInteger)
+    anxiety_depression: int = Field(sa_type=SmallInteger)
+    health: int = Field(sa_type=SmallInteger)
 
 
-class EQ5DY(EQ5DYBase, table=True):
+class EQ5DY(AuditBase, EQ5DYBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "eq_5d_y"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class EQ5DYCreate(EQ5DYBase):
@@ -1037,9 +1238,9 @@ class EthnicOriginBase(SQLModel):
     ethnic_origin: str
 
 
-class EthnicOrigin(EthnicOriginBase, table=True):
+class EthnicOrigin(AuditBase, EthnicOriginBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ethnic_origin"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class EthnicOriginCreate(EthnicOriginBase):
@@ -1058,9 +1259,9 @@ class EthnicityBase(SQLModel):
     ethnicity_label: str
 
 
-class Ethnicity(EthnicityBase, table=True):
+class Ethnicity(AuditBase, EthnicityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ethnicity"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class EthnicityCreate(EthnicityBase):
@@ -1081,9 +1282,9 @@ class FamilyHistoryBase(SQLModel):
     has_condition: bool
 
 
-class FamilyHistory(FamilyHistoryBase, table=True):
+class FamilyHistory(AuditBase, FamilyHistoryBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "family_history"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FamilyHistoryCreate(FamilyHistoryBase):
@@ -1102,9 +1303,9 @@ class FamilyHistoryRelationBase(SQLModel):
     relation_id: int = Field(foreign_key="relation.id")
 
 
-class FamilyHistoryRelation(FamilyHistoryRelationBase, table=True):
+class FamilyHistoryRelation(AuditBase, FamilyHistoryRelationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "family_history_relation"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FamilyHistoryRelationCreate(FamilyHistoryRelationBase):
@@ -1123,11 +1324,13 @@ class FamilyHistoryRelationPatientBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
 
 
-class FamilyHistoryRelationPatient(FamilyHistoryRelationPatientBase, table=True):
+class FamilyHistoryRelationPatient(
+    AuditBase, FamilyHistoryRelationPatientBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "family_history_relation_patient"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FamilyHistoryRelationPatientCreate(FamilyHistoryRelationPatientBase):
@@ -1162,9 +1365,9 @@ class FetalAnomalyScanBase(SQLModel):
     amnioinfusion_count: Optional[int]
 
 
-class FetalAnomalyScan(FetalAnomalyScanBase, table=True):
+class FetalAnomalyScan(AuditBase, FetalAnomalyScanBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "fetal_anomaly_scan"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FetalAnomalyScanCreate(FetalAnomalyScanBase):
@@ -1192,9 +1395,9 @@ class FetalUltrasoundBase(SQLModel):
     fetal_ultrasound_comment: Optional[str]
 
 
-class FetalUltrasound(FetalUltrasoundBase, table=True):
+class FetalUltrasound(AuditBase, FetalUltrasoundBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "fetal_ultrasound"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FetalUltrasoundCreate(FetalUltrasoundBase):
@@ -1213,9 +1416,9 @@ class FrontPageStatBase(SQLModel):
     stat: str
 
 
-class FrontPageStat(FrontPageStatBase, table=True):
+class FrontPageStat(AuditBase, FrontPageStatBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "front_page_stats"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FrontPageStatCreate(FrontPageStatBase):
@@ -1240,9 +1443,9 @@ class FuanAssessmentBase(SQLModel):
     comments: Optional[str]
 
 
-class FuanAssessment(FuanAssessmentBase, table=True):
+class FuanAssessment(AuditBase, FuanAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "fuan_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class FuanAssessmentCreate(FuanAssessmentBase):
@@ -1267,9 +1470,9 @@ class GeneticsBase(SQLModel):
     summary: Optional[str]
 
 
-class Genetics(GeneticsBase, table=True):
+class Genetics(AuditBase, GeneticsBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "genetics"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class GeneticsCreate(GeneticsBase):
@@ -1286,26 +1489,34 @@ class GeneticsRead(GeneticsBase):
 class HADSBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     assessment_date: date
-    a1: int
-    d1: int
-    a2: int
-    d2: int
-    a3: int
-    d3: int
-    a4: int
-    d4: int
-    a5: int
-    d5: int
-    a6: int
-    d6: int
-    a7: int
-    d7: int
+    a1: int = Field(sa_type=SmallInteger)
+    d1: int = Field(sa_type=SmallInteger)
+    a2: int = Field(sa_type=SmallInteger)
+    d2: int = Field(sa_type=SmallInteger)
+    a3: int = Field(sa_type=SmallInteger)
+    d3: int = Field(sa_type=SmallInteger)
+    a4: int = Field(sa_type=SmallInteger)
+    d4: int = Field(sa_type=SmallInteger)
+    a5: int = Field(sa_type=SmallInteger)
+    d5: int = Field(sa_type=SmallInteger)
+    a6: int = Field(sa_type=SmallInteger)
+    d6: int = Field(sa_type=SmallInteger)
+    a7: int = Field(sa_type=SmallInteger)
+    d7: int = Field(sa_type=SmallInteger)
+    anxiety_score: int = Field(sa_type=SmallInteger)
+
+
+class HADSSummary(SQLModel):
+    id: int
+    patient_id: int
+    assessment_date: date
     anxiety_score: int
 
 
-class HADS(HADSBase, table=True):
+class HADS(SummaryDeferred, AuditBase, HADSBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hads"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = HADSSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HADSCreate(HADSBase):
@@ -1330,9 +1541,9 @@ class Hnf1bAssessmentBase(SQLModel):
     hypertension: bool
 
 
-class Hnf1bAssessment(Hnf1bAssessmentBase, table=True):
+class Hnf1bAssessment(AuditBase, Hnf1bAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hnf1b_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class Hnf1bAssessmentCreate(Hnf1bAssessmentBase):
@@ -1353,9 +1564,9 @@ class HospitalBase(SQLModel):
     is_transplant_centre: bool
 
 
-class Hospital(HospitalBase, table=True):
+class Hospital(AuditBase, HospitalBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hospital"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HospitalCreate(HospitalBase):
@@ -1374,9 +1585,9 @@ class HospitalConsultantBase(SQLModel):
     consultant_id: int = Field(foreign_key="consultant.id")
 
 
-class HospitalConsultant(HospitalConsultantBase, table=True):
+class HospitalConsultant(AuditBase, HospitalConsultantBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hospital_consultant"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HospitalConsultantCreate(HospitalConsultantBase):
@@ -1392,14 +1603,14 @@ class HospitalConsultantRead(HospitalConsultantBase):
 
 class HospitalPatientBase(SQLModel):
     hospital_id: int = Field(foreign_key="hospital.id")
-    patient_id: int = Field(foreign_key="patient.id")
+    patient_id: int = Field(foreign_key="patient.id", index=True)
     first_seen_date: date
     discharged_date: Optional[date]
 
 
-class HospitalPatient(HospitalPatientBase, table=True):
+class HospitalPatient(AuditBase, HospitalPatientBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hospital_patient"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HospitalPatientCreate(HospitalPatientBase):
@@ -1422,9 +1633,9 @@ class HospitalisationBase(SQLModel):
     reason_of_admission: Optional[str]
 
 
-class Hospitalisation(HospitalisationBase, table=True):
+class Hospitalisation(AuditBase, HospitalisationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hospitalisation"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HospitalisationCreate(HospitalisationBase):
@@ -1450,9 +1661,9 @@ class HSPAssessmentBase(SQLModel):
     c: str
 
 
-class HSPAssessment(HSPAssessmentBase, table=True):
+class HSPAssessment(AuditBase, HSPAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "hsp_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class HSPAssessmentCreate(HSPAssessmentBase):
@@ -1470,9 +1681,9 @@ class IdentifierBase(SQLModel):
     identifier_label: str
 
 
-class Identifier(IdentifierBase, table=True):
+class Identifier(AuditBase, IdentifierBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "identifier"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class IdentifierCreate(IdentifierBase):
@@ -1491,9 +1702,9 @@ class IGAResearchBase(SQLModel):
     assessment_date: date
 
 
-class IGAResearch(IGAResearchBase, table=True):
+class IGAResearch(AuditBase, IGAResearchBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "iga_research"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class IGAResearchCreate(IGAResearchBase):
@@ -1512,9 +1723,9 @@ class IGAResearchOptionsBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class IGAResearchOptions(IGAResearchOptionsBase, table=True):
+class IGAResearchOptions(AuditBase, IGAResearchOptionsBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "iga_research_options"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class IGAResearchOptionsCreate(IGAResearchOptionsBase):
@@ -1532,9 +1743,9 @@ class IndicatorBase(SQLModel):
     indicator_label: str
 
 
-class Indicator(IndicatorBase, table=True):
+class Indicator(AuditBase, IndicatorBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "indicator"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class IndicatorCreate(IndicatorBase):
@@ -1567,9 +1778,9 @@ class InsAssessmentBase(SQLModel):
     comments: Optional[str]
 
 
-class InsAssessment(InsAssessmentBase, table=True):
+class InsAssessment(AuditBase, InsAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ins_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class InsAssessmentCreate(InsAssessmentBase):
@@ -1603,9 +1814,9 @@ class InsRelapseBase(SQLModel):
     relapse_sample_taken: Optional[bool]
 
 
-class InsRelapse(InsRelapseBase, table=True):
+class InsRelapse(AuditBase, InsRelapseBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ins_relapse"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class InsRelapseCreate(InsRelapseBase):
@@ -1622,37 +1833,45 @@ class InsRelapseRead(InsRelapseBase):
 class IPOSBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     assessment_date: date
-    score_1: int
-    score_2: int
-    score_3: int
-    score_4: int
-    score_5: int
-    score_6: int
-    score_7: int
-    score_8: int
-    score_9: int
-    score_10: int
-    score_11: int
-    score_12: int
-    score_13: int
-    score_14: int
-    score_15: int
-    score_16: int
-    score_17: int
+    score_1: int = Field(sa_type=SmallInteger)
+    score_2: int = Field(sa_type=SmallInteger)
+    score_3: int = Field(sa_type=SmallInteger)
+    score_4: int = Field(sa_type=SmallInteger)
+    score_5: int = Field(sa_type=SmallInteger)
+    score_6: int = Field(sa_type=SmallInteger)
+    score_7: int = Field(sa_type=SmallInteger)
+    score_8: int = Field(sa_type=SmallInteger)
+    score_9: int = Field(sa_type=SmallInteger)
+    score_10: int = Field(sa_type=SmallInteger)
+    score_11: int = Field(sa_type=SmallInteger)
+    score_12: int = Field(sa_type=SmallInteger)
+    score_13: int = Field(sa_type=SmallInteger)
+    score_14: int = Field(sa_type=SmallInteger)
+    score_15: int = Field(sa_type=SmallInteger)
+    score_16: int = Field(sa_type=SmallInteger)
+    score_17: int = Field(sa_type=SmallInteger)
     question_1: str
-    score_18: int
+    score_18: int = Field(sa_type=SmallInteger)
     question_2: str
-    score_19: int
+    score_19: int = Field(sa_type=SmallInteger)
     question_3: str
-    score_20: int
+    score_20: int = Field(sa_type=SmallInteger)
     question_4: str
     question_5: str
+    score: int = Field(sa_type=SmallInteger)
+
+
+class IPOSSummary(SQLModel):
+    id: int
+    patient_id: int
+    assessment_date: date
     score: int
 
 
-class IPOS(IPOSBase, table=True):
+class IPOS(SummaryDeferred, AuditBase, IPOSBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "ipos"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = IPOSSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class IPOSCreate(IPOSBase):
@@ -1692,9 +1911,9 @@ class LiverDiseaseBase(SQLModel):
     spleen_palpable_date: Optional[date]
 
 
-class LiverDisease(LiverDiseaseBase, table=True):
+class LiverDisease(AuditBase, LiverDiseaseBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "liver_disease"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class LiverDiseaseCreate(LiverDiseaseBase):
@@ -1722,9 +1941,9 @@ class LiverImagingBase(SQLModel):
     cholangitis: Optional[bool]
 
 
-class LiverImaging(LiverImagingBase, table=True):
+class LiverImaging(AuditBase, LiverImagingBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "liver_imaging"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class LiverImagingCreate(LiverImagingBase):
@@ -1751,9 +1970,9 @@ class LiverTransplantBase(SQLModel):
     other_loss_reason: str
 
 
-class LiverTransplant(LiverTransplantBase, table=True):
+class LiverTransplant(AuditBase, LiverTransplantBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "liver_transplant"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class LiverTransplantCreate(LiverTransplantBase):
@@ -1772,11 +1991,11 @@ class LiverTransplantIndicatorBase(SQLModel):
     indicator_id: int = Field(foreign_key="indicator.id")
 
 
-class LiverTransplantIndicator(LiverTransplantIndicatorBase, table=True):
+class LiverTransplantIndicator(AuditBase, LiverTransplantIndicatorBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "liver_transplant_indicator"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class LiverTransplantIndicatorCreate(LiverTransplantIndicatorBase):
@@ -1806,9 +2025,22 @@ class MedicationBase(SQLModel):
     dose_text: str
 
 
-class Medication(MedicationBase, table=True):
+class Medication(AuditBase, MedicationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "medication"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        CheckConstraint(
+            "start_date <= finish_date",
+            name="medication_period_check",
+            info={"repair": "start_date = finish_date, finish_date = start_date"},
+        ),
+        Index(
+            "medication_period_idx",
+            text("daterange(start_date, finish_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+        Index("medication_patient_drug_idx", "patient_id", "drug_id"),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class MedicationCreate(MedicationBase):
@@ -1836,9 +2068,9 @@ class MpgnAssessmentBase(SQLModel):
     comments: str
 
 
-class MpgnAssessment(MpgnAssessmentBase, table=True):
+class MpgnAssessment(AuditBase, MpgnAssessmentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "mpgn_assessment"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class MpgnAssessmentCreate(MpgnAssessmentBase):
@@ -1856,9 +2088,9 @@ class NationalityBase(SQLModel):
     nationality_label: str
 
 
-class Nationality(NationalityBase, table=True):
+class Nationality(AuditBase, NationalityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nationality"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NationalityCreate(NationalityBase):
@@ -1882,9 +2114,9 @@ class NephrectomyBase(SQLModel):
     entry_type: str
 
 
-class Nephrectomy(NephrectomyBase, table=True):
+class Nephrectomy(AuditBase, NephrectomyBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nephrectomy"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NephrectomyCreate(NephrectomyBase):
@@ -1914,9 +2146,9 @@ class NurtureFamilyHistoryBase(SQLModel):
     diabetes_relative_3: int
 
 
-class NurtureFamilyHistory(NurtureFamilyHistoryBase, table=True):
+class NurtureFamilyHistory(AuditBase, NurtureFamilyHistoryBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nurture_family_history"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NurtureFamilyHistoryCreate(NurtureFamilyHistoryBase):
@@ -1940,9 +2172,9 @@ class NurtureMetadataBase(SQLModel):
     interviews_refused_date: date
 
 
-class NurtureMetadata(NurtureMetadataBase, table=True):
+class NurtureMetadata(AuditBase, NurtureMetadataBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nurture_metadata"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NurtureMetadataCreate(NurtureMetadataBase):
@@ -1977,9 +2209,9 @@ class NurtureVisitBase(SQLModel):
     ibuprofen_years: int
 
 
-class NurtureVisit(NurtureVisitBase, table=True):
+class NurtureVisit(AuditBase, NurtureVisitBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nurture_visit"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NurtureVisitCreate(NurtureVisitBase):
@@ -2002,9 +2234,9 @@ class NutritionBase(SQLModel):
     to_date: date
 
 
-class Nutrition(NutritionBase, table=True):
+class Nutrition(AuditBase, NutritionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "nutrition"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class NutritionCreate(NutritionBase):
@@ -2027,9 +2259,9 @@ class ObservationBase(SQLModel):
     units: str
 
 
-class Observation(ObservationBase, table=True):
+class Observation(AuditBase, ObservationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "observation"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ObservationCreate(ObservationBase):
@@ -2048,9 +2280,9 @@ class ObservationCodeBase(SQLModel):
     code_id: int = Field(foreign_key="code.id")
 
 
-class ObservationCode(ObservationCodeBase, table=True):
+class ObservationCode(AuditBase, ObservationCodeBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "observation_code"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ObservationCodeCreate(ObservationCodeBase):
@@ -2069,9 +2301,9 @@ class ObservationOptionsBase(SQLModel):
     option_id: int
 
 
-class ObservationOption(ObservationOptionsBase, table=True):
+class ObservationOption(AuditBase, ObservationOptionsBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "observation_option"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ObservationOptionCreate(ObservationOptionsBase):
@@ -2091,9 +2323,14 @@ class OptionBase(SQLModel):
     store_value: str
 
 
-class Option(OptionBase, table=True):
+class Option(AuditBase, OptionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "option"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        Index(
+            "option_group_store_value_idx", "option_group", "store_value", unique=True
+        ),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class OptionCreate(OptionBase):
@@ -2110,20 +2347,20 @@ class OptionRead(OptionBase):
 class PaedsCHU9DBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     assessment_date: date
-    worried: int
-    sad: int
-    pain: int
-    tired: int
-    annoyed: int
-    school: int
-    sleep: int
-    routine: int
-    activities: int
-
-
-class PaedsCHU9D(PaedsCHU9DBase, table=True):
+    worried: int = Field(sa_type=SmallInteger)
+    sad: int = Field(sa_type=SmallInteger)
+    pain: int = Field(sa_type=SmallInteger)
+    tired: int = Field(sa_type=SmallInteger)
+    annoyed: int = Field(sa_type=SmallInteger)
+    school: int = Field(sa_type=SmallInteger)
+    sleep: int = Field(sa_type=SmallInteger)
+    routine: int = Field(sa_type=SmallInteger)
+    activities: int = Field(sa_type=SmallInteger)
+
+
+class PaedsCHU9D(AuditBase, PaedsCHU9DBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "paeds_chu9d"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PaedsCHU9DCreate(PaedsCHU9DBase):
@@ -2140,24 +2377,24 @@ class PaedsCHU9DRead(PaedsCHU9DBase):
 class PAMBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     assessment_date: date
-    q1: int
-    q2: int
-    q3: int
-    q4: int
-    q5: int
-    q6: int
-    q7: int
-    q8: int
-    q9: int
-    q10: int
-    q11: int
-    q12: int
-    q13: int
-
-
-class PAM(PAMBase, table=True):
+    q1: int = Field(sa_type=SmallInteger)
+    q2: int = Field(sa_type=SmallInteger)
+    q3: int = Field(sa_type=SmallInteger)
+    q4: int = Field(sa_type=SmallInteger)
+    q5: int = Field(sa_type=SmallInteger)
+    q6: int = Field(sa_type=SmallInteger)
+    q7: int = Field(sa_type=SmallInteger)
+    q8: int = Field(sa_type=SmallInteger)
+    q9: int = Field(sa_type=SmallInteger)
+    q10: int = Field(sa_type=SmallInteger)
+    q11: int = Field(sa_type=SmallInteger)
+    q12: int = Field(sa_type=SmallInteger)
+    q13: int = Field(sa_type=SmallInteger)
+
+
+class PAM(AuditBase, PAMBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "pam"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PAMCreate(PAMBase):
@@ -2177,9 +2414,9 @@ class ParentalConsanguinityBase(SQLModel):
     consanguinity_details: str
 
 
-class ParentalConsanguinity(ParentalConsanguinityBase, table=True):
+class ParentalConsanguinity(AuditBase, ParentalConsanguinityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "parental_consanguinity"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ParentalConsanguinityCreate(ParentalConsanguinityBase):
@@ -2207,9 +2444,9 @@ class PathologyBase(SQLModel):
     report_cleaned_date: date
 
 
-class Pathology(PathologyBase, table=True):
+class Pathology(AuditBase, PathologyBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "pathology"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PathologyCreate(PathologyBase):
@@ -2229,9 +2466,9 @@ class PatientBase(SQLModel):
     is_control: bool = Field(default=False)
 
 
-class Patient(PatientBase, table=True):
+class Patient(AuditBase, PatientBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientCreate(PatientBase):
@@ -2258,9 +2495,21 @@ class PatientAddressBase(SQLModel):
     postcode: str
 
 
-class PatientAddress(PatientAddressBase, table=True):
+class PatientAddress(AuditBase, PatientAddressBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_address"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        CheckConstraint(
+            "from_date <= to_date",
+            name="patient_address_period_check",
+            info={"repair": "from_date = to_date, to_date = from_date"},
+        ),
+        Index(
+            "patient_address_period_idx",
+            text("daterange(from_date, to_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientAddressCreate(PatientAddressBase):
@@ -2281,9 +2530,9 @@ class PatientAliasBase(SQLModel):
     last_name: str
 
 
-class PatientAlias(PatientAliasBase, table=True):
+class PatientAlias(AuditBase, PatientAliasBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_alias"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientAliasCreate(PatientAliasBase):
@@ -2298,15 +2547,15 @@ class PatientAliasRead(PatientAliasBase):
 
 
 class PatientConsentBase(SQLModel):
-    patient_id: int = Field(foreign_key="patient.id")
+    patient_id: int = Field(foreign_key="patient.id", index=True)
     consent_id: int = Field(foreign_key="consent.id")
     signed_on_date: date
     withdrawn_on_date: Optional[date]
 
 
-class PatientConsent(PatientConsentBase, table=True):
+class PatientConsent(AuditBase, PatientConsentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_consent"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientConsentCreate(PatientConsentBase):
@@ -2317,6 +2566,36 @@ class PatientConsentRead(PatientConsentBase):
     id: int
 
 
+# --- PatientConsentState --- #
+
+
+class PatientConsentStateBase(SQLModel):
+    patient_id: int = Field(foreign_key="patient.id", primary_key=True)
+    consent_id: int = Field(foreign_key="consent.id", primary_key=True)
+    signed_on_date: date
+    withdrawn_on_date: Optional[date]
+    is_active: bool
+    needs_reconsent: bool
+    computed_date: datetime
+
+
+class PatientConsentState(PatientConsentStateBase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_consent_state"
+    __table_args__ = (
+        Index(
+            "patient_consent_state_consent_flags_idx",
+            "consent_id",
+            "is_active",
+            "needs_reconsent",
+            "patient_id",
+        ),
+    )
+
+
+class PatientConsentStateRead(PatientConsentStateBase):
+    pass
+
+
 # --- PatientConsultant --- #
 
 
@@ -2327,9 +2606,21 @@ class PatientConsultantBase(SQLModel):
     to_date: Optional[date]
 
 
-class PatientConsultant(PatientConsultantBase, table=True):
+class PatientConsultant(AuditBase, PatientConsultantBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_consultant"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        CheckConstraint(
+            "from_date <= to_date",
+            name="patient_consultant_period_check",
+            info={"repair": "from_date = to_date, to_date = from_date"},
+        ),
+        Index(
+            "patient_consultant_period_idx",
+            text("daterange(from_date, to_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientConsultantCreate(PatientConsultantBase):
@@ -2351,14 +2642,14 @@ class PatientDemographicBase(SQLModel):
     first_name: str
     last_name: str
     date_of_birth: date
-    gender: int
+    gender: int = Field(sa_type=SmallInteger)
     mobile_number: str
     email_address: str
 
 
-class PatientDemographic(PatientDemographicBase, table=True):
+class PatientDemographic(AuditBase, PatientDemographicBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_demographic"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientDemographicCreate(PatientDemographicBase):
@@ -2391,9 +2682,22 @@ class PatientDiagnosisBase(SQLModel):
     prenatal: bool
 
 
-class PatientDiagnosis(PatientDiagnosisBase, table=True):
+class PatientDiagnosis(AuditBase, PatientDiagnosisBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_diagnosis"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        CheckConstraint(
+            "from_date <= to_date",
+            name="patient_diagnosis_period_check",
+            info={"repair": "from_date = to_date, to_date = from_date"},
+        ),
+        Index(
+            "patient_diagnosis_period_idx",
+            text("daterange(from_date, to_date, '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+        Index("patient_diagnosis_patient_diagnosis_idx", "patient_id", "diagnosis_id"),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientDiagnosisCreate(PatientDiagnosisBase):
@@ -2414,9 +2718,9 @@ class PatientIdentifierBase(SQLModel):
     identifier: str
 
 
-class PatientIdentifier(PatientIdentifierBase, table=True):
+class PatientIdentifier(AuditBase, PatientIdentifierBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_identifier"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientIdentifierCreate(PatientIdentifierBase):
@@ -2427,6 +2731,30 @@ class PatientIdentifierRead(PatientIdentifierBase):
     id: int
 
 
+# --- PatientLinkCandidate --- #
+
+
+class PatientLinkCandidateBase(SQLModel):
+    patient_id: int = Field(foreign_key="patient.id", index=True)
+    candidate_patient_id: int = Field(foreign_key="patient.id", index=True)
+    match_score: float
+    reviewed_date: Optional[datetime]
+    is_match: Optional[bool]
+
+
+class PatientLinkCandidate(AuditBase, PatientLinkCandidateBase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_link_candidate"
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
+
+
+class PatientLinkCandidateCreate(PatientLinkCandidateBase):
+    pass
+
+
+class PatientLinkCandidateRead(PatientLinkCandidateBase):
+    id: int
+
+
 # --- PatientNationality --- #
 
 
@@ -2435,7 +2763,7 @@ class PatientNationalityBase(SQLModel):
     nationality_id: int = Field(foreign_key="nationality.id")
 
 
-class PatientNationality(PatientNationalityBase, table=True):
+class PatientNationality(AuditBase, PatientNationalityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_nationality"
     id: int = Field(default=None, primary_key=True)
 
@@ -2457,9 +2785,9 @@ class PatientReconsentBase(SQLModel):
     response_date: date
 
 
-class PatientReconsent(PatientReconsentBase, table=True):
+class PatientReconsent(AuditBase, PatientReconsentBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "patient_reconsent"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PatientReconsentRead(PatientReconsentBase):
@@ -2483,9 +2811,9 @@ class PlasmapheresisBase(SQLModel):
     response: str
 
 
-class Plasmapheresis(PlasmapheresisBase, table=True):
+class Plasmapheresis(AuditBase, PlasmapheresisBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "plasmapheresis"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PlasmapheresisCreate(PlasmapheresisBase):
@@ -2505,9 +2833,9 @@ class PostBase(SQLModel):
     body: str
 
 
-class Post(PostBase, table=True):
+class Post(AuditBase, PostBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "post"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PostCreate(PostBase):
@@ -2537,9 +2865,9 @@ class PregnancyBase(SQLModel):
     pre_eclampsia: str
 
 
-class Pregnancy(PregnancyBase, table=True):
+class Pregnancy(AuditBase, PregnancyBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "pregnancy"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class PregnancyCreate(PregnancyBase):
@@ -2560,9 +2888,9 @@ class ProcedureBase(SQLModel):
     date_of_procedure: date
 
 
-class Procedure(ProcedureBase, table=True):
+class Procedure(AuditBase, ProcedureBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "procedure"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ProcedureCreate(ProcedureBase):
@@ -2580,9 +2908,9 @@ class RelationBase(SQLModel):
     relationship: str
 
 
-class Relation(RelationBase, table=True):
+class Relation(AuditBase, RelationBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "relation"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RelationCreate(RelationBase):
@@ -2638,9 +2966,18 @@ class RenalCancerGeneticsBase(SQLModel):
     other_variant_status: str
 
 
-class RenalCancerGenetics(RenalCancerGeneticsBase, table=True):
+class RenalCancerGeneticsSummary(SQLModel):
+    id: int
+    patient_id: int
+    assessment_date: date
+
+
+class RenalCancerGenetics(
+    SummaryDeferred, AuditBase, RenalCancerGeneticsBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "renal_cancer_genetics"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = RenalCancerGeneticsSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RenalCancerGeneticsCreate(RenalCancerGeneticsBase):
@@ -2659,11 +2996,11 @@ class RenalCancerGeneticsOptionBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class RenalCancerGeneticsOption(RenalCancerGeneticsOptionBase, table=True):
+class RenalCancerGeneticsOption(AuditBase, RenalCancerGeneticsOptionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "renal_cancer_genetics_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RenalCancerGeneticsOptionCreate(RenalCancerGeneticsOptionBase):
@@ -2691,9 +3028,9 @@ class RenalCancerTumourBase(SQLModel):
     t_loc: str
 
 
-class RenalCancerTumour(RenalCancerTumourBase, table=True):
+class RenalCancerTumour(AuditBase, RenalCancerTumourBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "renal_cancer_tumour"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RenalCancerTumourCreate(RenalCancerTumourBase):
@@ -2711,7 +3048,7 @@ class RenalImagingBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     hospital_id: int = Field(foreign_key="hospital.id")
     data_source_id: int = Field(foreign_key="data_source.id")
-    assessment_date: datetime
+    assessment_date: date
     imaging_type: str
     right_present: bool
     right_type: str
@@ -2735,9 +3072,9 @@ class RenalImagingBase(SQLModel):
     left_other_malformation: str
 
 
-class RenalImaging(RenalImagingBase, table=True):
+class RenalImaging(AuditBase, RenalImagingBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "renal_imaging"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RenalImagingCreate(RenalImagingBase):
@@ -2761,9 +3098,9 @@ class RenalProgressionBase(SQLModel):
     ckd3b_date: date
 
 
-class RenalProgression(RenalProgressionBase, table=True):
+class RenalProgression(AuditBase, RenalProgressionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "renal_progression"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RenalProgressionCreate(RenalProgressionBase):
@@ -2781,15 +3118,24 @@ class ResultBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     hospital_id: int = Field(foreign_key="hospital.id")
     data_source_id: int = Field(foreign_key="data_source.id")
+    observation_id: Optional[int] = Field(foreign_key="observation.id")
     result_date: datetime
     qualifier: str
     result_value: str
     sent_value: str
 
 
-class Result(ResultBase, table=True):
+class Result(AuditBase, ResultBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "result"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __table_args__ = (
+        Index(
+            "result_patient_observation_date_idx",
+            "patient_id",
+            "observation_id",
+            "result_date",
+        ),
+    )
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class ResultCreate(ResultBase):
@@ -2816,11 +3162,13 @@ class RituximabBaselineAssessmentBase(SQLModel):
     comorbidities: bool
 
 
-class RituximabBaselineAssessment(RituximabBaselineAssessmentBase, table=True):
+class RituximabBaselineAssessment(
+    AuditBase, RituximabBaselineAssessmentBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_baseline_assessment"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabBaselineAssessmentCreate(RituximabBaselineAssessmentBase):
@@ -2842,12 +3190,12 @@ class RituximabBaselineAssessmentOptionBase(SQLModel):
 
 
 class RituximabBaselineAssessmentOption(
-    RituximabBaselineAssessmentOptionBase, table=True
+    AuditBase, RituximabBaselineAssessmentOptionBase, table=True
 ):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_baseline_assessment_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabBaselineAssessmentOptionCreate(RituximabBaselineAssessmentOptionBase):
@@ -2868,11 +3216,13 @@ class RituximabBaselinePreviousTreatmentBase(SQLModel):
     treatment_end_date: Optional[date]
 
 
-class RituximabBaselinePreviousTreatment(RituximabBaselineAssessmentBase, table=True):
+class RituximabBaselinePreviousTreatment(
+    AuditBase, RituximabBaselineAssessmentBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_baseline_previous_treatment"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabBaselinePreviousTreatmentCreate(RituximabBaselineAssessmentBase):
@@ -2913,9 +3263,9 @@ class RituximabCriteriaBase(SQLModel):
     previous_hospitalization: bool
 
 
-class RituximabCriteria(RituximabCriteriaBase, table=True):
+class RituximabCriteria(AuditBase, RituximabCriteriaBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "rituximab_criteria"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabCriteriaCreate(RituximabCriteriaBase):
@@ -2947,11 +3297,13 @@ class RituximabFollowUpAssessmentBase(SQLModel):
     immunosuppression_comments: str
 
 
-class RituximabFollowUpAssessment(RituximabFollowUpAssessmentBase, table=True):
+class RituximabFollowUpAssessment(
+    AuditBase, RituximabFollowUpAssessmentBase, table=True
+):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_follow_up_assessment"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabFollowUpAssessmentCreate(RituximabFollowUpAssessmentBase):
@@ -2973,12 +3325,12 @@ class RituximabFollowUpAssessmentOptionBase(SQLModel):
 
 
 class RituximabFollowUpAssessmentOption(
-    RituximabFollowUpAssessmentOptionBase, table=True
+    AuditBase, RituximabFollowUpAssessmentOptionBase, table=True
 ):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_follow_up_assessment_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabFollowUpAssessmentOptionCreate(RituximabFollowUpAssessmentOptionBase):
@@ -3003,9 +3355,9 @@ class RituximabToxicityBase(SQLModel):
     other_toxicity: Optional[str]
 
 
-class RituximabToxicity(RituximabToxicityBase, table=True):
+class RituximabToxicity(AuditBase, RituximabToxicityBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "rituximab_toxicity"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabToxicityCreate(RituximabToxicityBase):
@@ -3024,11 +3376,11 @@ class RituximabToxicityOptionBase(SQLModel):
     option_id: int = Field(foreign_key="option.id")
 
 
-class RituximabToxicityOption(RituximabToxicityOptionBase, table=True):
+class RituximabToxicityOption(AuditBase, RituximabToxicityOptionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "rituximab_toxicity_option"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class RituximabToxicityOptionCreate(RituximabToxicityOptionBase):
@@ -3060,11 +3412,11 @@ class SaltWastingClinicalFeatureBase(SQLModel):
     other_x_ray_abnormality_text: str
 
 
-class SaltWastingClinicalFeature(SaltWastingClinicalFeatureBase, table=True):
+class SaltWastingClinicalFeature(AuditBase, SaltWastingClinicalFeatureBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = (
         "salt_wasting_clinical_feature"
     )
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SaltWastingClinicalFeatureCreate(SaltWastingClinicalFeatureBase):
@@ -3098,9 +3450,9 @@ class SampleInventoryBase(SQLModel):
     faeces_date: date
 
 
-class SampleInventory(SampleInventoryBase, table=True):
+class SampleInventory(AuditBase, SampleInventoryBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "sample_inventory"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SampleInventoryCreate(SampleInventoryBase):
@@ -3118,9 +3470,9 @@ class SampleTypeBase(SQLModel):
     sample_type_label: str = Field(unique=True)
 
 
-class SampleType(SampleTypeBase, table=True):
+class SampleType(AuditBase, SampleTypeBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "sample_type"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SampleTypeCreate(SampleTypeBase):
@@ -3137,19 +3489,19 @@ class SampleTypeRead(SampleTypeBase):
 class SixCITBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     completed_date: date
-    q1: int
-    q2: int
-    q3: int
-    q4: int
-    q5: int
-    q6: int
-    q7: int
-    score: int
+    q1: int = Field(sa_type=SmallInteger)
+    q2: int = Field(sa_type=SmallInteger)
+    q3: int = Field(sa_type=SmallInteger)
+    q4: int = Field(sa_type=SmallInteger)
+    q5: int = Field(sa_type=SmallInteger)
+    q6: int = Field(sa_type=SmallInteger)
+    q7: int = Field(sa_type=SmallInteger)
+    score: int = Field(sa_type=SmallInteger)
 
 
-class SixCIT(SixCITBase, table=True):
+class SixCIT(AuditBase, SixCITBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "six_cit"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SixCITCreate(SixCITBase):
@@ -3186,9 +3538,18 @@ class SocioEconomicBase(SQLModel):
     other_diet: str
 
 
-class SocioEconomic(SocioEconomicBase, table=True):
+class SocioEconomicSummary(SQLModel):
+    id: int
+    patient_id: int
+    assessment_date: date
+    education: int
+    employment_status: int
+
+
+class SocioEconomic(SummaryDeferred, AuditBase, SocioEconomicBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "socioeconomic"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    __summary__: ClassVar[type[SQLModel]] = SocioEconomicSummary
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SocioEconomicCreate(SocioEconomicBase):
@@ -3206,9 +3567,9 @@ class SpecialtyBase(SQLModel):
     specialty: str = Field(unique=True)
 
 
-class Specialty(SpecialtyBase, table=True):
+class Specialty(AuditBase, SpecialtyBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "specialty"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class SpecialtyCreate(SpecialtyBase):
@@ -3228,19 +3589,19 @@ class TransplantBase(SQLModel):
     transplant_hospital_id: int = Field(foreign_key="hospital.id")
     data_source_id: int = Field(foreign_key="data_source.id")
     transplant_date: date
-    modality: int
-    date_of_recurrence: date
-    date_of_failure: date
+    modality: int = Field(sa_type=SmallInteger)
+    date_of_recurrence: Optional[date]
+    date_of_failure: Optional[date]
     recurrence: bool
-    date_of_cmv_infection: date
+    date_of_cmv_infection: Optional[date]
     donor_hla: str
     recipient_hla: str
     graft_loss_cause: str
 
 
-class Transplant(TransplantBase, table=True):
+class Transplant(AuditBase, TransplantBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "transplant"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class TransplantCreate(TransplantBase):
@@ -3260,7 +3621,7 @@ class TransplantBiopsyBase(SQLModel):
     recurrence: bool
 
 
-class TransplantBiopsy(TransplantBiopsyBase, table=True):
+class TransplantBiopsy(AuditBase, TransplantBiopsyBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "transplant_biopsy"
     id: int = Field(default=None, primary_key=True)
 
@@ -3273,6 +3634,33 @@ class TransplantBiopsyRead(TransplantBiopsyBase):
     id: int
 
 
+# --- TransplantHLA --- #
+
+
+class TransplantHLABase(SQLModel):
+    transplant_id: int = Field(
+        index=True,
+        sa_column_args=[ForeignKey("transplant.id", ondelete="CASCADE")],
+    )
+    is_donor: bool
+    locus: str
+    antigen_one: int
+    antigen_two: Optional[int]
+
+
+class TransplantHLA(AuditBase, TransplantHLABase, table=True):
+    __tablename__: ClassVar[Union[str, Callable[..., str]]] = "transplant_hla"
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
+
+
+class TransplantHLACreate(TransplantHLABase):
+    pass
+
+
+class TransplantHLARead(TransplantHLABase):
+    id: int
+
+
 # --- TransplantRejection --- #
 
 
@@ -3281,9 +3669,9 @@ class TransplantRejectionBase(SQLModel):
     rejection_date: date
 
 
-class TransplantRejection(TransplantRejectionBase, table=True):
+class TransplantRejection(AuditBase, TransplantRejectionBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "transplant_rejection"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class TransplantRejectionCreate(TransplantRejectionBase):
@@ -3300,13 +3688,13 @@ class TransplantRejectionRead(TransplantRejectionBase):
 class TubeSampleBase(SQLModel):
     patient_id: int = Field(foreign_key="patient.id")
     sample_date: date
-    barcode: str
-    ins_state: int
+    barcode: str = Field(unique=True)
+    ins_state: int = Field(sa_type=SmallInteger)
 
 
-class TubeSample(TubeSampleBase, table=True):
+class TubeSample(AuditBase, TubeSampleBase, table=True):
     __tablename__: ClassVar[Union[str, Callable[..., str]]] = "tube_sample"
-    id: Optional[int] = Field(sa_column=Column(BigInteger(), primary_key=True))
+    id: Optional[int] = Field(sa_column=Column(BIGINT_KEY, primary_key=True))
 
 
 class TubeSampleCreate(TubeSampleBase):
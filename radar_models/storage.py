@@ -0,0 +1,125 @@
+import os
+from typing import Any, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    SmallInteger,
+    String,
+    Table,
+    create_engine,
+    text,
+)
+from sqlalchemy.types import TypeEngine
+from sqlmodel import SQLModel
+
+import radar_models.radar3  # noqa: F401  pylint: disable=unused-import
+
+# Estimated PostgreSQL heap row widths for radar3, and the bytes per row
+# saved by the compact column types (SMALLINT, enums) over the types SQLModel
+# would map the same fields to (INTEGER, VARCHAR). Widths follow the on-disk
+# layout: a 23 byte tuple header and null bitmap padded to 8 bytes, then
+# each column padded to its type's alignment. Variable width text is
+# estimated at TEXT_WIDTH characters with a one byte header. Bounded VARCHAR
+# is stored exactly like VARCHAR, so it documents a limit but saves nothing.
+
+TEXT_WIDTH = 12
+TUPLE_HEADER = 23
+MAXALIGN = 8
+
+# (width, alignment) in bytes.
+FIXED = (
+    (SmallInteger, (2, 2)),
+    (BigInteger, (8, 8)),
+    (Integer, (4, 4)),
+    (Boolean, (1, 1)),
+    (Date, (4, 4)),
+    (DateTime, (8, 8)),
+    (Float, (8, 8)),
+    (Enum, (4, 4)),
+)
+
+
+def _align(offset: int, alignment: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def width(column_type: TypeEngine) -> tuple[int, int]:
+    for fixed, size in FIXED:
+        if isinstance(column_type, fixed):
+            return size
+    return 1 + TEXT_WIDTH, 1
+
+
+def baseline_width(column_type: TypeEngine) -> tuple[int, int]:
+    """The width of the type SQLModel would have used by default."""
+    if isinstance(column_type, SmallInteger):
+        return width(Integer())
+    if isinstance(column_type, Enum):
+        labels = column_type.enums
+        return 1 + round(sum(map(len, labels)) / len(labels)), 1
+    if isinstance(column_type, String):
+        return width(String())
+    return width(column_type)
+
+
+def row_width(table: Table, baseline: bool = False) -> int:
+    measure = baseline_width if baseline else width
+    columns = list(table.columns)
+    header = TUPLE_HEADER
+    if any(column.nullable for column in columns):
+        header += -(-len(columns) // 8)
+    offset = _align(header, MAXALIGN)
+    for column in columns:
+        size, alignment = measure(column.type)
+        offset = _align(offset, alignment) + size
+    return _align(offset, MAXALIGN)
+
+
+def report(
+    row_counts: Optional[dict[str, int]] = None,
+) -> list[tuple[str, int, int, int, int]]:
+    """(table, rows, baseline width, width, bytes saved) for every table the
+    compact types shrink, the largest saving first. Without ``row_counts``
+    rows are taken as 1, i.e. the saving per row."""
+    rows = []
+    for table in SQLModel.metadata.sorted_tables:
+        before, after = row_width(table, baseline=True), row_width(table)
+        if before == after:
+            continue
+        count = (row_counts or {}).get(table.name, 1 if row_counts is None else 0)
+        rows.append((table.name, count, before, after, (before - after) * count))
+    rows.sort(key=lambda row: (row[4], row[2] - row[3]), reverse=True)
+    return rows
+
+
+def row_counts(connection: Any) -> dict[str, int]:
+    """Planner row estimates from pg_class, current as of the last ANALYZE."""
+    return dict(
+        connection.execute(
+            text(
+                "SELECT relname, reltuples::bigint FROM pg_class "
+                "WHERE relkind = 'r' AND relname = ANY(:names)"
+            ),
+            {"names": list(SQLModel.metadata.tables)},
+        ).all()
+    )
+
+
+def main() -> None:
+    counts = None
+    if url := os.environ.get("DATABASE_URL"):
+        with create_engine(url).connect() as connection:
+            counts = row_counts(connection)
+    print(f"{'table':<24}{'rows':>14}{'before':>8}{'after':>8}{'saved':>16}")
+    for table, rows, before, after, saved in report(counts):
+        print(f"{table:<24}{rows:>14}{before:>8}{after:>8}{saved:>16}")
+
+
+if __name__ == "__main__":
+    main()
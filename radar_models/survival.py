@@ -0,0 +1,198 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Hashable, Optional, Sequence
+
+from sqlmodel import Session, func, select
+
+from radar_models.radar3 import (
+    Death,
+    Transplant,
+    TransplantBiopsy,
+    TransplantRejection,
+)
+
+# Kaplan-Meier survival for transplant cohorts. Each table is read with one
+# streamed query into parallel column lists, and every curve is a single sort
+# and sweep over (duration, event) pairs.
+
+ENDPOINTS = ("graft", "death_censored_graft", "patient", "rejection", "recurrence")
+
+
+@dataclass
+class TransplantCohort:
+    transplant_id: list[int] = field(default_factory=list)
+    patient_id: list[int] = field(default_factory=list)
+    hospital_id: list[int] = field(default_factory=list)
+    modality: list[int] = field(default_factory=list)
+    transplant_date: list[date] = field(default_factory=list)
+    date_of_failure: list[Optional[date]] = field(default_factory=list)
+    date_of_recurrence: list[Optional[date]] = field(default_factory=list)
+    date_of_death: list[Optional[date]] = field(default_factory=list)
+    first_rejection: list[Optional[date]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.transplant_id)
+
+
+@dataclass(frozen=True)
+class SurvivalPoint:
+    days: int
+    at_risk: int
+    events: int
+    censored: int
+    survival: float
+
+
+def load_cohort(session: Session, yield_per: int = 10000) -> TransplantCohort:
+    deaths = dict(
+        session.exec(
+            select(Death.patient_id, func.min(Death.date_of_death)).group_by(
+                Death.patient_id
+            )
+        ).all()
+    )
+    rejections = dict(
+        session.exec(
+            select(
+                TransplantRejection.transplant_id,
+                func.min(TransplantRejection.rejection_date),
+            ).group_by(TransplantRejection.transplant_id)
+        ).all()
+    )
+    # A biopsy showing recurrence dates the recurrence if the transplant
+    # record itself does not.
+    biopsy_recurrences = dict(
+        session.exec(
+            select(
+                TransplantBiopsy.transplant_id,
+                func.min(TransplantBiopsy.biopsy_date),
+            )
+            .where(TransplantBiopsy.recurrence)
+            .group_by(TransplantBiopsy.transplant_id)
+        ).all()
+    )
+
+    cohort = TransplantCohort()
+    transplants = select(
+        Transplant.id,
+        Transplant.patient_id,
+        Transplant.hospital_id,
+        Transplant.modality,
+        Transplant.transplant_date,
+        Transplant.date_of_failure,
+        Transplant.date_of_recurrence,
+    ).where(
+        Transplant.transplant_date.is_not(None)  # type: ignore[attr-defined]
+    )
+    for row in session.exec(transplants.execution_options(yield_per=yield_per)):
+        transplant_id, patient_id = row[0], row[1]
+        cohort.transplant_id.append(transplant_id)
+        cohort.patient_id.append(patient_id)
+        cohort.hospital_id.append(row[2])
+        cohort.modality.append(row[3])
+        cohort.transplant_date.append(row[4])
+        cohort.date_of_failure.append(row[5])
+        cohort.date_of_recurrence.append(
+            min(
+                filter(None, (row[6], biopsy_recurrences.get(transplant_id))),
+                default=None,
+            )
+        )
+        cohort.date_of_death.append(deaths.get(patient_id))
+        cohort.first_rejection.append(rejections.get(transplant_id))
+    return cohort
+
+
+def outcomes(
+    cohort: TransplantCohort,
+    endpoint: str = "graft",
+    censor_date: Optional[date] = None,
+) -> tuple[list[int], list[bool]]:
+    """Return (duration in days, event observed) per transplant. Follow-up
+    without an event is censored at ``censor_date`` (default today)."""
+    if endpoint not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {endpoint!r}, expected one of {ENDPOINTS}")
+    censor_date = censor_date or date.today()
+
+    if endpoint == "graft":
+        event_dates = [
+            min(filter(None, dates), default=None)
+            for dates in zip(cohort.date_of_failure, cohort.date_of_death)
+        ]
+        competing: Sequence[Optional[date]] = [None] * len(cohort)
+    elif endpoint == "death_censored_graft":
+        event_dates, competing = cohort.date_of_failure, cohort.date_of_death
+    elif endpoint == "patient":
+        event_dates, competing = cohort.date_of_death, [None] * len(cohort)
+    elif endpoint == "rejection":
+        event_dates, competing = cohort.first_rejection, cohort.date_of_death
+    else:
+        event_dates = cohort.date_of_recurrence
+        competing = [
+            min(filter(None, dates), default=None)
+            for dates in zip(cohort.date_of_failure, cohort.date_of_death)
+        ]
+
+    durations, events = [], []
+    for start, event_date, competing_date in zip(
+        cohort.transplant_date, event_dates, competing
+    ):
+        end = min(filter(None, (event_date, competing_date, censor_date)))
+        durations.append(max((end - start).days, 0))
+        events.append(event_date is not None and end == event_date)
+    return durations, events
+
+
+def kaplan_meier(
+    durations: Sequence[int], events: Sequence[bool]
+) -> list[SurvivalPoint]:
+    order = sorted(range(len(durations)), key=durations.__getitem__)
+    at_risk = len(order)
+    survival = 1.0
+    curve = []
+    index = 0
+    while index < len(order):
+        days = durations[order[index]]
+        observed = censored = 0
+        while index < len(order) and durations[order[index]] == days:
+            if events[order[index]]:
+                observed += 1
+            else:
+                censored += 1
+            index += 1
+        if observed:
+            survival *= 1 - observed / at_risk
+        curve.append(SurvivalPoint(days, at_risk, observed, censored, survival))
+        at_risk -= observed + censored
+    return curve
+
+
+def survival_at(curve: Sequence[SurvivalPoint], days: int) -> float:
+    estimate = 1.0
+    for point in curve:
+        if point.days > days:
+            break
+        estimate = point.survival
+    return estimate
+
+
+def stratified_survival(
+    cohort: TransplantCohort,
+    endpoint: str = "graft",
+    by: str = "modality",
+    censor_date: Optional[date] = None,
+) -> dict[Hashable, list[SurvivalPoint]]:
+    """Kaplan-Meier curve per value of a cohort column, e.g. ``modality`` or
+    ``hospital_id``."""
+    durations, events = outcomes(cohort, endpoint, censor_date)
+    strata: defaultdict[Hashable, list[int]] = defaultdict(list)
+    for index, key in enumerate(getattr(cohort, by)):
+        strata[key].append(index)
+    return {
+        key: kaplan_meier(
+            [durations[index] for index in indexes],
+            [events[index] for index in indexes],
+        )
+        for key, indexes in strata.items()
+    }
@@ -0,0 +1,480 @@
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import CheckConstraint, Table, insert
+from sqlalchemy.orm import Session
+
+# Python predicates compiled from the CHECK constraints of a table, so bulk
+# loads can drop violating rows before INSERT instead of losing the whole
+# batch at COMMIT. The constraints are read from the reflected pg_dump form
+# used in radar2 ("(code)::text ~ similar_escape(...)", "= ANY (ARRAY[...])")
+# and parsed by a small recursive descent parser. Expressions it does not
+# understand raise UnsupportedCheck and are left to the database.
+#
+# Predicates follow SQL three-valued logic: a row only violates a CHECK when
+# the expression is false, an unknown (NULL) result passes. Casts convert
+# values as PostgreSQL would, and a row whose values cannot be evaluated
+# (a failed cast, a string compared with a number) fails the check, as the
+# INSERT would fail in the database.
+
+Row = Mapping[str, Any]
+Predicate = Callable[[Row], Any]
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*|"[^"]+")
+      | (?P<op>::|%%|<>|!=|>=|<=|[=<>~%+\-(),\[\]])
+    )""",
+    re.VERBOSE,
+)
+
+COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda left, right: left == right,
+    "<>": lambda left, right: left != right,
+    "!=": lambda left, right: left != right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+}
+
+ARITHMETIC: dict[str, Callable[[Any, Any], Any]] = {
+    "%": lambda left, right: left % right,
+    "%%": lambda left, right: left % right,
+    "+": lambda left, right: left + right,
+    "-": lambda left, right: left - right,
+}
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("t", "true", "y", "yes", "on", "1"):
+        return True
+    if text in ("f", "false", "n", "no", "off", "0"):
+        return False
+    raise ValueError(f"invalid input syntax for type boolean: {value!r}")
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+# Casts to other types, such as enums, leave the value as it is.
+CASTS: dict[str, Callable[[Any], Any]] = {
+    "text": _text,
+    "varchar": _text,
+    "character varying": _text,
+    "character": _text,
+    "char": _text,
+    "bpchar": _text,
+    "smallint": int,
+    "integer": int,
+    "int": int,
+    "int2": int,
+    "int4": int,
+    "int8": int,
+    "bigint": int,
+    "real": float,
+    "float4": float,
+    "float8": float,
+    "double precision": float,
+    "numeric": float,
+    "boolean": _boolean,
+    "bool": _boolean,
+}
+
+EVALUATION_ERRORS = (TypeError, ValueError, ArithmeticError, re.error)
+
+
+class UnsupportedCheck(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Constant:
+    value: Any
+
+    def __call__(self, row: Row) -> Any:
+        return self.value
+
+
+def similar_to_regex(pattern: str) -> str:
+    """Translate a SQL SIMILAR TO pattern to an anchored Python regex, as
+    PostgreSQL's similar_escape does."""
+    translated = []
+    escaped = False
+    for character in pattern:
+        if escaped:
+            translated.append(re.escape(character))
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character == "%":
+            translated.append(".*")
+        elif character == "_":
+            translated.append(".")
+        elif character in ".^$":
+            # Not metacharacters in SIMILAR TO.
+            translated.append("\\" + character)
+        else:
+            translated.append(character)
+    return f"^(?:{''.join(translated)})$"
+
+
+def array_length(values: Optional[Sequence[Any]], dimension: int) -> Optional[int]:
+    if dimension != 1:
+        raise UnsupportedCheck("array_length is only supported for dimension 1")
+    return len(values) if values else None
+
+
+def coalesce(*values: Any) -> Any:
+    return next((value for value in values if value is not None), None)
+
+
+FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "coalesce": coalesce,
+    "array_length": array_length,
+    "similar_escape": lambda pattern, escape=None: (
+        None if pattern is None else similar_to_regex(pattern)
+    ),
+    "lower": lambda value: None if value is None else value.lower(),
+    "upper": lambda value: None if value is None else value.upper(),
+    "length": lambda value: None if value is None else len(value),
+}
+
+
+def _and(operands: list[Predicate]) -> Predicate:
+    def predicate(row: Row) -> Optional[bool]:
+        unknown = False
+        for operand in operands:
+            value = operand(row)
+            if value is None:
+                unknown = True
+            elif not value:
+                return False
+        return None if unknown else True
+
+    return predicate
+
+
+def _or(operands: list[Predicate]) -> Predicate:
+    def predicate(row: Row) -> Optional[bool]:
+        unknown = False
+        for operand in operands:
+            value = operand(row)
+            if value is None:
+                unknown = True
+            elif value:
+                return True
+        return None if unknown else False
+
+    return predicate
+
+
+def _not(operand: Predicate) -> Predicate:
+    def predicate(row: Row) -> Optional[bool]:
+        value = operand(row)
+        return None if value is None else not value
+
+    return predicate
+
+
+def _binary(
+    function: Callable[[Any, Any], Any], left: Predicate, right: Predicate
+) -> Predicate:
+    if isinstance(left, Constant) and isinstance(right, Constant):
+        if left.value is None or right.value is None:
+            return Constant(None)
+        return Constant(function(left.value, right.value))
+
+    def predicate(row: Row) -> Any:
+        left_value, right_value = left(row), right(row)
+        if left_value is None or right_value is None:
+            return None
+        return function(left_value, right_value)
+
+    return predicate
+
+
+def _regex_match(left: Predicate, right: Predicate) -> Predicate:
+    if not isinstance(right, Constant):
+        return _binary(
+            lambda value, pattern: bool(re.search(pattern, value)), left, right
+        )
+    pattern = re.compile(right.value)
+
+    def predicate(row: Row) -> Optional[bool]:
+        value = left(row)
+        return None if value is None else pattern.search(value) is not None
+
+    return predicate
+
+
+def _any(left: Predicate, operator: str, right: Predicate) -> Predicate:
+    compare = COMPARISONS[operator]
+
+    def predicate(row: Row) -> Optional[bool]:
+        value, candidates = left(row), right(row)
+        if value is None or candidates is None:
+            return None
+        return any(compare(value, candidate) for candidate in candidates)
+
+    return predicate
+
+
+def _is_null(operand: Predicate, negated: bool) -> Predicate:
+    return lambda row: (operand(row) is None) != negated
+
+
+def _cast(operand: Predicate, convert: Callable[[Any], Any], array: bool) -> Predicate:
+    def cast(value: Any) -> Any:
+        if value is None:
+            return None
+        if array:
+            return [None if item is None else convert(item) for item in value]
+        return convert(value)
+
+    if isinstance(operand, Constant):
+        try:
+            return Constant(cast(operand.value))
+        except EVALUATION_ERRORS:
+            pass
+    return lambda row: cast(operand(row))
+
+
+def _call(function: Callable[..., Any], arguments: list[Predicate]) -> Predicate:
+    if all(isinstance(argument, Constant) for argument in arguments):
+        return Constant(function(*(argument({}) for argument in arguments)))
+    return lambda row: function(*(argument(row) for argument in arguments))
+
+
+class _Parser:
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.tokens: list[tuple[str, str]] = []
+        position = 0
+        sql = sql.rstrip()
+        while position < len(sql):
+            match = TOKEN_PATTERN.match(sql, position)
+            if match is None or match.end() == position:
+                raise UnsupportedCheck(f"Cannot tokenise {sql[position:]!r}")
+            kind = match.lastgroup or ""
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> tuple[str, str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ("end", "")
+
+    def keyword(self, *words: str) -> bool:
+        kind, value = self.peek()
+        if kind == "name" and value.upper() in words:
+            self.position += 1
+            return True
+        return False
+
+    def symbol(self, *symbols: str) -> Optional[str]:
+        kind, value = self.peek()
+        if kind == "op" and value in symbols:
+            self.position += 1
+            return value
+        return None
+
+    def expect(self, symbol: str) -> None:
+        if self.symbol(symbol) is None:
+            raise UnsupportedCheck(f"Expected {symbol!r} in {self.sql!r}")
+
+    def parse(self) -> Predicate:
+        expression = self.disjunction()
+        if self.peek()[0] != "end":
+            raise UnsupportedCheck(f"Unexpected {self.peek()[1]!r} in {self.sql!r}")
+        return expression
+
+    def disjunction(self) -> Predicate:
+        operands = [self.conjunction()]
+        while self.keyword("OR"):
+            operands.append(self.conjunction())
+        return operands[0] if len(operands) == 1 else _or(operands)
+
+    def conjunction(self) -> Predicate:
+        operands = [self.negation()]
+        while self.keyword("AND"):
+            operands.append(self.negation())
+        return operands[0] if len(operands) == 1 else _and(operands)
+
+    def negation(self) -> Predicate:
+        if self.keyword("NOT"):
+            return _not(self.negation())
+        return self.comparison()
+
+    def comparison(self) -> Predicate:
+        left = self.arithmetic()
+        if self.keyword("IS"):
+            negated = self.keyword("NOT")
+            if not self.keyword("NULL"):
+                raise UnsupportedCheck(f"Only IS [NOT] NULL is supported: {self.sql!r}")
+            return _is_null(left, negated)
+        if self.symbol("~"):
+            return _regex_match(left, self.arithmetic())
+        operator = self.symbol(*COMPARISONS)
+        if operator is None:
+            return left
+        if self.keyword("ANY"):
+            self.expect("(")
+            right = self.disjunction()
+            self.expect(")")
+            return _any(left, operator, right)
+        return _binary(COMPARISONS[operator], left, self.arithmetic())
+
+    def arithmetic(self) -> Predicate:
+        left = self.primary()
+        while (operator := self.symbol(*ARITHMETIC)) is not None:
+            left = _binary(ARITHMETIC[operator], left, self.primary())
+        return left
+
+    def primary(self) -> Predicate:
+        kind, value = self.peek()
+        if self.symbol("("):
+            operand = self.disjunction()
+            self.expect(")")
+        elif kind == "string":
+            self.position += 1
+            operand = Constant(value[1:-1].replace("''", "'"))
+        elif kind == "number":
+            self.position += 1
+            operand = Constant(float(value) if "." in value else int(value))
+        elif self.keyword("NULL"):
+            operand = Constant(None)
+        elif self.keyword("TRUE", "FALSE"):
+            operand = Constant(value.upper() == "TRUE")
+        elif self.keyword("ARRAY"):
+            self.expect("[")
+            items = self.arguments("]")
+            operand = _call(lambda *values: list(values), items)
+        elif kind == "name":
+            self.position += 1
+            name = value.strip('"')
+            if self.symbol("("):
+                if name.lower() not in FUNCTIONS:
+                    raise UnsupportedCheck(f"Unsupported function {name}()")
+                operand = _call(FUNCTIONS[name.lower()], self.arguments(")"))
+            else:
+                operand = lambda row, name=name: row.get(name)
+        else:
+            raise UnsupportedCheck(f"Unexpected {value!r} in {self.sql!r}")
+        while self.symbol("::"):
+            words = []
+            if self.peek()[0] == "name":
+                words.append(self.peek()[1].strip('"').lower())
+                self.position += 1
+                if self.keyword("VARYING", "PRECISION"):
+                    words.append(self.tokens[self.position - 1][1].lower())
+            array = self.symbol("[") is not None
+            if array:
+                self.expect("]")
+            convert = CASTS.get(" ".join(words))
+            if convert is not None:
+                operand = _cast(operand, convert, array)
+        return operand
+
+    def arguments(self, closing: str) -> list[Predicate]:
+        if self.symbol(closing):
+            return []
+        arguments = [self.disjunction()]
+        while self.symbol(","):
+            arguments.append(self.disjunction())
+        self.expect(closing)
+        return arguments
+
+
+def compile_check(sql: str) -> Predicate:
+    """A predicate for the CHECK expression ``sql``: True, False, or None
+    for unknown. Rows that cannot be evaluated give False."""
+    expression = _Parser(sql).parse()
+
+    def predicate(row: Row) -> Any:
+        try:
+            return expression(row)
+        except EVALUATION_ERRORS:
+            return False
+
+    return predicate
+
+
+@dataclass
+class TableValidator:
+    table: Table
+    checks: list[tuple[str, Predicate]] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+
+    def violations(self, row: Row) -> list[str]:
+        return [sql for sql, predicate in self.checks if predicate(row) is False]
+
+    def split(
+        self, rows: Iterable[Row]
+    ) -> tuple[list[Row], list[tuple[Row, list[str]]]]:
+        """Partition ``rows`` into (valid rows, (row, failed checks) pairs)."""
+        valid, rejected = [], []
+        for row in rows:
+            if failed := self.violations(row):
+                rejected.append((row, failed))
+            else:
+                valid.append(row)
+        return valid, rejected
+
+
+def table_validator(table: Table) -> TableValidator:
+    validator = TableValidator(table)
+    for constraint in table.constraints:
+        if not isinstance(constraint, CheckConstraint):
+            continue
+        sql = str(constraint.sqltext)
+        try:
+            validator.checks.append((sql, compile_check(sql)))
+        except UnsupportedCheck:
+            validator.skipped.append(sql)
+    return validator
+
+
+_validators: dict[Table, TableValidator] = {}
+
+
+def validator_for(table: Table) -> TableValidator:
+    if table not in _validators:
+        _validators[table] = table_validator(table)
+    return _validators[table]
+
+
+def write_rejects(rejected: Sequence[tuple[Row, list[str]]], path: Path) -> None:
+    """Append rejected rows to ``path`` as JSON lines."""
+    with Path(path).open("a") as reject_file:
+        for row, failed in rejected:
+            reject_file.write(
+                json.dumps({"row": dict(row), "violations": failed}, default=str)
+            )
+            reject_file.write("\n")
+
+
+def load_valid(
+    session: Session, table: Table, rows: Iterable[Row], reject_path: Path
+) -> tuple[int, int]:
+    """Insert the rows of ``rows`` that pass the table's CHECK constraints in
+    one executemany, write the rest to ``reject_path``. Returns (inserted,
+    rejected)."""
+    valid, rejected = validator_for(table).split(rows)
+    if rejected:
+        write_rejects(rejected, reject_path)
+    if valid:
+        session.execute(insert(table), valid)
+    return len(valid), len(rejected)
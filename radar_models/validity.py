@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Union
+
+from sqlalchemy import and_, cast, func, literal, literal_column, or_, true
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import Boolean
+
+from radar_models import radar2
+from radar_models.radar3 import (
+    CohortPatient,
+    Medication,
+    PatientAddress,
+    PatientConsultant,
+    PatientDiagnosis,
+)
+
+# As-of and overlap predicates for tables that record a validity period as a
+# pair of start/end columns. On PostgreSQL they compile to range operators on
+# the same daterange/tstzrange expression as the table's GiST *_period_idx
+# index, so the planner can use it. Other dialects get the equivalent
+# two-sided comparison. Both ends are inclusive and a NULL end is open. Each
+# table's *_period_check keeps start <= end, since daterange() raises on an
+# inverted pair and would otherwise fail the index build and the query.
+
+Moment = Union[date, datetime]
+
+
+@dataclass(frozen=True)
+class Period:
+    start: Any
+    end: Any
+    range_function: str = "daterange"
+
+
+PERIODS = {
+    PatientAddress: Period(PatientAddress.from_date, PatientAddress.to_date),
+    PatientConsultant: Period(PatientConsultant.from_date, PatientConsultant.to_date),
+    PatientDiagnosis: Period(PatientDiagnosis.from_date, PatientDiagnosis.to_date),
+    Medication: Period(Medication.start_date, Medication.finish_date),
+    CohortPatient: Period(CohortPatient.recruited_date, CohortPatient.removed_date),
+    radar2.GroupPatient: Period(
+        radar2.GroupPatient.from_date, radar2.GroupPatient.to_date, "tstzrange"
+    ),
+}
+
+
+class _PeriodPredicate(ColumnElement):
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [
+        ("start", InternalTraversal.dp_clauseelement),
+        ("end", InternalTraversal.dp_clauseelement),
+        ("range_function", InternalTraversal.dp_string),
+        ("lower", InternalTraversal.dp_clauseelement),
+        ("upper", InternalTraversal.dp_clauseelement),
+        ("bounded", InternalTraversal.dp_plain_obj),
+    ]
+
+    def __init__(
+        self, period: Period, lower: Optional[Moment], upper: Optional[Moment]
+    ):
+        self.start = coercions.expect(roles.ExpressionElementRole, period.start)
+        self.end = coercions.expect(roles.ExpressionElementRole, period.end)
+        self.range_function = period.range_function
+        self.lower = literal(lower, type_=self.start.type)
+        self.upper = literal(upper, type_=self.start.type)
+        self.bounded = (lower is not None, upper is not None)
+
+    def self_group(self, against: Any = None) -> ColumnElement:
+        # Compiles to a complete, parenthesised predicate.
+        return self
+
+    def range(self, start: Any, end: Any) -> ColumnElement:
+        # The bounds must be a literal, not a bound parameter, for the
+        # expression to match the index definition.
+        return getattr(func, self.range_function)(start, end, literal_column("'[]'"))
+
+    def comparison(self) -> ColumnElement:
+        clauses = []
+        if self.bounded[1]:
+            clauses.append(or_(self.start.is_(None), self.start <= self.upper))
+        if self.bounded[0]:
+            clauses.append(or_(self.end.is_(None), self.end >= self.lower))
+        return and_(true(), *clauses)
+
+
+class AsOf(_PeriodPredicate):
+    inherit_cache = True
+
+
+class Overlaps(_PeriodPredicate):
+    inherit_cache = True
+
+
+@compiles(AsOf)
+@compiles(Overlaps)
+def _compile_comparison(
+    element: _PeriodPredicate, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return f"({compiler.process(element.comparison(), **kw)})"
+
+
+@compiles(AsOf, "postgresql")
+def _compile_contains(element: AsOf, compiler: SQLCompiler, **kw: Any) -> str:
+    # Range operators need the value typed like the range elements.
+    moment = cast(element.lower, element.start.type)
+    expression = element.range(element.start, element.end).op("@>")(moment)
+    return f"({compiler.process(expression, **kw)})"
+
+
+@compiles(Overlaps, "postgresql")
+def _compile_overlaps(element: Overlaps, compiler: SQLCompiler, **kw: Any) -> str:
+    other = element.range(
+        cast(element.lower, element.start.type),
+        cast(element.upper, element.start.type),
+    )
+    expression = element.range(element.start, element.end).op("&&")(other)
+    return f"({compiler.process(expression, **kw)})"
+
+
+def period_of(model: Any) -> Period:
+    try:
+        return PERIODS[model]
+    except KeyError:
+        raise ValueError(f"{model.__name__} has no validity period") from None
+
+
+def as_of(model: Any, moment: Moment) -> ColumnElement:
+    """Rows of ``model`` whose validity period includes ``moment``, e.g.
+    ``select(Medication).where(Medication.drug_id == 1, as_of(Medication, d))``."""
+    return AsOf(period_of(model), moment, moment)
+
+
+def overlapping(
+    model: Any, start: Optional[Moment], end: Optional[Moment]
+) -> ColumnElement:
+    """Rows of ``model`` valid at any point between ``start`` and ``end``
+    inclusive. A None bound is open."""
+    return Overlaps(period_of(model), start, end)
@@ -0,0 +1,118 @@
+from datetime import date, datetime
+
+from sqlalchemy import Column, Date, Integer, MetaData, Table, event
+from sqlmodel import Session, SQLModel, create_engine
+
+from radar_models.barcodes import (
+    BarcodeRegistry,
+    BarcodeSource,
+    BloomFilter,
+    duplicate_barcodes,
+)
+from radar_models.radar3 import BiomarkerBarcode, TubeSample
+
+LABELS = Table(
+    "labels",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("barcode", Integer),
+    Column("patient_id", Integer),
+    Column("sample_date", Date),
+)
+LABEL_SOURCE = BarcodeSource(
+    "label", LABELS.c.barcode, LABELS.c.patient_id, LABELS.c.sample_date
+)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    for index in range(1000):
+        bloom.add(f"TS{index}")
+    assert all(f"TS{index}" in bloom for index in range(1000))
+    assert sum(f"XX{index}" in bloom for index in range(1000)) < 20
+
+
+def test_resolve():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                TubeSample(
+                    id=1,
+                    patient_id=7,
+                    sample_date=date(2020, 1, 1),
+                    barcode="TS1",
+                    ins_state=0,
+                ),
+                BiomarkerBarcode(
+                    id=1, patient_id=8, barcode="BM1", sample_date=datetime(2021, 1, 1)
+                ),
+            ]
+        )
+        session.commit()
+
+        matches = BarcodeRegistry().resolve(session, ["TS1", " BM1", "NOPE"])
+        assert [(match.sample_type, match.patient_id) for match in matches["TS1"]] == [
+            ("tube_sample", 7)
+        ]
+        assert [(match.sample_type, match.patient_id) for match in matches["BM1"]] == [
+            ("biomarker", 8)
+        ]
+        assert matches["NOPE"] == []
+
+
+def test_filter_miss_falls_back_to_database():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        registry = BarcodeRegistry(fallback=True)
+        strict = BarcodeRegistry()
+        assert registry.resolve(session, ["TS1"]) == {"TS1": []}
+        strict.refresh(session)
+
+        # Labelled by another process after the filters were built.
+        session.add(
+            TubeSample(
+                patient_id=7, sample_date=date(2020, 1, 1), barcode="TS1", ins_state=0
+            )
+        )
+        session.commit()
+        assert strict.resolve(session, ["TS1"]) == {"TS1": []}
+        assert [
+            match.patient_id for match in registry.resolve(session, ["TS1"])["TS1"]
+        ] == [7]
+        assert registry.might_exist("TS1")
+
+
+def test_filter_miss_skips_database():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    statements = []
+    with Session(engine) as session:
+        registry = BarcodeRegistry()
+        registry.refresh(session)
+        event.listen(
+            engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+        )
+        assert registry.resolve(session, ["NOPE"]) == {"NOPE": []}
+        assert statements == []
+
+
+def test_integer_barcodes_keep_their_spelling():
+    engine = create_engine("sqlite://")
+    LABELS.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(
+            LABELS.insert(),
+            [
+                {"barcode": 7, "patient_id": 1, "sample_date": date(2020, 1, 1)},
+                {"barcode": 8, "patient_id": 2, "sample_date": date(2020, 1, 1)},
+                {"barcode": 8, "patient_id": 3, "sample_date": date(2020, 1, 2)},
+            ],
+        )
+        matches = BarcodeRegistry([LABEL_SOURCE]).resolve(session, ["007", "7", "X7"])
+        assert [match.barcode for match in matches["007"]] == ["007"]
+        assert [match.patient_id for match in matches["7"]] == [1]
+        assert matches["X7"] == []
+        assert duplicate_barcodes(session, [LABEL_SOURCE]) == {"label": {"8": 2}}
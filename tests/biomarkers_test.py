@@ -0,0 +1,65 @@
+import math
+from datetime import datetime
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from radar_models.biomarkers import cached_matrix, load_matrix
+from radar_models.radar3 import (
+    Biomarker,
+    BiomarkerBarcode,
+    BiomarkerResult,
+    BiomarkerSample,
+)
+
+
+def populate(session):
+    session.add_all(
+        [
+            Biomarker(id=1, biomarker_name="il6", biomarker_type="serum"),
+            Biomarker(id=2, biomarker_name="crp", biomarker_type="serum"),
+            BiomarkerBarcode(
+                id=1, patient_id=1, barcode="B1", sample_date=datetime(2020, 1, 1)
+            ),
+            BiomarkerBarcode(
+                id=2, patient_id=1, barcode="B2", sample_date=datetime(2020, 6, 1)
+            ),
+            BiomarkerSample(id=1, barcode_id=1, biomarker_sample_label="S1"),
+            BiomarkerSample(id=2, barcode_id=2, biomarker_sample_label="S2"),
+        ]
+    )
+    session.add_all(
+        BiomarkerResult(
+            id=result_id,
+            biomarker_id=biomarker_id,
+            biomarker_sample_id=sample_id,
+            biomarker_result_value=value,
+            measure_unit="mg/L",
+        )
+        for result_id, biomarker_id, sample_id, value in [
+            (1, 1, 1, 1.5),
+            (2, 2, 1, 3.0),
+            (3, 2, 2, 4.0),
+            (4, 2, 2, 5.0),
+        ]
+    )
+    session.commit()
+
+
+def test_load_matrix(tmp_path):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        populate(session)
+        matrix = load_matrix(session)
+
+        assert matrix.biomarkers == ["crp", "il6"]
+        assert matrix.timepoints == [
+            (1, datetime(2020, 1, 1)),
+            (1, datetime(2020, 6, 1)),
+        ]
+        dense = matrix.dense()
+        assert dense[0] == [3.0, 1.5]
+        assert dense[1][0] == 5.0 and math.isnan(dense[1][1])
+
+        assert cached_matrix(session, tmp_path).dense()[0] == [3.0, 1.5]
+        assert len(list(tmp_path.glob("*.json"))) == 1
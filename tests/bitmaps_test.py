@@ -0,0 +1,152 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.bitmaps import BitmapIndex, from_ids, member_of, members
+from radar_models.radar3 import (
+    ChangeEvent,
+    CohortPatient,
+    Death,
+    Patient,
+    PatientConsentState,
+)
+
+
+class RecordingDict(dict):
+    def __init__(self, items, written):
+        super().__init__(items)
+        self.written = written
+
+    def __setitem__(self, key, value):
+        self.written.append(key)
+        super().__setitem__(key, value)
+
+
+def test_from_ids_round_trip():
+    assert members(from_ids([0, 7, 8, 1000])) == [0, 7, 8, 1000]
+    assert members(0) == []
+
+
+def test_index_algebra_and_incremental_updates():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            Patient(id=patient_id, is_test=patient_id == 3)
+            for patient_id in range(1, 6)
+        )
+        session.add_all(
+            CohortPatient(
+                id=patient_id,
+                cohort_id=1,
+                patient_id=patient_id,
+                recruited_date=date(2020, 1, 1),
+            )
+            for patient_id in range(1, 5)
+        )
+        session.add(Death(id=1, patient_id=2, date_of_death=date(2021, 1, 1)))
+        session.commit()
+
+        index = BitmapIndex()
+        index.build(session)
+        eligible = (
+            index.get("cohort", 1)
+            & ~index.get("flag", "test")
+            & ~index.get("flag", "deceased")
+        )
+        assert members(eligible) == [1, 4]
+        assert session.exec(
+            select(Patient.id)
+            .where(member_of(Patient.id, eligible))
+            .order_by(Patient.id)
+        ).all() == [1, 4]
+
+        removed = session.get(CohortPatient, 4)
+        removed.removed_date = date(2022, 1, 1)
+        session.add(
+            CohortPatient(
+                id=5, cohort_id=1, patient_id=5, recruited_date=date(2022, 1, 1)
+            )
+        )
+        session.commit()
+        index.apply_changes(
+            session,
+            [
+                ChangeEvent(
+                    table_name="cohort_patient",
+                    row_id=4,
+                    patient_id=4,
+                    operation="update",
+                ),
+                ChangeEvent(
+                    table_name="cohort_patient",
+                    row_id=5,
+                    patient_id=5,
+                    operation="insert",
+                ),
+            ],
+        )
+        assert members(index.get("cohort", 1)) == [1, 2, 3, 5]
+
+        # Only patient 5's rows are read and only bitmaps holding or gaining
+        # patient 5 are rewritten.
+        statements, written = [], []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[3]),
+        )
+        index.bitmaps = RecordingDict(index.bitmaps, written)
+        index.refresh_patients(session, [5])
+        assert sorted(written) == [("cohort", 1), ("flag", "all")]
+        assert members(index.get("flag", "all")) == [1, 2, 3, 4, 5]
+        assert statements and all(5 in parameters for parameters in statements)
+
+
+def test_consent_matches_export_gate():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            PatientConsentState(
+                patient_id=patient_id,
+                consent_id=1,
+                signed_on_date=date(2020, 1, 1),
+                withdrawn_on_date=None if is_active else date(2021, 1, 1),
+                is_active=is_active,
+                needs_reconsent=needs_reconsent,
+                computed_date=datetime(2022, 1, 1),
+            )
+            for patient_id, is_active, needs_reconsent in [
+                (1, True, False),
+                (2, False, False),
+                (3, True, True),
+            ]
+        )
+        session.commit()
+
+        index = BitmapIndex()
+        index.build(session)
+        assert members(index.get("consent", 1)) == [1]
+
+        session.get(PatientConsentState, (3, 1)).needs_reconsent = False
+        session.commit()
+        index.apply_changes(
+            session,
+            [
+                ChangeEvent(
+                    table_name="patient_reconsent",
+                    row_id=1,
+                    patient_id=3,
+                    operation="insert",
+                )
+            ],
+        )
+        assert members(index.get("consent", 1)) == [1, 3]
+
+
+def test_member_of_uses_any_on_postgresql():
+    query = select(Patient.id).where(member_of(Patient.id, from_ids([1, 2])))
+    assert "patient.id = ANY (" in str(query.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.cdc import (
+    WATERMARK,
+    ChangeConsumer,
+    disable_change_capture,
+    enable_change_capture,
+)
+from radar_models.radar3 import ChangeEvent, Death, Patient
+
+
+def test_changes_are_captured_and_consumed():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        enable_change_capture(session)
+        session.add(Patient(id=1))
+        session.commit()
+        patient = session.get(Patient, 1)
+        patient.patient_comment = "moved"
+        session.add(Death(id=1, patient_id=1, date_of_death=date(2024, 1, 1)))
+        session.commit()
+        session.execute(update(Patient).where(Patient.id == 1).values(is_test=True))
+        session.commit()
+        disable_change_capture(session)
+
+        consumer = ChangeConsumer(session, "test", batch_size=2)
+        first = consumer.poll()
+        assert [(change.table_name, change.operation) for change in first] == [
+            ("patient", "insert"),
+            ("death", "insert"),
+        ]
+        consumer.acknowledge(first)
+        rest = consumer.poll()
+        assert [(change.row_id, change.changed_columns) for change in rest] == [
+            (1, "patient_comment"),
+            (1, "is_test"),
+        ]
+        consumer.acknowledge(rest)
+        assert consumer.poll() == []
+
+
+def test_bulk_updates_and_moves_are_captured():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Patient(id=1), Patient(id=2)])
+        session.add(Death(id=1, patient_id=1, date_of_death=date(2024, 1, 1)))
+        session.commit()
+        enable_change_capture(session)
+        session.execute(update(Patient).values(version_id=Patient.version_id + 1))
+        session.execute(update(Death).where(Death.id == 1).values(patient_id=2))
+        session.commit()
+        death = session.get(Death, 1)
+        death.patient_id = 1
+        session.commit()
+        disable_change_capture(session)
+
+        changes = [
+            (
+                change.table_name,
+                change.row_id,
+                change.patient_id,
+                change.changed_columns,
+            )
+            for change in session.exec(select(ChangeEvent).order_by(ChangeEvent.id))
+        ]
+        assert changes == [
+            ("patient", 1, None, "version_id"),
+            ("patient", 2, None, "version_id"),
+            ("death", 1, 1, "patient_id"),
+            ("death", 1, 2, "patient_id"),
+            ("death", 1, 1, "patient_id"),
+            ("death", 1, 2, "patient_id"),
+        ]
+
+
+def test_consumer_reads_in_transaction_order():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            ChangeEvent(
+                id=event_id,
+                table_name="patient",
+                row_id=event_id,
+                operation="insert",
+                created_date=datetime(2024, 1, 1),
+                transaction_id=transaction_id,
+            )
+            for event_id, transaction_id in ((1, 20), (2, 10), (3, 20))
+        )
+        session.commit()
+
+        consumer = ChangeConsumer(session, "test", batch_size=2)
+        first = consumer.poll()
+        assert [change.id for change in first] == [2, 1]
+        consumer.acknowledge(first)
+        assert consumer.offset() == (20, 1)
+        assert [change.id for change in consumer.poll()] == [3]
+
+        # The position is part of the caller's transaction.
+        session.rollback()
+        assert consumer.offset() == (0, 0)
+        assert [change.id for change in consumer.poll()] == [2, 1]
+
+
+def test_watermark_on_postgresql():
+    sql = str(
+        select(ChangeEvent.id)
+        .where(ChangeEvent.transaction_id < WATERMARK)
+        .compile(dialect=postgresql.dialect())
+    )
+    assert "txid_snapshot_xmin(txid_current_snapshot())" in sql
+
+
+def test_bulk_inserts_record_generated_ids():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Patient(id=1))
+        session.commit()
+        enable_change_capture(session)
+        session.execute(
+            insert(Death),
+            [
+                {"patient_id": 1, "date_of_death": date(2024, 1, 1)},
+                {"patient_id": 1, "date_of_death": date(2024, 1, 2)},
+            ],
+        )
+        session.execute(
+            insert(Death).values(patient_id=1, date_of_death=date(2024, 1, 3))
+        )
+        session.commit()
+        disable_change_capture(session)
+
+        changes = session.exec(
+            select(ChangeEvent.row_id, ChangeEvent.patient_id).order_by(ChangeEvent.id)
+        ).all()
+        assert changes == [(1, 1), (2, 1), (3, 1)]
@@ -0,0 +1,25 @@
+from radar_models.code_index import CodeIndex, write_index
+
+ROWS = [
+    (1, "ICD-10", "diagnosis", "N04", "Nephrotic syndrome"),
+    (2, "ICD-10", "diagnosis", "N04.1", "Nephrotic syndrome, focal and segmental"),
+    (3, "SNOMED CT", "diagnosis", "236403004", "Focal segmental glomerulosclerosis"),
+    (4, "ICD-10", "diagnosis", "Q61.2", "Polycystic kidney, autosomal dominant"),
+]
+
+
+def test_search(tmp_path):
+    write_index(ROWS, tmp_path / "codes.idx")
+    with CodeIndex(tmp_path / "codes.idx") as index:
+        assert len(index) == 4
+        assert [code.id for code in index.search("n04")] == [1, 2]
+        assert [code.id for code in index.search("N04.1")] == [2]
+        assert [code.id for code in index.search("foc seg")] == [3, 2]
+        assert [code.id for code in index.search("foc", coding_system="ICD-10")] == [2]
+        assert [code.id for code in index.search("2364")] == [3]
+        assert index.search("polycystic")[0].code_label.startswith("Polycystic")
+        assert index.search("zzz") == []
+        assert index.search("  ") == []
+        assert index.search("n") == []
+        assert [code.id for code in index.search("n", min_prefix=1)] == [1, 2]
+        assert [code.id for code in index.search("nephrotic", max_scan=1)] == [1]
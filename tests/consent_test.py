@@ -0,0 +1,92 @@
+from datetime import date
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.consent import apply_changes, consented, recompute
+from radar_models.radar3 import (
+    ChangeEvent,
+    Consent,
+    Patient,
+    PatientConsent,
+    PatientConsentState,
+    PatientReconsent,
+)
+
+
+def test_consent_states_and_gate():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in range(1, 6))
+        session.add_all(
+            [
+                Consent(
+                    id=1,
+                    consent_code="V1",
+                    release_date=date(2010, 1, 1),
+                    consent_url="",
+                    is_retired=True,
+                ),
+                Consent(
+                    id=2,
+                    consent_code="V2",
+                    release_date=date(2020, 1, 1),
+                    consent_url="",
+                ),
+            ]
+        )
+        signings = [
+            (1, 2, date(2021, 1, 1), None),
+            (2, 2, date(2021, 1, 1), date(2022, 1, 1)),
+            (3, 1, date(2015, 1, 1), None),
+            (4, 1, date(2015, 1, 1), None),
+            (5, 2, date(2019, 1, 1), None),
+        ]
+        session.add_all(
+            PatientConsent(
+                id=index,
+                patient_id=patient_id,
+                consent_id=consent_id,
+                signed_on_date=signed,
+                withdrawn_on_date=withdrawn,
+            )
+            for index, (patient_id, consent_id, signed, withdrawn) in enumerate(
+                signings
+            )
+        )
+        session.add(
+            PatientReconsent(
+                id=1,
+                patient_id=4,
+                sent_date=date(2019, 1, 1),
+                response_date=date(2019, 2, 1),
+            )
+        )
+        session.commit()
+
+        assert recompute(session, as_of=date(2023, 1, 1)) == 5
+        gated = select(Patient.id).where(consented(Patient.id)).order_by(Patient.id)
+        assert session.exec(gated).all() == [1, 4]
+        assert session.exec(
+            select(Patient.id)
+            .where(consented(Patient.id, allow_reconsent_pending=True))
+            .order_by(Patient.id)
+        ).all() == [1, 3, 4]
+
+        signing = session.get(PatientConsent, 0)
+        signing.withdrawn_on_date = date(2022, 6, 1)
+        session.commit()
+        apply_changes(
+            session,
+            [
+                ChangeEvent(
+                    table_name="patient_consent",
+                    row_id=0,
+                    patient_id=1,
+                    operation="update",
+                )
+            ],
+            as_of=date(2023, 1, 1),
+        )
+        assert session.exec(gated).all() == [4]
+        assert session.get(PatientConsentState, (1, 2)).is_active is False
@@ -0,0 +1,204 @@
+from datetime import date, datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from radar_models.consent import recompute
+from radar_models.criteria import (
+    AtHospital,
+    Consented,
+    Criterion,
+    Deceased,
+    HasDiagnosis,
+    InCohort,
+    IsTest,
+    OnDrugGroup,
+    ResultValue,
+    cohort_query,
+    find_patients,
+    from_spec,
+)
+from radar_models.radar3 import (
+    CohortPatient,
+    Consent,
+    Death,
+    Drug,
+    DrugGroup,
+    HospitalPatient,
+    Medication,
+    Patient,
+    PatientConsent,
+    PatientDiagnosis,
+    Result,
+)
+
+EGFR = 7
+
+
+def populate(session):
+    session.add_all(
+        Patient(id=patient_id, is_test=patient_id == 4) for patient_id in range(1, 6)
+    )
+    session.add_all(
+        [
+            DrugGroup(id=1, drug_group="Immunosuppressants"),
+            DrugGroup(
+                id=2, drug_group="Calcineurin inhibitors", parent_drug_group_id=1
+            ),
+            Drug(id=1, drug_name="Tacrolimus", drug_group_id=2),
+            Consent(
+                id=1,
+                consent_code="RADAR",
+                release_date=date(2015, 1, 1),
+                consent_url="",
+            ),
+        ]
+    )
+    for patient_id in range(1, 6):
+        session.add(
+            PatientDiagnosis(
+                id=patient_id,
+                patient_id=patient_id,
+                hospital_id=1,
+                data_source_id=1,
+                diagnosis_id=12 if patient_id != 5 else 13,
+                diagnosis_text="",
+                symptoms_date=date(2019, 1, 1),
+                gene_test=False,
+                biochemistry=False,
+                assessment=False,
+                biopsy=False,
+                biopsy_diagnosis=0,
+                comments="",
+                prenatal=False,
+            )
+        )
+        session.add(
+            PatientConsent(
+                id=patient_id,
+                patient_id=patient_id,
+                consent_id=1,
+                signed_on_date=date(2019, 1, 1),
+                withdrawn_on_date=date(2020, 1, 1) if patient_id == 3 else None,
+            )
+        )
+        session.add(
+            Medication(
+                id=patient_id,
+                patient_id=patient_id,
+                hospital_id=1,
+                data_source_id=1,
+                drug_id=1,
+                start_date=date(2020, 1, 1),
+                finish_date=date(2020, 6, 1) if patient_id == 2 else None,
+                dose_unit="mg",
+                frequency="bd",
+                route="oral",
+                drug_text="",
+                dose_text="",
+            )
+        )
+    for result_id, (patient_id, value, when) in enumerate(
+        [
+            (1, "25", datetime(2023, 6, 1)),
+            (2, "20", datetime(2023, 6, 1)),
+            (3, "15", datetime(2023, 6, 1)),
+            (4, "10", datetime(2023, 6, 1)),
+            (5, "12", datetime(2023, 6, 1)),
+            (1, "not done", datetime(2023, 7, 1)),
+        ]
+    ):
+        session.add(
+            Result(
+                id=result_id,
+                patient_id=patient_id,
+                hospital_id=1,
+                data_source_id=1,
+                observation_id=EGFR,
+                result_date=when,
+                qualifier="",
+                result_value=value,
+                sent_value=value,
+            )
+        )
+    session.commit()
+    recompute(session)
+    session.commit()
+
+
+def test_find_patients():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        populate(session)
+        criteria = (
+            HasDiagnosis((12,))
+            & ResultValue(EGFR, "<", 30, within_days=365)
+            & OnDrugGroup((1,))
+            & Consented()
+            & ~IsTest()
+        )
+        assert find_patients(session, criteria, as_of=date(2024, 1, 1)) == [1]
+        assert find_patients(session, criteria, as_of=date(2025, 1, 1)) == []
+        assert cohort_query(criteria) is cohort_query(
+            from_spec(
+                {
+                    "all": [
+                        {"diagnosis": [12]},
+                        {"result": [EGFR, "<", 30, 365]},
+                        {"drug_group": [1]},
+                        {"consent": []},
+                        {"not": {"test": True}},
+                    ]
+                }
+            )
+        )
+
+
+def test_memberships_as_of():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in range(1, 4))
+        session.add_all(
+            CohortPatient(
+                id=patient_id,
+                cohort_id=1,
+                patient_id=patient_id,
+                recruited_date=recruited,
+                removed_date=removed,
+            )
+            for patient_id, recruited, removed in [
+                (1, date(2020, 1, 1), None),
+                (2, date(2020, 1, 1), date(2022, 12, 31)),
+                (3, date(2023, 6, 1), None),
+            ]
+        )
+        session.add_all(
+            HospitalPatient(
+                id=patient_id,
+                hospital_id=1,
+                patient_id=patient_id,
+                first_seen_date=date(2021, 1, 1),
+                discharged_date=date(2023, 1, 1) if patient_id == 1 else None,
+            )
+            for patient_id in range(1, 4)
+        )
+        session.add(Death(id=1, patient_id=2, date_of_death=date(2023, 3, 1)))
+        session.commit()
+
+        assert find_patients(session, InCohort((1,)), date(2022, 6, 1)) == [1, 2]
+        assert find_patients(session, InCohort((1,)), date(2024, 1, 1)) == [1, 3]
+        assert find_patients(session, AtHospital((1,)), date(2020, 6, 1)) == []
+        assert find_patients(session, AtHospital((1,)), date(2022, 6, 1)) == [1, 2, 3]
+        assert find_patients(session, AtHospital((1,)), date(2024, 1, 1)) == [2, 3]
+        assert find_patients(session, Deceased(), date(2023, 2, 28)) == []
+        assert find_patients(session, Deceased(), date(2023, 3, 1)) == [2]
+
+
+def test_criterion_requires_clause():
+    class Unfinished(Criterion):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished()
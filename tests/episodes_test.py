@@ -0,0 +1,108 @@
+from datetime import date
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models import radar2
+from radar_models.episodes import (
+    OPEN,
+    RADAR2_MEDICATION,
+    SOURCES,
+    build_episodes,
+    coalesce,
+    save_episodes,
+)
+from radar_models.radar3 import Dialysis, Episode
+
+
+def days(*dates):
+    return [OPEN if value is None else value.toordinal() for value in dates]
+
+
+def test_coalesce():
+    episodes = coalesce(
+        [1, 1, 1, 1, 2],
+        ["a", "a", "a", "b", "a"],
+        days(
+            date(2020, 1, 1),
+            date(2020, 1, 11),
+            date(2020, 3, 1),
+            date(2020, 1, 5),
+            date(2020, 1, 1),
+        ),
+        days(date(2020, 1, 10), date(2020, 2, 1), None, date(2020, 1, 6), None),
+    )
+    assert episodes == [
+        (1, "a", date(2020, 1, 1), date(2020, 2, 1), 2),
+        (1, "a", date(2020, 3, 1), None, 1),
+        (1, "b", date(2020, 1, 5), date(2020, 1, 6), 1),
+        (2, "a", date(2020, 1, 1), None, 1),
+    ]
+
+
+def test_build_dialysis_episodes():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            Dialysis(
+                id=index,
+                patient_id=1,
+                hospital_id=1,
+                data_source_id=source,
+                timeline_start=start,
+                timeline_end=end,
+                modality=1,
+            )
+            for index, (source, start, end) in enumerate(
+                [
+                    (1, date(2020, 1, 1), date(2020, 6, 30)),
+                    (2, date(2020, 3, 1), date(2020, 9, 30)),
+                    (1, date(2021, 1, 1), None),
+                ]
+            )
+        )
+        session.commit()
+
+        assert build_episodes(session, SOURCES["dialysis"]) == [
+            (1, 1, date(2020, 1, 1), date(2020, 9, 30), 2),
+            (1, 1, date(2021, 1, 1), None, 1),
+        ]
+
+
+def test_radar2_medication_episodes_are_keyed_by_drug_id():
+    engine = create_engine("sqlite://")
+    radar2.metadata.create_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(radar2.User(id=1, username="admin"))
+        session.add(
+            radar2.Group(
+                id=1, type="HOSPITAL", code="RAJ01", name="Hospital", short_name="H"
+            )
+        )
+        session.add(radar2.Patient(id=1, created_user_id=1, modified_user_id=1))
+        session.add(radar2.Drug(id=7, name="Tacrolimus"))
+        session.add_all(
+            radar2.Medication(
+                patient_id=1,
+                source_group_id=1,
+                source_type="RADAR",
+                from_date=start,
+                to_date=end,
+                drug_id=drug_id,
+                drug_text=None if drug_id else "Herbal",
+                created_user_id=1,
+                modified_user_id=1,
+            )
+            for drug_id, start, end in [
+                (7, date(2020, 1, 1), date(2020, 1, 31)),
+                (7, date(2020, 2, 1), None),
+                (None, date(2020, 1, 1), None),
+            ]
+        )
+        session.commit()
+
+        episodes = build_episodes(session, RADAR2_MEDICATION)
+        assert episodes == [(1, 7, date(2020, 1, 1), None, 2)]
+        save_episodes(session, "medication", episodes)
+        assert session.exec(select(Episode.key_id)).all() == [7]
@@ -0,0 +1,100 @@
+from datetime import date
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.hla import (
+    cohort_mismatches,
+    disable_typing_refresh,
+    enable_typing_refresh,
+    encode,
+    mismatches,
+    parse_hla,
+    rank_donors,
+    typing_rows,
+)
+from radar_models.radar3 import Transplant, TransplantHLA
+
+
+def test_parse_hla():
+    assert parse_hla("A2 A24 B8 Bw4 DR3") == {"A": (2, 24), "B": (8,), "DR": (3,)}
+    assert parse_hla("A*02:01, A*01:01; DRB1*15:01 Cw7") == {
+        "A": (2, 1),
+        "DR": (15,),
+        "C": (7,),
+    }
+    assert not parse_hla(None)
+
+
+def test_parse_hla_keeps_drb345_broads_apart():
+    assert parse_hla("DR15 DR51 DR4") == {"DR": (15, 4), "DRB345": (51,)}
+    assert parse_hla("DRB1*15:01 DRB5*01:01 DRB1*04:01 DRB4*01:03") == {
+        "DR": (15, 4),
+        "DRB345": (51, 53),
+    }
+    recipient = encode(parse_hla("DR15 DR4 DR51 DR53"))
+    assert mismatches(encode(parse_hla("DR15 DR52 DR4")), recipient) == (0, 0, 0)
+
+
+def test_mismatches():
+    recipient = encode(parse_hla("A1 A2 B7 B8 DR15 DR4"))
+    assert mismatches(encode(parse_hla("A1 A3 B7 B44 DR15")), recipient) == (1, 1, 0)
+    # A homozygous donor antigen is only one mismatch.
+    assert mismatches(encode(parse_hla("A3 B7 B8 DR4")), recipient) == (1, 0, 0)
+
+
+def test_rank_donors():
+    recipient = parse_hla("A1 A2 B7 B8 DR15 DR4")
+    donors = {
+        1: parse_hla("A3 A11 B44 B35 DR1 DR7"),
+        2: parse_hla("A1 A2 B7 B8 DR15 DR4"),
+        3: parse_hla("A1 A2 B7 B8 DR1 DR4"),
+    }
+    assert [donor_id for donor_id, _ in rank_donors(recipient, donors)] == [2, 3, 1]
+
+
+def test_cohort_mismatches():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        rows = typing_rows(1, True, parse_hla("A1 A3 B7 B44 DR15"))
+        rows += typing_rows(1, False, parse_hla("A1 A2 B7 B8 DR15 DR4"))
+        for row_id, row in enumerate(rows, start=1):
+            row.id = row_id
+        session.add_all(rows)
+        session.commit()
+        assert cohort_mismatches(session) == {1: (1, 1, 0)}
+
+
+def test_typing_refresh_follows_transplant_writes():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        enable_typing_refresh(session)
+        transplant = Transplant(
+            patient_id=1,
+            hospital_id=1,
+            transplant_hospital_id=1,
+            data_source_id=1,
+            transplant_date=date(2020, 1, 1),
+            modality=1,
+            recurrence=False,
+            donor_hla="A1 A3 B7 B44 DR15",
+            recipient_hla="A1 A2 B7 B8 DR15 DR4",
+            graft_loss_cause="",
+        )
+        session.add(transplant)
+        session.commit()
+        assert cohort_mismatches(session) == {transplant.id: (1, 1, 0)}
+
+        transplant.donor_hla = "A1 A2 B7 B8 DR15 DR4"
+        session.commit()
+        assert cohort_mismatches(session) == {transplant.id: (0, 0, 0)}
+
+        transplant.graft_loss_cause = "rejection"
+        session.commit()
+        assert len(session.exec(select(TransplantHLA)).all()) == 6
+
+        session.delete(transplant)
+        session.commit()
+        disable_typing_refresh(session)
+        assert session.exec(select(TransplantHLA)).all() == []
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from radar_models import radar2, radar3
+from radar_models.criteria import Consented, HasDiagnosis, find_patients
+from radar_models.instrumentation import (
+    Histogram,
+    NPlusOneWarning,
+    QueryInstrumentation,
+    model_names,
+)
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.05, 2.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_model_names_keep_radar2_and_radar3_apart():
+    names = model_names()
+    assert names[radar3.Nutrition.__table__] == "Nutrition"
+    assert names[radar2.Nutrition.__table__] == "radar2.Nutrition"
+
+
+def test_statements_are_attributed_to_models():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    instrumentation = QueryInstrumentation()
+    with Session(engine) as session:
+        instrumentation.attach(engine, session)
+        session.add(radar3.Patient(id=1))
+        session.commit()
+        find_patients(session, HasDiagnosis((1,)) & Consented())
+        find_patients(session, HasDiagnosis((1,)) & Consented())
+        session.execute(text("SELECT 1"))
+        instrumentation.detach(engine, session)
+
+    counts = {model: count for model, count, _, _ in instrumentation.report()}
+    assert counts == {
+        "Patient": 3,
+        "PatientDiagnosis": 2,
+        "PatientConsentState": 2,
+        "<text>": 1,
+    }
+    exposition = instrumentation.exposition()
+    assert 'radar_query_duration_seconds_count{model="Patient"} 3' in exposition
+    assert (
+        'radar_query_duration_seconds_bucket{model="Patient",le="+Inf"} 3' in exposition
+    )
+
+
+def test_n_plus_one_is_flagged():
+    engine = create_engine("sqlite://")
+    radar2.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            radar2.User(id=index, username=f"user{index}") for index in range(1, 5)
+        )
+        session.add_all(
+            radar2.PatientDemographic(
+                patient_id=index,
+                source_group_id=1,
+                source_type="RADAR",
+                created_user_id=index,
+                modified_user_id=1,
+            )
+            for index in range(1, 5)
+        )
+        session.commit()
+
+    instrumentation = QueryInstrumentation(n_plus_one_threshold=3)
+    with Session(engine) as session:
+        instrumentation.attach(engine, session)
+        demographics = session.scalars(select(radar2.PatientDemographic)).all()
+        with pytest.warns(NPlusOneWarning, match="PatientDemographic.created_user"):
+            for demographic in demographics:
+                assert demographic.created_user is not None
+        instrumentation.detach(engine, session)
+
+    assert instrumentation.lazy_loads == {"PatientDemographic.created_user": 4}
+    assert instrumentation.n_plus_one == {"PatientDemographic.created_user": 1}
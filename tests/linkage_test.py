@@ -0,0 +1,136 @@
+from datetime import date
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.linkage import (
+    LinkageRecord,
+    candidate_pairs,
+    find_candidates,
+    link_patients,
+    load_records,
+    save_candidates,
+    soundex,
+)
+from radar_models.radar3 import (
+    Patient,
+    PatientAddress,
+    PatientDemographic,
+    PatientIdentifier,
+    PatientLinkCandidate,
+)
+
+
+def make_record(patient_id, first_name, last_name, date_of_birth, postcode):
+    return LinkageRecord(
+        patient_id,
+        first_names={first_name},
+        last_names={last_name},
+        dates_of_birth={date_of_birth},
+        genders={1},
+        postcodes={postcode},
+    )
+
+
+records = {
+    1: make_record(1, "JANE", "SMITH", date(1980, 1, 2), "LS11AA"),
+    2: make_record(2, "JANE", "SMYTHE", date(1980, 1, 2), "LS11AA"),
+    3: make_record(3, "JOHN", "JONES", date(1975, 6, 7), "BS12BB"),
+    4: make_record(4, "ANNA", "BROWN", date(1990, 3, 4), "M11CC"),
+}
+
+
+def test_soundex():
+    assert soundex("Robert") == "R163"
+    assert soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+
+
+def test_candidate_pairs_only_compares_blocks():
+    assert candidate_pairs(records) == {(1, 2)}
+
+
+def test_find_candidates():
+    matches = find_candidates(records, workers=1)
+    assert [(first, second) for first, second, _ in matches] == [(1, 2)]
+
+
+def test_find_candidates_in_process_pool():
+    neighbours = {
+        **records,
+        5: make_record(5, "MARY", "GREEN", date(1961, 8, 9), "BS12BB"),
+    }
+    assert len(candidate_pairs(neighbours)) == 2
+    pool = find_candidates(neighbours, workers=2, chunk_size=1)
+    assert [(first, second) for first, second, _ in pool] == [(1, 2)]
+    assert pool == find_candidates(neighbours, workers=1)
+
+
+def test_candidate_pairs_skips_oversized_blocks():
+    crowded = {
+        patient_id: make_record(patient_id, "JANE", "SMITH", date(1980, 1, 2), "LS11AA")
+        for patient_id in range(1, 5)
+    }
+    assert len(candidate_pairs(crowded)) == 6
+    assert candidate_pairs(crowded, max_block_size=3) == set()
+
+
+def test_load_and_save_candidates():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in (1, 2, 3))
+        session.add_all(
+            PatientDemographic(
+                patient_id=patient_id,
+                data_source_id=1,
+                ethnicity_id=1,
+                country_of_birth=1,
+                first_name=first_name,
+                last_name=last_name,
+                date_of_birth=date_of_birth,
+                gender=1,
+                mobile_number="",
+                email_address="",
+            )
+            for patient_id, first_name, last_name, date_of_birth in (
+                (1, "Jane", "Smith", date(1980, 1, 2)),
+                (2, "jane ", "Smith-", date(1980, 1, 2)),
+                (3, "John", "Jones", date(1975, 6, 7)),
+            )
+        )
+        session.add_all(
+            PatientAddress(
+                patient_id=patient_id,
+                data_source_id=1,
+                country_id=1,
+                from_date=date(2000, 1, 1),
+                to_date=date(2030, 1, 1),
+                address1="",
+                address2="",
+                address3="",
+                address4="",
+                postcode=postcode,
+            )
+            for patient_id, postcode in ((1, "ls1 1aa"), (2, "LS11AA"), (3, "BS1 2BB"))
+        )
+        session.add(
+            PatientIdentifier(
+                patient_id=1, data_source_id=1, identifier_id=1, identifier=" 943 476 "
+            )
+        )
+        session.commit()
+
+        loaded = load_records(session)
+        assert loaded[2].first_names == {"JANE"}
+        assert loaded[2].last_names == {"SMITH"}
+        assert loaded[1].postcodes == loaded[2].postcodes == {"LS11AA"}
+        assert loaded[1].identifiers == {(1, "943476")}
+        assert not loaded[3].identifiers
+
+        assert link_patients(session, workers=1) == 1
+        session.commit()
+        assert save_candidates(session, find_candidates(loaded, workers=1)) == 0
+        session.commit()
+        candidate = session.exec(select(PatientLinkCandidate)).one()
+        assert (candidate.patient_id, candidate.candidate_patient_id) == (1, 2)
+        assert candidate.created_date is not None
@@ -0,0 +1,151 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from radar_models import radar2
+from radar_models.loading import (
+    disable_strict_loading,
+    enable_strict_loading,
+    list_summaries,
+    loader_options,
+    strict_engine,
+    summary_columns,
+)
+from radar_models.radar3 import HADS, HADSSummary
+
+
+@pytest.fixture(name="engine")
+def fixture_engine():
+    engine = create_engine("sqlite://")
+    radar2.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(radar2.User(id=1, username="admin"))
+        session.add(
+            radar2.Group(
+                id=1, type="HOSPITAL", code="RAJ01", name="Hospital", short_name="H"
+            )
+        )
+        session.add(radar2.Patient(id=1, created_user_id=1, modified_user_id=1))
+        session.add(radar2.Drug(id=1, name="Tacrolimus"))
+        session.add_all(
+            radar2.Medication(
+                patient_id=1,
+                source_group_id=1,
+                source_type="RADAR",
+                from_date=date(2020, 1, 1),
+                drug_id=drug_id,
+                created_user_id=1,
+                modified_user_id=1,
+            )
+            for drug_id in (1, None)
+        )
+        session.commit()
+    return engine
+
+
+def test_strict_session_raises_on_lazy_load(engine):
+    with Session(engine) as session:
+        enable_strict_loading(session)
+        medication = session.scalars(select(radar2.Medication)).first()
+        with pytest.raises(InvalidRequestError):
+            medication.created_user  # pylint: disable=pointless-statement
+
+        statement = select(radar2.Medication).execution_options(
+            strict_loading=False, populate_existing=True
+        )
+        assert session.scalars(statement).first().created_user.username == "admin"
+        assert len(session.scalars(select(radar2.Medication.id)).all()) == 2
+        disable_strict_loading(session)
+
+
+def test_strict_engine_with_loader_options(engine):
+    with Session(strict_engine(engine)) as session:
+        medications = session.scalars(
+            select(radar2.Medication)
+            .options(
+                *loader_options(
+                    radar2.Medication, "drug", "created_user", "patient.created_user"
+                )
+            )
+            .order_by(radar2.Medication.drug_id.is_(None))
+        ).all()
+        assert [
+            medication.drug and medication.drug.name for medication in medications
+        ] == [
+            "Tacrolimus",
+            None,
+        ]
+        assert medications[0].created_user.username == "admin"
+        assert medications[0].patient.created_user.username == "admin"
+        with pytest.raises(InvalidRequestError):
+            medications[0].source_group  # pylint: disable=pointless-statement
+
+    with Session(engine) as session:
+        medication = session.scalars(select(radar2.Medication)).first()
+        assert medication.source_group.code == "RAJ01"
+
+
+def test_loader_options_strategies():
+    statement = select(radar2.Medication).options(*loader_options(radar2.Medication))
+    sql = str(statement.compile())
+    assert "LEFT OUTER JOIN drugs AS drugs_1" in sql
+    assert "JOIN patients AS patients_1" in sql
+    assert "OUTER JOIN patients" not in sql
+    assert sql.count("JOIN users") == 2
+
+
+@pytest.fixture(name="hads_engine")
+def fixture_hads_engine():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            HADS(
+                patient_id=1,
+                assessment_date=date(2024, 1, day),
+                anxiety_score=day,
+                **{f"{scale}{item}": 1 for scale in "ad" for item in range(1, 8)},
+            )
+            for day in range(1, 4)
+        )
+        session.commit()
+    return engine
+
+
+def test_detail_columns_deferred(hads_engine):
+    with Session(hads_engine) as session:
+        hads = session.scalars(select(HADS).limit(1)).one()
+        assert "anxiety_score" in hads.__dict__ and "version_id" in hads.__dict__
+        assert "a1" not in hads.__dict__ and "created_date" not in hads.__dict__
+        assert hads.a1 == 1
+        assert "d7" in hads.__dict__ and "created_date" in hads.__dict__
+    assert inspect(HADS).version_id_col is HADS.__table__.c.version_id
+
+
+def test_list_summaries(hads_engine):
+    assert [column.key for column in summary_columns(HADS)] == [
+        "id",
+        "patient_id",
+        "assessment_date",
+        "anxiety_score",
+    ]
+    with Session(hads_engine) as session:
+        page = list_summaries(
+            session,
+            HADS,
+            HADS.patient_id == 1,
+            order_by=HADS.assessment_date.desc(),  # type: ignore[attr-defined]
+            limit=2,
+        )
+    assert page == [
+        HADSSummary(
+            id=3, patient_id=1, assessment_date=date(2024, 1, 3), anxiety_score=3
+        ),
+        HADSSummary(
+            id=2, patient_id=1, assessment_date=date(2024, 1, 2), anxiety_score=2
+        ),
+    ]
@@ -0,0 +1,162 @@
+from datetime import date
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.cdc import disable_change_capture, enable_change_capture
+from radar_models.consent import recompute
+from radar_models.episodes import rebuild_episodes
+from radar_models.merge import merge_patients, patient_references, resolve_pairs
+from radar_models.radar3 import (
+    ChangeEvent,
+    Consent,
+    Death,
+    Dialysis,
+    Episode,
+    Patient,
+    PatientConsent,
+    PatientConsentState,
+    PatientLinkCandidate,
+    TubeSample,
+)
+
+
+def test_patient_references_cover_patient_id_columns():
+    references = {
+        f"{column.table.name}.{column.name}" for column in patient_references()
+    }
+    assert "patient_demographic.patient_id" in references
+    assert "patient_link_candidate.candidate_patient_id" in references
+    assert "patient.id" not in references
+
+
+def test_resolve_pairs_collapses_chains():
+    assert resolve_pairs([(1, 2), (2, 3)]) == {1: 3, 2: 3}
+    with pytest.raises(ValueError):
+        resolve_pairs([(1, 2), (2, 1)])
+    with pytest.raises(ValueError):
+        resolve_pairs([(1, 2), (1, 3)])
+
+
+def test_merge_patients():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in (1, 2, 3))
+        session.add_all(
+            [
+                Death(id=1, patient_id=2, date_of_death=date(2020, 1, 1)),
+                TubeSample(
+                    id=1,
+                    patient_id=3,
+                    sample_date=date(2020, 1, 1),
+                    barcode="A1",
+                    ins_state=0,
+                ),
+                TubeSample(
+                    id=2,
+                    patient_id=1,
+                    sample_date=date(2020, 1, 1),
+                    barcode="A2",
+                    ins_state=0,
+                ),
+            ]
+        )
+        session.commit()
+
+        report = merge_patients(session, [(2, 1), (3, 1)])
+        session.commit()
+
+        assert report["death.patient_id"] == 1
+        assert report["tube_sample.patient_id"] == 1
+        assert set(session.exec(select(TubeSample.patient_id)).all()) == {1}
+        assert session.exec(select(Death.patient_id)).one() == 1
+
+
+def test_merge_deletes_self_links_and_is_captured():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in (1, 2, 3))
+        session.add_all(
+            PatientLinkCandidate(
+                patient_id=patient_id,
+                candidate_patient_id=candidate_patient_id,
+                match_score=20.0,
+            )
+            for patient_id, candidate_patient_id in ((1, 2), (2, 3))
+        )
+        session.add(Death(id=1, patient_id=2, date_of_death=date(2020, 1, 1)))
+        session.commit()
+
+        enable_change_capture(session)
+        report = merge_patients(session, [(2, 1)])
+        session.commit()
+        disable_change_capture(session)
+
+        assert report["patient_link_candidate self references"] == 1
+        assert session.exec(
+            select(
+                PatientLinkCandidate.patient_id,
+                PatientLinkCandidate.candidate_patient_id,
+            )
+        ).all() == [(1, 3)]
+        changes = {
+            (change.table_name, change.row_id, change.operation)
+            for change in session.exec(select(ChangeEvent))
+        }
+        assert ("death", 1, "update") in changes
+        assert ("patient_link_candidate", 1, "delete") in changes
+
+
+def test_merge_rebuilds_derived_rows():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Patient(id=patient_id) for patient_id in (1, 2))
+        session.add(
+            Consent(
+                id=1,
+                consent_code="V1",
+                release_date=date(2010, 1, 1),
+                consent_url="",
+            )
+        )
+        session.add_all(
+            PatientConsent(
+                id=patient_id,
+                patient_id=patient_id,
+                consent_id=1,
+                signed_on_date=signed,
+            )
+            for patient_id, signed in ((1, date(2015, 1, 1)), (2, date(2020, 1, 1)))
+        )
+        session.add_all(
+            Dialysis(
+                id=patient_id,
+                patient_id=patient_id,
+                hospital_id=1,
+                data_source_id=1,
+                timeline_start=start,
+                timeline_end=end,
+                modality=1,
+            )
+            for patient_id, start, end in (
+                (1, date(2020, 1, 1), date(2020, 6, 30)),
+                (2, date(2020, 7, 1), None),
+            )
+        )
+        session.commit()
+        recompute(session)
+        rebuild_episodes(session)
+        session.commit()
+
+        report = merge_patients(session, [(2, 1)])
+        session.commit()
+
+        assert report["patient_consent_state deleted"] == 1
+        state = session.exec(select(PatientConsentState)).one()
+        assert (state.patient_id, state.signed_on_date) == (1, date(2020, 1, 1))
+        assert session.exec(
+            select(Episode.patient_id, Episode.start_date, Episode.end_date)
+        ).all() == [(1, date(2020, 1, 1), None)]
@@ -0,0 +1,198 @@
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Uuid,
+    text,
+)
+from sqlmodel import SQLModel
+
+from radar_models.migration import (
+    BACKFILL,
+    CONTRACT,
+    EXPAND,
+    diff_metadata,
+    diff_radar2_radar3,
+    plan_migration,
+    render,
+)
+
+
+def make_metadata(target: bool) -> MetaData:
+    metadata = MetaData()
+    Table("groups", metadata, Column("id", Integer, primary_key=True))
+    columns = [
+        Column("id", Integer, primary_key=True),
+        Column("name", String),
+    ]
+    if target:
+        columns += [
+            Column("group_id", Integer, ForeignKey("groups.id")),
+            Column("status", String, nullable=False, server_default="new"),
+            Column("source", String, nullable=False),
+            Index("patient_name_idx", "name"),
+        ]
+    Table("patient" if target else "patients", metadata, *columns)
+    return metadata
+
+
+def test_plan_is_online_safe():
+    changes = diff_metadata(
+        make_metadata(target=False),
+        make_metadata(target=True),
+        {"patients": "patient"},
+    )
+    steps = plan_migration(changes)
+    script = render(steps)
+
+    assert [step.phase for step in steps] == sorted(step.phase for step in steps)
+    assert steps[0].sql == "ALTER TABLE patients RENAME TO patient"
+    assert "CREATE INDEX CONCURRENTLY patient_name_idx ON patient (name);" in script
+    assert (
+        "ALTER TABLE patient ADD CONSTRAINT patient_group_id_fkey FOREIGN KEY "
+        "(group_id) REFERENCES groups (id) NOT VALID;" in script
+    )
+    assert "ALTER TABLE patient ADD COLUMN status VARCHAR;" in script
+    assert any(step.batched and step.phase == BACKFILL for step in steps)
+    assert steps[-2].phase == CONTRACT
+    assert "ALTER TABLE patient ALTER COLUMN status SET NOT NULL;" in script
+
+    # Old application code keeps inserting rows without the new NOT NULL
+    # column until the backfill is done, so the check comes after it.
+    lines = script.splitlines()
+    assert lines.index(
+        "ALTER TABLE patient ADD CONSTRAINT patient_source_not_null "
+        "CHECK (source IS NOT NULL) NOT VALID;"
+    ) > lines.index("-- backfill patient.source before it can be NOT NULL")
+
+
+def test_plan_creates_enum_types():
+    steps = plan_migration(diff_metadata(MetaData(), SQLModel.metadata))
+    sql = [step.sql.strip() for step in steps if step.phase == EXPAND]
+    create_type = sql.index(
+        "CREATE TYPE change_operation AS ENUM ('insert', 'update', 'delete')"
+    )
+    create_table = next(
+        index
+        for index, statement in enumerate(sql)
+        if statement.startswith("CREATE TABLE change_event ")
+    )
+    assert create_type < create_table
+    assert (
+        sum(statement.startswith("CREATE TYPE episode_type ") for statement in sql) == 1
+    )
+
+
+def test_period_check_is_repaired_before_index():
+    def medication(target):
+        metadata = MetaData()
+        constraints = []
+        if target:
+            constraints = [
+                CheckConstraint(
+                    "start_date <= finish_date",
+                    name="medication_period_check",
+                    info={
+                        "repair": "start_date = finish_date, finish_date = start_date"
+                    },
+                ),
+                Index(
+                    "medication_period_idx",
+                    text("daterange(start_date, finish_date, '[]')"),
+                    postgresql_using="gist",
+                ),
+            ]
+        Table(
+            "medication",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("start_date", Date),
+            Column("finish_date", Date),
+            *constraints,
+        )
+        return metadata
+
+    steps = plan_migration(diff_metadata(medication(False), medication(True)))
+    lines = render(steps, lock_timeout="1s").splitlines()
+    assert lines[1:] == [
+        "ALTER TABLE medication ADD CONSTRAINT medication_period_check "
+        "CHECK (start_date <= finish_date) NOT VALID;",
+        "-- repeat until 0 rows are updated",
+        "UPDATE medication SET start_date = finish_date, finish_date = start_date "
+        "WHERE id IN (SELECT id FROM medication "
+        "WHERE NOT (start_date <= finish_date) LIMIT 10000);",
+        "ALTER TABLE medication VALIDATE CONSTRAINT medication_period_check;",
+        "-- run outside a transaction block",
+        "CREATE INDEX CONCURRENTLY medication_period_idx ON medication "
+        "USING gist (daterange(start_date, finish_date, '[]'));",
+    ]
+
+
+def test_diff_radar2_radar3():
+    kinds = {change.kind for change in diff_radar2_radar3()}
+    assert {"rename_table", "add_table", "add_column"} <= kinds
+
+
+def test_plan_converts_compact_types():
+    def radar3(compact):
+        metadata = MetaData()
+        for name in ("patient", "change_event", "hads"):
+            SQLModel.metadata.tables[name].to_metadata(metadata)
+        if not compact:
+            metadata.tables["change_event"].c.operation.type = String()
+            metadata.tables["change_event"].c.table_name.type = String()
+            metadata.tables["hads"].c.a1.type = Integer()
+        return metadata
+
+    steps = plan_migration(diff_metadata(radar3(False), radar3(True)))
+    lines = render(steps).splitlines()
+    # Only the enum type is created unattended; the type changes go through
+    # shadow columns and are left commented out for review.
+    assert [line for line in lines[1:] if not line.startswith("--")] == [
+        "CREATE TYPE change_operation AS ENUM ('insert', 'update', 'delete');"
+    ]
+    assert all(step.manual for step in steps[1:])
+    hads = [line for line in lines if " hads" in line]
+    assert hads == [
+        "-- ALTER TABLE hads ADD COLUMN a1_new SMALLINT;",
+        "-- CREATE FUNCTION hads_a1_sync() RETURNS trigger LANGUAGE plpgsql AS "
+        "$$ BEGIN NEW.a1_new := NEW.a1::SMALLINT; RETURN NEW; END $$;",
+        "-- CREATE TRIGGER hads_a1_sync BEFORE INSERT OR UPDATE ON hads "
+        "FOR EACH ROW EXECUTE FUNCTION hads_a1_sync();",
+        "-- UPDATE hads SET a1_new = a1::SMALLINT WHERE id IN (SELECT id FROM hads "
+        "WHERE a1_new IS NULL AND a1 IS NOT NULL LIMIT 10000);",
+        "-- recreate the indexes, constraints and foreign keys on hads.a1 for "
+        "a1_new before the swap",
+        "-- DROP TRIGGER IF EXISTS hads_a1_sync ON hads;",
+        "-- DROP FUNCTION IF EXISTS hads_a1_sync();",
+        "-- ALTER TABLE hads DROP COLUMN a1;",
+        "-- ALTER TABLE hads RENAME COLUMN a1_new TO a1;",
+    ]
+
+    # Widening a VARCHAR only changes the catalog.
+    widened = plan_migration(diff_metadata(radar3(True), radar3(False)))
+    assert [step.sql for step in widened if not step.manual] == [
+        "ALTER TABLE change_event ALTER COLUMN table_name TYPE VARCHAR"
+    ]
+
+
+def test_plan_has_no_cast_from_uuid():
+    def patient(key_type):
+        metadata = MetaData()
+        Table("patient", metadata, Column("id", key_type, primary_key=True))
+        return metadata
+
+    steps = plan_migration(diff_metadata(patient(Uuid), patient(BigInteger)))
+    assert all(step.manual for step in steps)
+    assert "CREATE FUNCTION" not in render(steps)
+    assert [step.sql for step in steps if step.phase == BACKFILL] == [
+        "-- fill patient.id_new and keep it in step with id: there is no cast "
+        "from UUID to BIGINT"
+    ]
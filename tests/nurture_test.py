@@ -0,0 +1,77 @@
+from array import array
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+from radar_models import radar2
+from radar_models.nurture import ALIQUOTS, reconcile, shortfalls
+
+
+def test_shortfalls():
+    protocol = array("i", [2] * len(ALIQUOTS))
+    keys = [
+        ("s1", 1, date(2020, 1, 1), "ADULT_NS"),
+        ("s2", 2, date(2020, 1, 1), "ADULT_NS"),
+        ("s3", 3, date(2020, 1, 1), "UNKNOWN"),
+    ]
+    counts = array("i", [2] * len(ALIQUOTS) + [0] + [3] * (len(ALIQUOTS) - 1))
+    counts.extend([1] * len(ALIQUOTS))
+
+    missing = shortfalls(keys, counts, {"ADULT_NS": protocol})
+
+    width = len(ALIQUOTS)
+    assert sum(missing[:width]) == 0
+    assert list(missing[width : 2 * width]) == [2] + [0] * (width - 1)
+    assert sum(missing[2 * width :]) == 0
+
+
+def test_reconcile():
+    engine = create_engine("sqlite://")
+    radar2.metadata.create_all(engine)
+    samples = {patient_id: uuid4() for patient_id in (1, 2)}
+    with Session(engine) as session:
+        session.add(
+            radar2.NurtureSamplesOption(id="ADULT_NS", label="Adult NS", epa=2, uc=1)
+        )
+        session.add_all(
+            radar2.NurtureSample(
+                id=sample_id,
+                patient_id=patient_id,
+                taken_on=date(2020, 1, 1),
+                barcode=patient_id,
+                epa=2 if patient_id == 1 else None,
+                uc=1,
+                created_user_id=1,
+                modified_user_id=1,
+                protocol_id="ADULT_NS",
+            )
+            for patient_id, sample_id in samples.items()
+        )
+        session.commit()
+
+        assert reconcile(session) == 1
+        session.commit()
+        owed = dict(
+            session.execute(
+                select(
+                    radar2.NurtureSampleShortfall.patient_id,
+                    radar2.NurtureSampleShortfall.total,
+                )
+            ).all()
+        )
+        assert owed == {1: 0, 2: 2}
+        shortfall = session.get(radar2.NurtureSampleShortfall, samples[2])
+        assert (shortfall.epa, shortfall.uc) == (2, 0)
+
+        session.execute(
+            update(radar2.NurtureSample)
+            .where(radar2.NurtureSample.patient_id == 2)
+            .values(epa=1)
+        )
+        assert reconcile(session, [2]) == 1
+        session.commit()
+        session.expire_all()
+        assert session.get(radar2.NurtureSampleShortfall, samples[2]).epa == 1
+        assert session.get(radar2.NurtureSampleShortfall, samples[1]).total == 0
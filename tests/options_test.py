@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from radar_models import options
+from radar_models.options import (
+    OptionRegistry,
+    build_snapshot,
+    read_module,
+    write_module,
+)
+from radar_models.radar3 import Option
+
+ROWS = [
+    (1, "gender", "1", "Male"),
+    (2, "gender", "2", "Female"),
+    (3, "modality", "1", "Haemodialysis"),
+]
+
+
+def test_module_round_trip(tmp_path):
+    version = write_module(ROWS, tmp_path / "options_snapshot.py")
+    snapshot = read_module(tmp_path / "options_snapshot.py")
+    assert snapshot.version == version
+    assert snapshot["gender"].label(2) == "Female"
+    assert snapshot["gender"].id_of("1") == 1
+    assert snapshot["modality"].label_of("1") == "Haemodialysis"
+    assert snapshot.store_value(3) == "1"
+    with pytest.raises(TypeError):
+        snapshot["gender"].by_id[4] = None  # type: ignore[index]
+
+
+def test_duplicate_store_values_are_skipped(caplog):
+    with caplog.at_level(logging.WARNING):
+        snapshot = build_snapshot(ROWS + [(4, "gender", "1", "Man")])
+    assert snapshot["gender"].label_of("1") == "Male"
+    assert 4 not in snapshot.by_id
+    assert "duplicate store value '1'" in caplog.text
+
+
+def test_registry_reloads_changed_options(monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            Option(
+                id=option_id, option_group=group, store_value=value, display_label=label
+            )
+            for option_id, group, value, label in ROWS
+        )
+        session.commit()
+
+        reads = []
+        option_rows = options.option_rows
+        monkeypatch.setattr(
+            options,
+            "option_rows",
+            lambda session: reads.append(1) or option_rows(session),
+        )
+        registry = OptionRegistry(max_age=0)
+        first = registry.current(session)
+        assert first["gender"].label(1) == "Male"
+        assert registry.current(session) is first
+        assert len(reads) == 1
+
+        option = session.get(Option, 1)
+        option.display_label = "M"
+        session.commit()
+        second = registry.current(session)
+        assert second.version != first.version
+        assert second["gender"].label(1) == "M"
+        assert len(reads) == 2
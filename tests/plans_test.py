@@ -0,0 +1,109 @@
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from benchmarks.synthetic import Scale, load
+from radar_models.consent import recompute
+from radar_models.plans import CATALOGUE, check_plan, nodes, seq_scans
+
+PLAN = {
+    "Node Type": "Nested Loop",
+    "Total Cost": 120.5,
+    "Plans": [
+        {"Node Type": "Seq Scan", "Relation Name": "cohort_patient"},
+        {"Node Type": "Index Scan", "Relation Name": "result"},
+    ],
+}
+
+
+def test_seq_scans():
+    assert [node["Node Type"] for node in nodes(PLAN)] == [
+        "Nested Loop",
+        "Seq Scan",
+        "Index Scan",
+    ]
+    assert seq_scans(PLAN) == ["cohort_patient"]
+    assert seq_scans(PLAN, frozenset({"cohort_patient"})) == []
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(name="postgresql_url", scope="module")
+def fixture_postgresql_url():
+    """RADAR_TEST_DATABASE_URL, or a throwaway cluster started with pg_ctl."""
+    if url := os.environ.get("RADAR_TEST_DATABASE_URL"):
+        yield url
+        return
+    driver = next(
+        (name for name in ("psycopg", "psycopg2") if importlib.util.find_spec(name)),
+        None,
+    )
+    if driver is None:
+        pytest.skip("No PostgreSQL driver installed")
+    if not (shutil.which("initdb") and shutil.which("pg_ctl")):
+        pytest.skip("PostgreSQL binaries not available")
+    if os.geteuid() == 0:
+        pytest.skip("initdb cannot run as root")
+    with tempfile.TemporaryDirectory() as directory:
+        data, port = os.path.join(directory, "data"), _free_port()
+        # UTF8, as psycopg returns bytes from an SQL_ASCII database.
+        subprocess.run(
+            ["initdb", "-D", data, "-U", "radar", "-A", "trust", "-E", "UTF8"],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [
+                "pg_ctl",
+                "-D",
+                data,
+                "-w",
+                # Without a log file the server keeps the captured pipes open.
+                "-l",
+                os.path.join(directory, "log"),
+                "-o",
+                f"-p {port} -k {directory} -c listen_addresses=127.0.0.1",
+                "start",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            yield f"postgresql+{driver}://radar@127.0.0.1:{port}/postgres"
+        finally:
+            subprocess.run(
+                ["pg_ctl", "-D", data, "-m", "immediate", "stop"], capture_output=True
+            )
+
+
+@pytest.fixture(name="engine", scope="module")
+def fixture_engine(postgresql_url):
+    engine = create_engine(postgresql_url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    load(engine, Scale(patients=2000), seed=0)
+    with Session(engine) as session:
+        recompute(session)
+        session.commit()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.mark.parametrize("check", CATALOGUE, ids=[check.name for check in CATALOGUE])
+def test_plan(engine, check):
+    with engine.connect() as connection:
+        assert check_plan(connection, check) == []
@@ -0,0 +1,54 @@
+import uuid
+
+from sqlalchemy import create_engine, create_mock_engine
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from radar_models import radar2, radar3
+
+
+def postgresql_ddl(metadata):
+    statements = []
+    engine = create_mock_engine(
+        "postgresql://",
+        lambda sql, *args, **kwargs: statements.append(
+            str(sql.compile(dialect=engine.dialect))
+        ),
+    )
+    metadata.create_all(engine, checkfirst=False)
+    return "\n".join(statements)
+
+
+def test_postgresql_ddl_is_unchanged():
+    ddl = postgresql_ddl(radar2.metadata)
+    assert "id INTEGER DEFAULT nextval('logs_id_seq'::regclass) NOT NULL" in ddl
+    assert "id UUID DEFAULT uuid_generate_v4() NOT NULL" in ddl
+    assert "data JSONB" in ddl
+    assert "ip_address INET NOT NULL" in ddl
+    assert "options TEXT[]" in ddl
+    assert "DEFAULT 'GB'::character varying" in ddl
+    assert "CHECK ((units IS NULL) OR (units <> ''::text))" in ddl
+    assert "id BIGSERIAL NOT NULL" in postgresql_ddl(SQLModel.metadata)
+
+
+def test_radar2_and_radar3_create_on_sqlite():
+    engine = create_engine("sqlite://")
+    radar2.metadata.create_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = radar2.User(username="admin")
+        log = radar2.Log(type="LOGIN", data={"user": "admin"})
+        demographics = radar2.PatientDemographic(
+            patient_id=1,
+            source_group_id=1,
+            source_type="RADAR",
+            created_user_id=1,
+            modified_user_id=1,
+        )
+        patient = radar3.Patient()
+        session.add_all([user, log, demographics, patient])
+        session.commit()
+
+        assert (user.id, log.id, patient.id) == (1, 1, 1)
+        assert isinstance(demographics.id, uuid.UUID)
+        assert session.get(radar2.Log, 1).data == {"user": "admin"}
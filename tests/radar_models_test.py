@@ -1,8 +1,11 @@
 import ast
 
+import pytest
 from sqlalchemy import create_mock_engine
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql.type_api import TypeEngine
-from sqlmodel import SQLModel
+from sqlmodel import Session, SQLModel, create_engine
 
 from radar_models import radar3
 from tests.table_extractor import TableNameExtractor
@@ -29,3 +32,22 @@ def test_create_tables(capsys):
     captured = capsys.readouterr()
     for table in table_name_extractor.table_names:
         assert f"CREATE TABLE {table}" in captured.out
+
+
+def test_concurrent_edits_raise_stale_data():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(radar3.Patient(id=1))
+        session.commit()
+
+    with Session(engine) as first, Session(engine) as second:
+        first_patient = first.get(radar3.Patient, 1)
+        second_patient = second.get(radar3.Patient, 1)
+        first_patient.patient_comment = "first"
+        first.commit()
+        assert first_patient.version_id == 2
+
+        second_patient.patient_comment = "second"
+        with pytest.raises(StaleDataError):
+            second.commit()
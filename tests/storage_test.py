@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, Date, Integer, MetaData, SmallInteger, Table
+
+from radar_models.storage import report, row_width
+
+
+def test_row_width_pads_to_alignment():
+    table = Table(
+        "example",
+        MetaData(),
+        Column("id", BigInteger, primary_key=True),
+        Column("score", SmallInteger, nullable=False),
+        Column("taken", Date, nullable=False),
+        Column("total", Integer, nullable=False),
+    )
+    # 24 byte header, id 8, score 2 padded to 4 for the date, date 4, total 4,
+    # then padded to 8: SMALLINT saves nothing here.
+    assert row_width(table) == 48
+    assert row_width(table, baseline=True) == 48
+
+
+def test_report():
+    per_row = {table: saved for table, _, _, _, saved in report()}
+    assert per_row["hads"] == 24
+    assert "patient" not in per_row
+
+    totals = {table: saved for table, _, _, _, saved in report({"hads": 1000})}
+    assert totals["hads"] == 24000
+    assert totals["pam"] == 0
@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+
+from radar_models.survival import (
+    TransplantCohort,
+    kaplan_meier,
+    outcomes,
+    stratified_survival,
+    survival_at,
+)
+
+
+def test_kaplan_meier():
+    curve = kaplan_meier([1, 2, 2, 3, 4], [True, True, False, True, False])
+    assert [point.at_risk for point in curve] == [5, 4, 2, 1]
+    assert survival_at(curve, 0) == 1.0
+    assert survival_at(curve, 2) == pytest.approx(0.8 * 0.75)
+    assert survival_at(curve, 3) == pytest.approx(0.8 * 0.75 * 0.5)
+
+
+def test_outcomes_censor_competing_events():
+    cohort = TransplantCohort(
+        transplant_id=[1, 2, 3],
+        patient_id=[1, 2, 3],
+        hospital_id=[1, 1, 2],
+        modality=[20, 21, 20],
+        transplant_date=[date(2020, 1, 1)] * 3,
+        date_of_failure=[date(2020, 1, 11), None, None],
+        date_of_recurrence=[None] * 3,
+        date_of_death=[None, date(2020, 1, 6), None],
+        first_rejection=[None] * 3,
+    )
+    censor_date = date(2020, 2, 1)
+    assert outcomes(cohort, "graft", censor_date) == ([10, 5, 31], [True, True, False])
+    assert outcomes(cohort, "death_censored_graft", censor_date) == (
+        [10, 5, 31],
+        [True, False, False],
+    )
+    curves = stratified_survival(cohort, "graft", "modality", censor_date)
+    assert survival_at(curves[20], 31) == 0.5
+    assert survival_at(curves[21], 31) == 0.0
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+from benchmarks.synthetic import (
+    Chunk,
+    Scale,
+    bounded_map,
+    generate,
+    load,
+    plan,
+    tables_for,
+)
+
+
+def test_tables_for_includes_referenced_tables():
+    names = [table.name for table in tables_for(["medication"])]
+    assert names.index("patient") < names.index("medication")
+    assert {"drug", "drug_group", "hospital", "data_source"} <= set(names)
+    assert "result" not in names
+
+
+def test_generate_is_deterministic():
+    counts = plan(Scale(patients=50), ["medication"])
+    chunk = Chunk("medication", 0, counts["medication"], 7, counts)
+    assert generate(chunk) == generate(chunk)
+    assert generate(chunk) != generate(Chunk("medication", 0, 200, 8, counts))
+
+
+def test_load_is_referentially_consistent():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    counts = load(engine, Scale(patients=40, reference_rows=5), seed=1, workers=1)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA foreign_key_check")).all() == []
+        assert connection.execute(text("SELECT count(*) FROM result")).scalar() == 2000
+        assert (
+            connection.execute(
+                text("SELECT count(*) FROM medication WHERE finish_date < start_date")
+            ).scalar()
+            == 0
+        )
+    assert counts["patient"] == 40
+
+
+def test_bounded_map_limits_tasks_in_flight():
+    submitted = []
+
+    def tasks():
+        for task in range(10):
+            submitted.append(task)
+            yield task
+
+    with ThreadPoolExecutor(2) as executor:
+        results = bounded_map(executor, lambda task: task * 2, tasks(), window=3)
+        assert next(results) == 0
+        assert len(submitted) == 4
+        assert list(results) == [2 * task for task in range(1, 10)]
@@ -0,0 +1,110 @@
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from radar_models import radar2
+from radar_models.validators import (
+    compile_check,
+    load_valid,
+    similar_to_regex,
+    table_validator,
+)
+
+
+def test_compiles_every_radar2_check():
+    for table in radar2.metadata.sorted_tables:
+        assert table_validator(table).skipped == [], table.name
+
+
+def test_code_and_form_patterns():
+    codes = table_validator(radar2.Code.__table__)
+    assert codes.violations({"system": "ICD-10", "code": "N04.1"}) == []
+    assert codes.violations({"system": "ICD-10", "code": "N04.12"})
+    assert codes.violations({"system": "SNOMED CT", "code": "0123"})
+    assert codes.violations({"system": "ERA-EDTA PRD", "code": "2"}) == []
+
+    forms = table_validator(radar2.Form.__table__)
+    assert forms.violations({"slug": "family-history"}) == []
+    assert forms.violations({"slug": "Family History"})
+
+
+def test_observation_checks():
+    observations = table_validator(radar2.Observation.__table__)
+    assert len(observations.checks) == 11
+    assert (
+        observations.violations(
+            {"value_type": "ENUM", "options": ["1", "Yes", "0", "No"]}
+        )
+        == []
+    )
+    assert observations.violations({"value_type": "ENUM", "options": None})
+    assert observations.violations({"value_type": "ENUM", "options": ["1"]})
+    assert observations.violations({"value_type": "STRING", "max_value": 5})
+    assert observations.violations(
+        {"value_type": "REAL", "min_value": 5, "max_value": 1}
+    )
+    assert observations.violations({"value_type": "STRING", "units": ""})
+
+
+def test_null_is_unknown_not_false():
+    assert compile_check("weight >= 0")({"weight": None}) is None
+    assert compile_check("NOT (weight >= 0)")({"weight": None}) is None
+    assert compile_check("(weight IS NULL) OR (weight > 1)")({}) is True
+
+
+def test_casts_and_evaluation_errors():
+    assert compile_check("weight >= 0")({"weight": "abc"}) is False
+    assert compile_check("(code)::text ~ '^[0-9]+$'")({"code": 123}) is True
+    assert compile_check("(weight)::integer >= 0")({"weight": "12"}) is True
+    assert compile_check("(weight)::integer >= 0")({"weight": "abc"}) is False
+    assert compile_check("(ratio)::double precision < 1.5")({"ratio": "1.25"}) is True
+    assert compile_check("(flag)::boolean = true")({"flag": "t"}) is True
+    assert compile_check("(tags)::text[] = ARRAY['1']")({"tags": [1]}) is True
+    assert compile_check("(weight)::integer >= 0")({"weight": None}) is None
+
+
+def test_similar_to_dot_is_literal():
+    assert similar_to_regex("a.b") == r"^(?:a\.b)$"
+    codes = compile_check("(code)::text ~ similar_escape('a.b%'::text, NULL::text)")
+    assert codes({"code": "a.bc"}) is True
+    assert codes({"code": "axbc"}) is False
+
+
+def test_load_valid(tmp_path):
+    metadata = MetaData()
+    table = Table(
+        "weights",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String),
+        Column("weight", Integer),
+        CheckConstraint("weight >= 0"),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    rejects = tmp_path / "rejects.jsonl"
+    with Session(engine) as session:
+        inserted, rejected = load_valid(
+            session,
+            table,
+            [
+                {"id": 1, "name": "a", "weight": 1},
+                {"id": 2, "name": "b", "weight": -1},
+                {"id": 3, "name": "c", "weight": None},
+                {"id": 4, "name": "d", "weight": "heavy"},
+            ],
+            rejects,
+        )
+        session.commit()
+        assert (inserted, rejected) == (2, 2)
+        assert session.execute(select(table.c.id)).scalars().all() == [1, 3]
+    assert '"id": 2' in rejects.read_text()
+    assert '"id": 4' in rejects.read_text()
@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from radar_models.radar3 import Medication
+from radar_models.validity import as_of, overlapping
+
+
+def medication(medication_id, start_date, finish_date):
+    return Medication(
+        id=medication_id,
+        patient_id=1,
+        hospital_id=1,
+        data_source_id=1,
+        drug_id=1,
+        start_date=start_date,
+        finish_date=finish_date,
+        dose_unit="mg",
+        frequency="daily",
+        route="oral",
+        drug_text="",
+        dose_text="",
+    )
+
+
+def test_as_of_and_overlapping():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                medication(1, date(2020, 1, 1), date(2020, 6, 30)),
+                medication(2, date(2020, 6, 1), None),
+                medication(3, None, date(2019, 12, 31)),
+            ]
+        )
+        session.commit()
+
+        def ids(clause):
+            return session.exec(
+                select(Medication.id).where(clause).order_by(Medication.id)
+            ).all()
+
+        assert ids(as_of(Medication, date(2020, 6, 30))) == [1, 2]
+        assert ids(as_of(Medication, date(2019, 1, 1))) == [3]
+        assert ids(overlapping(Medication, date(2019, 12, 31), date(2020, 1, 1))) == [
+            1,
+            3,
+        ]
+        assert ids(overlapping(Medication, date(2021, 1, 1), None)) == [2]
+
+
+def test_postgresql_uses_range_operators():
+    query = select(Medication.id).where(as_of(Medication, date(2020, 1, 1)))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "daterange(medication.start_date, medication.finish_date, '[]') @>" in sql
+
+
+def test_period_check_rejects_inverted_bounds():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                medication(1, None, None),
+                medication(2, date(2020, 1, 1), None),
+                medication(3, date(2020, 1, 1), date(2020, 1, 1)),
+            ]
+        )
+        session.commit()
+        session.add(medication(4, date(2020, 2, 1), date(2020, 1, 1)))
+        with pytest.raises(IntegrityError):
+            session.commit()